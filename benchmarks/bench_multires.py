@@ -0,0 +1,48 @@
+"""
+Per-frame cost of multi-resolution bars against the single-FFT path.
+
+Usage: python benchmarks/bench_multires.py
+"""
+import timeit
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.stft import STFTAnalyzer
+from audio.filterbank import bar_filterbank, apply_filterbank
+from audio.multires import MultiResolutionAnalyzer, DEFAULT_RESOLUTIONS
+
+def main(sample_rate=44100, chunk_size=512, num_bars=64, repeats=2000):
+    print(f"{'ch':>3} {'path':>28} {'us/frame':>9}")
+    for channels in (1, 2):
+        shape = (chunk_size, channels) if channels > 1 else (chunk_size,)
+        chunk = (np.random.randn(*shape) * 1000).astype(np.float32)
+
+        for fft_size in (1024, 8192):
+            stft = STFTAnalyzer(fft_size, chunk_size, sample_rate, channels=channels)
+            bank = bar_filterbank('cqt', stft.frequencies, num_bars, (20, 20000))
+
+            def single():
+                spectra = stft.push(chunk)
+                return apply_filterbank(bank, spectra[-1])
+
+            t = timeit.timeit(single, number=repeats)
+            print(f"{channels:>3} {f'single {fft_size}':>28} {t / repeats * 1e6:>9.1f}")
+
+        stft = STFTAnalyzer(1024, chunk_size, sample_rate, channels=channels, history=8192)
+        multires = MultiResolutionAnalyzer(stft.ring, sample_rate, DEFAULT_RESOLUTIONS)
+
+        def multi():
+            stft.push(chunk)
+            multires.update(chunk_size)
+            return multires.bars(num_bars, (20, 20000))
+
+        t = timeit.timeit(multi, number=repeats)
+        sizes = '/'.join(str(r[0]) for r in DEFAULT_RESOLUTIONS)
+        print(f"{channels:>3} {f'multi {sizes} + 1024':>28} {t / repeats * 1e6:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Compare the streaming polyphase resampler against the old per-chunk np.interp path.
+
+Usage: python benchmarks/bench_resampler.py
+"""
+import timeit
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.resampler import StreamingResampler
+
+def interp_chunk(audio_float, factor, channels):
+    # Previous implementation: each chunk resampled independently
+    num_samples = len(audio_float)
+    old_indices = np.arange(num_samples)
+    new_indices = np.arange(0, num_samples, factor)
+    if channels > 1:
+        new_audio = np.zeros((len(new_indices), channels), dtype=np.float32)
+        for i in range(channels):
+            new_audio[:, i] = np.interp(new_indices, old_indices, audio_float[:, i])
+        return new_audio
+    return np.interp(new_indices, old_indices, audio_float)
+
+def main(chunk_size=512, repeats=2000):
+    print(f"{'rate':>6} {'ch':>3} {'ratio':>6} {'interp us':>10} {'polyphase us':>13}")
+    for sample_rate in (44100, 48000):
+        for channels in (1, 2):
+            shape = (chunk_size, channels) if channels > 1 else (chunk_size,)
+            chunk = (np.random.randn(*shape) * 1000).astype(np.float32)
+            for ratio in (0.8, 1.25, sample_rate / 48000 if sample_rate != 48000 else 44100 / 48000):
+                resampler = StreamingResampler(channels=channels)
+                t_interp = timeit.timeit(lambda: interp_chunk(chunk, ratio, channels), number=repeats)
+                t_poly = timeit.timeit(lambda: resampler.process(chunk, ratio), number=repeats)
+                print(f"{sample_rate:>6} {channels:>3} {ratio:>6.3f} "
+                      f"{t_interp / repeats * 1e6:>10.1f} {t_poly / repeats * 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()
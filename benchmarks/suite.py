@@ -0,0 +1,277 @@
+"""
+Micro-benchmarks of the DSP and render hot paths, checked against a stored JSON baseline.
+
+Usage: python benchmarks/suite.py [-k FILTER] [--save] [--baseline PATH] [--tolerance 0.25]
+
+Without --save, every case is compared with the baseline and the run fails
+(exit status 1) when one is still slower by more than the tolerance after being
+timed again. With --save the results become the new baseline. Baselines are
+machine specific: record one on the machine you compare on.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import numpy as np
+import scipy
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from config.manager import ConfigManager
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def make_config(**overrides):
+    """
+    ConfigManager over a fixed config (not config/default.yaml, so local edits do not move the numbers).
+    overrides: dotted keys, e.g. make_config(**{'processing.pitch': 0.8})
+    """
+    config = {
+        'audio': {'sample_rate': 44100, 'chunk_size': 512, 'channels': 1},
+        'visualizer': {'fft_size': 1024, 'hop_size': 512, 'num_bars': 64, 'frequency_range': [20, 20000]},
+        'processing': {'volume': 1.0, 'pitch': 1.0, 'timescale': 1.0, 'modulation_freq': 0.0,
+                       'lpf_cutoff': 20000.0, 'hpf_cutoff': 0.0},
+        'terminal': {'display_type': 'bar', 'color_profile': 'default'},
+    }
+    for key, value in overrides.items():
+        section, name = key.split('.')
+        config.setdefault(section, {})[name] = value
+    config_manager = ConfigManager(os.path.join(os.path.dirname(__file__), "no-such-config.yaml"))
+    config_manager.replace(config)
+    return config_manager
+
+def noise(frames, channels=1, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(frames * channels) * 3000).astype(np.int16)
+
+def bench_transformations():
+    from audio.processor import AudioProcessor
+
+    effects = {
+        'clean': {},
+        'volume': {'processing.volume': 0.5},
+        'pitch': {'processing.pitch': 0.8},
+        'timescale': {'processing.timescale': 1.25},
+        'ring': {'processing.modulation_freq': 200.0, 'processing.modulation_type': 'ring'},
+        'am': {'processing.modulation_freq': 200.0, 'processing.modulation_type': 'am'},
+        'filters': {'processing.lpf_cutoff': 4000.0, 'processing.hpf_cutoff': 200.0},
+        'all': {'processing.volume': 0.5, 'processing.pitch': 0.8, 'processing.timescale': 1.25,
+                'processing.modulation_freq': 200.0, 'processing.lpf_cutoff': 4000.0, 'processing.hpf_cutoff': 200.0},
+    }
+    for channels in (1, 2):
+        chunk = noise(512, channels)
+        for name, overrides in effects.items():
+            processor = AudioProcessor(make_config(**{'audio.channels': channels, **overrides}))
+            yield f"apply_transformations/{channels}ch/{name}", lambda p=processor: p.apply_transformations(chunk)
+
+def bench_fft_bars():
+    from audio.processor import AudioProcessor
+
+    for channels in (1, 2):
+        processor = AudioProcessor(make_config(**{'audio.channels': channels}))
+        for chunk_size in (512, 2048, 8192):
+            chunk = noise(chunk_size, channels)
+            yield f"process_fft/{channels}ch/{chunk_size}", lambda p=processor, c=chunk: p.process_fft(c)
+            magnitudes, frequencies = processor.process_fft(chunk)
+            for num_bars in (32, 64, 128):
+                for scale in ('log', 'mel'):
+                    yield (f"get_bars/{channels}ch/{chunk_size}/{num_bars}/{scale}",
+                           lambda p=processor, m=magnitudes, f=frequencies, n=num_bars, s=scale: p.get_bars(m, f, num_bars=n, scale=s))
+
+def bench_analyze():
+    from audio.processor import AudioProcessor
+
+    for channels in (1, 2):
+        chunk = noise(512, channels).astype(np.float32)
+        for name, overrides in (('single', {}), ('multires', {'visualizer.resolutions': [[8192, 2048, 250], [2048, 512, 2500], [512, 512, 20000]]})):
+            processor = AudioProcessor(make_config(**{'audio.channels': channels, **overrides}))
+            yield f"analyze/{channels}ch/{name}", lambda p=processor: p.analyze(chunk)
+
+@contextlib.contextmanager
+def fixed_terminal(columns=120, lines=40):
+    """
+    Fixed terminal size (shutil.get_terminal_size reads COLUMNS/LINES first) and output to /dev/null.
+    """
+    saved = {key: os.environ.get(key) for key in ('COLUMNS', 'LINES')}
+    os.environ['COLUMNS'], os.environ['LINES'] = str(columns), str(lines)
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+def bench_terminal():
+    from visualizer.terminal import TerminalVisualizer
+
+    bars = np.random.default_rng(0).random(64)
+    for profile in ('default', 'fire'):
+        for mode in ('bars', 'bidirectional', 'line', 'braille'):
+            visualizer = TerminalVisualizer(make_config(**{'terminal.color_profile': profile}))
+            render = getattr(visualizer, f"render_{mode}")
+            yield f"terminal/{mode}/{profile}", lambda r=render: r(bars)
+
+def bench_widget():
+    from visualizer.tui import VisualizerWidget
+    from visualizer.terminal import TerminalVisualizer
+
+    # The widget's render() needs a mounted app for its size; time the renderers it dispatches to
+    widget = VisualizerWidget()
+    profiles = TerminalVisualizer(make_config()).color_profiles
+    width, height = 120, 40
+    bars = np.random.default_rng(0).random(width)
+    for name in ('default', 'fire'):
+        profile = profiles.get(name, {})
+        yield f"widget/bars/{name}", lambda p=profile: widget._render_bars(bars, width, height, 1.0, p)
+        yield f"widget/braille/{name}", lambda p=profile: widget._render_braille(bars, width, height, 1.0, p)
+
+def bench_server():
+    from visualizer.server import VisualizerServer
+
+    server = VisualizerServer(make_config())
+    tempo = {"bpm": 120.0, "confidence": 0.8, "phase": 0.25, "next_beat": 0.375}
+    rng = np.random.default_rng(0)
+    for channels, num_bars in ((1, 64), (2, 64), (2, 256)):
+        shape = (num_bars,) if channels == 1 else (channels, num_bars)
+        bars = rng.random(shape).astype(np.float32)
+        peaks = rng.random(shape).astype(np.float32)
+        onsets = rng.random(3)
+
+        def send(bars=bars, peaks=peaks):
+            # What one frame costs end to end: building the message and the broadcast's json.dumps
+            server.send_data(bars, is_beat=True, onsets=onsets, tempo=tempo, peaks=peaks, position=12.5)
+            return json.dumps(server.queue.get_nowait())
+        yield f"send_data/{channels}ch/{num_bars}", send
+
+GROUPS = [bench_transformations, bench_fft_bars, bench_analyze, bench_terminal, bench_widget, bench_server]
+
+def calibrate(timer, min_time):
+    """
+    Calls per timing run so that one run takes at least min_time seconds.
+    """
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            return number
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+def collect(filter=None, min_time=0.05):
+    """
+    Every case whose name contains filter, as (name, timer, calls per timing run).
+    """
+    cases = []
+    for group in GROUPS:
+        for name, func in group():
+            if not filter or filter in name:
+                timer = timeit.Timer(func)
+                with fixed_terminal():
+                    cases.append((name, timer, calibrate(timer, min_time)))
+    return cases
+
+def run(cases, repeat=5):
+    """
+    Best microseconds per call of each case over `repeat` timing runs.
+    The runs are interleaved round-robin across cases, so a burst of
+    background load costs one run of a few cases rather than every run of one.
+    """
+    results = {name: float('inf') for name, _, _ in cases}
+    for _ in range(repeat):
+        for name, timer, number in cases:
+            with fixed_terminal():
+                results[name] = min(results[name], timer.timeit(number) / number * 1e6)
+    return results
+
+def machine_info():
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+    }
+
+def compare(results, baseline, tolerance):
+    """
+    Cases slower than their baseline by more than tolerance (a fraction).
+    returns: regressions, improvements, as lists of (name, baseline_us, current_us)
+    """
+    regressions = []
+    improvements = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current > previous * (1 + tolerance):
+            regressions.append((name, previous, current))
+        elif current < previous / (1 + tolerance):
+            improvements.append((name, previous, current))
+    return regressions, improvements
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DSP and render micro-benchmarks with regression checks.")
+    parser.add_argument('-k', '--filter', help="only run cases whose name contains this")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="store the results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument('--repeat', type=int, default=5, help="timing runs per case (the best is kept)")
+    parser.add_argument('--min-time', type=float, default=0.05, help="seconds per timing run")
+    parser.add_argument('--json', help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    cases = collect(args.filter, args.min_time)
+    results = run(cases, args.repeat)
+    for name, us in results.items():
+        print(f"{name:<44} {us:>11.1f} us")
+    record = {'machine': machine_info(), 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results': {name: round(us, 3) for name, us in results.items()}}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(record, f, indent=2)
+
+    if args.save:
+        if args.filter and os.path.exists(args.baseline):
+            # A filtered run only replaces the cases it ran
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            record['results'] = {**stored.get('results', {}), **record['results']}
+        with open(args.baseline, 'w') as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != record['machine']:
+        print("Warning: baseline was recorded on a different machine or library versions")
+    regressions, improvements = compare(results, baseline.get('results', {}), args.tolerance)
+    if regressions:
+        # Re-time the slow cases before failing: a regression has to survive a second, longer measurement
+        slow = {name for name, _, _ in regressions}
+        retimed = run([case for case in cases if case[0] in slow], 2 * args.repeat)
+        for name, us in retimed.items():
+            results[name] = min(results[name], us)
+        regressions, improvements = compare(results, baseline.get('results', {}), args.tolerance)
+    for name, previous, current in improvements:
+        print(f"faster  {name:<44} {previous:>11.1f} -> {current:.1f} us")
+    for name, previous, current in regressions:
+        print(f"SLOWER  {name:<44} {previous:>11.1f} -> {current:.1f} us (+{(current / previous - 1) * 100:.0f}%)")
+    missing = sorted(set(results) - set(baseline.get('results', {})))
+    if missing:
+        print(f"{len(missing)} cases have no baseline yet: {', '.join(missing)}")
+    print(f"{len(regressions)} regressions beyond {args.tolerance:.0%} in {len(results)} cases")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import hashlib
+import os
+import shutil
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfft, rfftfreq
+from .stft import get_window, SampleRing
+from .filterbank import project_bars, apply_filterbank
+from .multires import MultiResolutionAnalyzer, level_power
+from .onset import band_weights, DEFAULT_BANDS
+from utils.logger import logger
+
+class AnalysisTimeline:
+    """
+    Precomputed per-frame bars and onset strengths of one file.
+    Frame k is the STFT frame ending at source frame (k + 1) * hop_size, the
+    same framing the streaming STFTAnalyzer uses, so lookups by playback
+    position match what live analysis would have produced.
+    """
+    def __init__(self, bars, onsets, hop_size, params):
+        self.bars = bars
+        self.onsets = onsets
+        self.hop_size = hop_size
+        self.params = params
+
+    def __len__(self):
+        return len(self.bars)
+
+    def frame_index(self, position):
+        """
+        Index of the newest frame complete at source frame `position`; -1 before the first.
+        """
+        return min(position // self.hop_size, len(self.bars)) - 1
+
+class BlockFramer:
+    """
+    Frames of fft_size samples every hop samples from a stream of blocks.
+    Frame k ends at sample (k + 1) * hop, with zeros before the stream
+    starts, matching STFTAnalyzer; only the samples the next frame still
+    needs are carried between blocks.
+    """
+    def __init__(self, fft_size, hop, channels):
+        self.fft_size = fft_size
+        self.hop = hop
+        self.buffer = np.zeros((fft_size, channels), dtype=np.float32)
+        self.base = -fft_size # absolute sample index of buffer[0]
+        self.next_frame = 0
+
+    def feed(self, data):
+        """
+        data: (frames, channels) block; returns the completed frames as (n, channels, fft_size).
+        """
+        self.buffer = np.concatenate([self.buffer, data.astype(np.float32, copy=False)])
+        end = self.base + len(self.buffer)
+        last = end // self.hop - 1
+        if last < self.next_frame:
+            return np.zeros((0, self.buffer.shape[1], self.fft_size), dtype=np.float32)
+        starts = (np.arange(self.next_frame, last + 1) + 1) * self.hop - self.fft_size - self.base
+        frames = sliding_window_view(self.buffer, self.fft_size, axis=0)[starts]
+        self.next_frame = last + 1
+        keep = (self.next_frame + 1) * self.hop - self.fft_size - self.base
+        self.buffer = self.buffer[keep:]
+        self.base += keep
+        return frames
+
+class TimelineBuilder:
+    """
+    Incremental, vectorized analysis of a decoded stream into timeline sidecars.
+    Each fed block is framed, transformed and reduced to bars and band flux in
+    batched array operations; bars are appended to a raw file so memory stays
+    bounded whatever the track length, and finish() writes the .npy files.
+    """
+    def __init__(self, params, bars_path, onsets_path):
+        self.params = params
+        self.channels = params['channels']
+        self.hop = params['hop_size']
+        self.num_bars = params['num_bars']
+        self.freq_range = params['freq_range']
+        self.bars_path = bars_path
+        self.onsets_path = onsets_path
+
+        fft_size = params['fft_size']
+        self.n_fft = fft_size * max(1, int(params['zero_pad']))
+        frequencies = rfftfreq(self.n_fft, 1 / params['sample_rate'])
+        self.mask = (frequencies >= self.freq_range[0]) & (frequencies <= self.freq_range[1])
+        self.frequencies = frequencies[self.mask]
+        self.window = get_window(params['window'], fft_size)
+        self.framer = BlockFramer(fft_size, self.hop, self.channels)
+        self.weights = band_weights(params['onset_bands'] or DEFAULT_BANDS, self.frequencies)
+
+        self.levels = []
+        if params['resolutions']:
+            resolutions = params['resolutions']
+            analyzer = MultiResolutionAnalyzer(SampleRing(max(r[0] for r in resolutions), self.channels),
+                                               params['sample_rate'], resolutions, window=params['window'])
+            scale = 'cqt' if params['bar_scale'] == 'log' else params['bar_scale']
+            layout = analyzer.bar_layout(self.num_bars, scale, self.freq_range)
+            for level, (rows, bank) in zip(analyzer.levels, layout):
+                if bank is None:
+                    continue
+                self.levels.append({
+                    'rows': rows,
+                    'bank': bank,
+                    'hop': level['hop_size'],
+                    'window': level['window'][:, 0],
+                    'norm': level['norm'],
+                    'framer': BlockFramer(level['fft_size'], level['hop_size'], self.channels),
+                    'grid': np.zeros((0, self.channels, len(rows)), dtype=np.float32),
+                    'grid_start': 0, # grid index of grid[0]
+                })
+
+        self.raw_bars = open(bars_path + '.raw', 'wb')
+        self.flux = []
+        self.previous = None
+        self.num_frames = 0
+
+    def feed(self, samples):
+        """
+        Analyse the next block of interleaved samples.
+        """
+        data = np.asarray(samples).reshape(-1, self.channels)
+        for level in self.levels:
+            self._feed_level(level, data)
+
+        frames = self.framer.feed(data)
+        n = len(frames)
+        if n == 0:
+            return
+        magnitudes = np.abs(rfft(frames * self.window, n=self.n_fft, axis=-1))[..., self.mask]
+
+        if self.levels:
+            bars = self._level_bars(np.arange(self.num_frames, self.num_frames + n))
+        else:
+            bars = project_bars(magnitudes, self.frequencies, self.num_bars, self.params['bar_scale'], self.freq_range)
+        self.raw_bars.write(np.ascontiguousarray(bars[:, 0] if self.channels == 1 else bars, dtype=np.float32).tobytes())
+
+        # Positive spectral flux per band on the channel mean
+        mono = magnitudes.mean(axis=1)
+        prepend = mono[:1] if self.previous is None else self.previous[np.newaxis]
+        self.flux.append(np.maximum(np.diff(mono, axis=0, prepend=prepend), 0) @ self.weights.T)
+        self.previous = mono[-1]
+        self.num_frames += n
+
+    def _feed_level(self, level, data):
+        frames = level['framer'].feed(data)
+        # Keep the newest earlier grid frame: the next STFT frame may still need it
+        kept = level['grid'][-1:]
+        level['grid_start'] += len(level['grid']) - len(kept)
+        if len(frames):
+            power = level_power(rfft(frames * level['window'], axis=-1), level['norm'])
+            flat = power.reshape(-1, power.shape[-1])
+            bars = np.sqrt(apply_filterbank(level['bank'], flat)).reshape(len(frames), self.channels, len(level['rows']))
+            level['grid'] = np.concatenate([kept, bars.astype(np.float32)])
+        else:
+            level['grid'] = kept
+
+    def _level_bars(self, frame_indices):
+        """
+        Each STFT frame takes the newest grid frame of every resolution, as the live analyzer reuses its last FFT.
+        """
+        bars = np.zeros((len(frame_indices), self.channels, self.num_bars), dtype=np.float32)
+        frame_ends = (frame_indices + 1) * self.hop
+        for level in self.levels:
+            grid_index = frame_ends // level['hop'] - 1
+            valid = grid_index >= 0
+            if np.any(valid):
+                bars[np.flatnonzero(valid)[:, np.newaxis], :, level['rows']] = \
+                    level['grid'][grid_index[valid] - level['grid_start']].transpose(0, 2, 1)
+        return bars
+
+    def finish(self):
+        """
+        Write the bars and onset-strength .npy files; returns the frame count.
+        """
+        self.raw_bars.close()
+        shape = (self.num_frames, self.num_bars) if self.channels == 1 else (self.num_frames, self.channels, self.num_bars)
+        header = {'descr': np.lib.format.dtype_to_descr(np.dtype(np.float32)), 'fortran_order': False, 'shape': shape}
+        with open(self.bars_path, 'wb') as out, open(self.bars_path + '.raw', 'rb') as raw:
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out)
+        os.remove(self.bars_path + '.raw')
+
+        flux = np.concatenate(self.flux) if self.flux else np.zeros((0, len(self.weights)))
+        np.save(self.onsets_path, onset_strengths(flux, self.params['history_frames']).astype(np.float32))
+        return self.num_frames
+
+    def abort(self):
+        self.raw_bars.close()
+        for path in (self.bars_path + '.raw', self.bars_path, self.onsets_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def compute_timeline(blocks, params, bars_path, onsets_path):
+    """
+    Analyse an iterable of interleaved sample blocks (or one whole array) into timeline .npy files.
+    """
+    if isinstance(blocks, np.ndarray):
+        blocks = [blocks]
+    builder = TimelineBuilder(params, bars_path, onsets_path)
+    try:
+        for block in blocks:
+            builder.feed(block)
+        return builder.finish()
+    except BaseException:
+        builder.abort()
+        raise
+
+def onset_strengths(flux, history):
+    """
+    Flux relative to the mean of the previous `history` frames, as OnsetDetector computes it live.
+    """
+    csum = np.concatenate([np.zeros((1, flux.shape[1])), np.cumsum(flux, axis=0)])
+    k = np.arange(len(flux))
+    count = np.minimum(k, history)[:, np.newaxis]
+    window_sum = csum[k] - csum[k - count[:, 0]]
+    mean = np.divide(window_sum, count, out=np.zeros_like(window_sum), where=count > 0)
+    return np.divide(flux, mean, out=np.zeros_like(flux), where=mean > 0)
+
+class AnalysisCache:
+    """
+    On-disk cache of analysis timelines, one pair of .npy sidecars per file.
+    Entries are keyed by path, mtime, size and every analysis parameter, and
+    are opened memory-mapped so lookups never load the whole timeline.
+    """
+    def __init__(self, directory):
+        self.directory = os.path.expanduser(directory)
+
+    def _paths(self, path, params):
+        stat = os.stat(path)
+        ident = repr((os.path.abspath(path), stat.st_mtime_ns, stat.st_size, sorted(params.items())))
+        key = hashlib.sha1(ident.encode()).hexdigest()[:24]
+        base = os.path.join(self.directory, key)
+        return base + '.bars.npy', base + '.onsets.npy'
+
+    def load(self, path, params):
+        """
+        Open a cached timeline, or return None on a miss.
+        """
+        bars_path, onsets_path = self._paths(path, params)
+        if not (os.path.exists(bars_path) and os.path.exists(onsets_path)):
+            return None
+        try:
+            bars = np.load(bars_path, mmap_mode='r')
+            onsets = np.load(onsets_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.error(f"Corrupt analysis cache entry for {path}: {e}")
+            return None
+        return AnalysisTimeline(bars, onsets, params['hop_size'], params)
+
+    def build(self, path, blocks, params):
+        """
+        Analyse decoded blocks (or one array), store the sidecars atomically and open them.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        bars_path, onsets_path = self._paths(path, params)
+        tmp_bars = bars_path + '.tmp.npy'
+        tmp_onsets = onsets_path + '.tmp.npy'
+        try:
+            compute_timeline(blocks, params, tmp_bars, tmp_onsets)
+            os.replace(tmp_onsets, onsets_path)
+            os.replace(tmp_bars, bars_path)
+        finally:
+            for tmp in (tmp_bars, tmp_onsets):
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        return self.load(path, params)
+
+    def get(self, path, open_blocks, params):
+        """
+        Cached timeline for path; on a miss open_blocks() supplies the decoded track to analyse.
+        """
+        timeline = self.load(path, params)
+        if timeline is None:
+            logger.info(f"Building analysis timeline for {path}")
+            timeline = self.build(path, open_blocks(), params)
+        return timeline
@@ -0,0 +1,178 @@
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+import numpy as np
+from utils.logger import logger
+from .ringbuffer import FrameRing, FrameReader
+
+MAX_BARS = 1024
+MAX_ONSET_BANDS = 16
+# Result slot: channels, num_bars, num_onsets, is_beat, position, bpm, confidence, phase, next_beat
+HEADER = 9
+
+def result_slot_size(channels):
+    return HEADER + 2 * channels * MAX_BARS + MAX_ONSET_BANDS
+
+def pack_result(bars, peaks, is_beat, onsets, tempo, position):
+    """
+    Flatten one analysis frame into a float64 result record.
+    """
+    bars = np.atleast_2d(bars)[:, :MAX_BARS]
+    peaks = np.atleast_2d(peaks)[:, :MAX_BARS]
+    onsets = np.asarray(onsets, dtype=np.float64)[:MAX_ONSET_BANDS]
+    channels, num_bars = bars.shape
+    next_beat = tempo["next_beat"]
+    header = [channels, num_bars, len(onsets), float(is_beat), -1 if position is None else position,
+              tempo["bpm"], tempo["confidence"], tempo["phase"], -1 if next_beat is None else next_beat]
+    return np.concatenate([header, bars.ravel(), peaks.ravel(), onsets])
+
+def unpack_result(record):
+    """
+    returns: bars, peaks, is_beat, onsets, tempo, position (bars/peaks (num_bars,) for mono)
+    """
+    channels, num_bars, num_onsets = int(record[0]), int(record[1]), int(record[2])
+    size = channels * num_bars
+    bars = record[HEADER:HEADER + size].astype(np.float32).reshape(channels, num_bars)
+    peaks = record[HEADER + size:HEADER + 2 * size].astype(np.float32).reshape(channels, num_bars)
+    onsets = record[HEADER + 2 * size:HEADER + 2 * size + num_onsets].copy()
+    if channels == 1:
+        bars, peaks = bars[0], peaks[0]
+    tempo = {
+        "bpm": float(record[5]),
+        "confidence": float(record[6]),
+        "phase": float(record[7]),
+        "next_beat": None if record[8] < 0 else float(record[8]),
+    }
+    position = None if record[4] < 0 else int(record[4])
+    return bars, peaks, bool(record[3]), onsets, tempo, position
+
+def run_worker(config_path, config, audio_spec, result_spec, audio_ready, result_ready, control, stop):
+    """
+    Worker process: analyse processed audio from the shared audio ring into the shared result ring.
+    Specs are (shared memory name, num_slots, slot_size); nothing is pickled per frame.
+    """
+    # Imported here so the parent does not pay for it when the worker is off
+    from config.manager import ConfigManager
+    from .processor import AudioProcessor
+
+    config_manager = ConfigManager(config_path)
+    config_manager.replace(config)
+    processor = AudioProcessor(config_manager)
+
+    audio_shm = shared_memory.SharedMemory(name=audio_spec[0])
+    result_shm = shared_memory.SharedMemory(name=result_spec[0])
+    try:
+        audio = FrameRing(audio_spec[1], audio_spec[2], np.float32, buffer=audio_shm.buf)
+        results = FrameRing(result_spec[1], result_spec[2], np.float64, buffer=result_shm.buf)
+        results.events.append(result_ready)
+        reader = FrameReader(audio, 'analysis', max_lag=2, ready=audio_ready)
+
+        while not stop.is_set():
+            _apply_control(control, processor, config_manager, reader)
+            frame = reader.read(timeout=0.1)
+            if frame is None:
+                continue
+            result = processor.analyze(*frame)
+            if result is None:
+                continue
+            bars, peaks, is_beat, onsets = result
+            results.write(pack_result(bars, peaks, is_beat, onsets, processor.tempo.state(), frame[1]))
+    finally:
+        # Drop the views before closing the mappings
+        audio = results = reader = None
+        for shm in (audio_shm, result_shm):
+            try:
+                shm.close()
+            except BufferError:
+                pass
+
+def _apply_control(control, processor, config_manager, reader):
+    while True:
+        try:
+            message = control.get_nowait()
+        except queue.Empty:
+            return
+        kind = message[0]
+        if kind == 'config':
+            config_manager.set(message[1], message[2])
+        elif kind == 'seek':
+            reader.flush_to = message[1]
+            processor.reset_analysis()
+        elif kind == 'timeline':
+            processor.load_timeline(message[1])
+        elif kind == 'clear_timeline':
+            processor.clear_timeline()
+
+class AnalysisWorker:
+    """
+    Runs streaming analysis in a separate process, outside the parent's GIL.
+    The parent publishes processed audio into `frames`, a FrameRing in shared
+    memory (its own playback/recorder readers use it too), and reads bar frames
+    back from a second shared ring. Config changes, seeks and timeline switches
+    go over a control queue; audio and results are never pickled.
+    """
+    def __init__(self, config_manager, num_slots, slot_size):
+        self.config_manager = config_manager
+        channels = config_manager.get('audio.channels', 1)
+        self.context = mp.get_context('spawn')
+        self.audio_shm = shared_memory.SharedMemory(create=True, size=FrameRing.nbytes(num_slots, slot_size, np.float32))
+        self.result_shm = shared_memory.SharedMemory(create=True, size=FrameRing.nbytes(num_slots, result_slot_size(channels), np.float64))
+        self.audio_spec = (self.audio_shm.name, num_slots, slot_size)
+        self.result_spec = (self.result_shm.name, num_slots, result_slot_size(channels))
+
+        self.frames = FrameRing(num_slots, slot_size, np.float32, buffer=self.audio_shm.buf)
+        self.audio_ready = self.context.Event()
+        self.frames.events.append(self.audio_ready)
+        results = FrameRing(num_slots, self.result_spec[2], np.float64, buffer=self.result_shm.buf)
+        self.result_ready = self.context.Event()
+        self.reader = FrameReader(results, 'results', ready=self.result_ready)
+        self.control = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.process = None
+
+    def start(self):
+        self.process = self.context.Process(
+            target=run_worker,
+            args=(self.config_manager.config_path, self.config_manager.config, self.audio_spec, self.result_spec,
+                  self.audio_ready, self.result_ready, self.control, self.stop_event),
+            daemon=True
+        )
+        self.process.start()
+        logger.info(f"Analysis worker started (pid {self.process.pid})")
+
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def send(self, *message):
+        if self.alive():
+            self.control.put(message)
+
+    def read(self, timeout=0.1):
+        """
+        Next analysis frame as (bars, peaks, is_beat, onsets, tempo, position), or None.
+        """
+        frame = self.reader.read(timeout)
+        return None if frame is None else unpack_result(frame[0])
+
+    def stop(self):
+        if self.process is not None:
+            self.stop_event.set()
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            logger.info(f"Analysis worker stopped, results reader stats: {self.reader.stats()}")
+            self.process = None
+        self.control.close()
+
+    def close(self):
+        """
+        Release the shared memory; the rings must no longer be used.
+        """
+        self.frames = self.reader = None
+        for shm in (self.audio_shm, self.result_shm):
+            try:
+                shm.close()
+            except BufferError:
+                pass # views still held elsewhere; the mapping goes with the process
+            shm.unlink()
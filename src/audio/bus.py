@@ -0,0 +1,33 @@
+import numpy as np
+
+class BufferPool:
+    """
+    Named float32 scratch buffers reused across chunks.
+    Each buffer only grows; callers get a view of the requested length, so
+    chunks whose size varies by a sample or two never reallocate.
+    """
+    def __init__(self, dtype=np.float32):
+        self.dtype = dtype
+        self.buffers = {}
+
+    def get(self, name, length, channels=1):
+        """
+        Return a (length,) view for mono or (length, channels) view of buffer `name`.
+        """
+        buf = self.buffers.get(name)
+        if buf is None or len(buf) < length or buf.shape[1] != channels:
+            capacity = max(length, 2 * len(buf) if buf is not None else length)
+            buf = np.empty((capacity, channels), dtype=self.dtype)
+            self.buffers[name] = buf
+        view = buf[:length]
+        return view[:, 0] if channels == 1 else view
+
+def quantize(data, out=None):
+    """
+    Clip a float32 bus chunk (int16 full scale) and convert it to int16.
+    This is the pipeline's only quantization point (playback and recording).
+    """
+    if out is None:
+        out = np.empty(data.shape, dtype=np.int16)
+    np.clip(data, -32768, 32767, out=out, casting='unsafe')
+    return out
@@ -0,0 +1,200 @@
+import shutil
+import subprocess
+import threading
+import numpy as np
+from utils.logger import logger
+
+def ffmpeg_available():
+    return shutil.which('ffmpeg') is not None
+
+def ffmpeg_command(path, sample_rate, channels, start=0.0):
+    """
+    ffmpeg invocation decoding path (from `start` seconds) to raw interleaved int16 PCM on stdout.
+    """
+    # -ss before -i seeks the input instead of decoding and discarding up to start
+    seek = ['-ss', f'{start:.6f}'] if start > 0 else []
+    return [
+        'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error',
+        *seek, '-i', path,
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', str(channels), '-ar', str(sample_rate),
+        '-',
+    ]
+
+def decode_blocks(command, channels, block_frames=65536):
+    """
+    Run a decoder command and yield its stdout as int16 blocks of whole frames.
+    """
+    frame_bytes = 2 * channels
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        leftover = b''
+        while True:
+            data = process.stdout.read(block_frames * frame_bytes)
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) - len(data) % frame_bytes
+            leftover = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], dtype=np.int16)
+        status = process.wait()
+        if status != 0:
+            raise RuntimeError(f"Decoder exited with status {status}")
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+class PCMRing:
+    """
+    Bounded single-producer/single-consumer FIFO of interleaved int16 samples.
+    The writer blocks while the ring is full and the reader while it is empty,
+    so the decoder never runs more than `capacity` samples ahead of playback.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.read_pos = 0
+        self.count = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def write(self, data):
+        """
+        Append samples, waiting for space; returns False if the ring was closed.
+        """
+        pos = 0
+        while pos < len(data):
+            with self.cond:
+                while self.count == self.capacity and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return False
+                write_pos = (self.read_pos + self.count) % self.capacity
+                n = min(len(data) - pos, self.capacity - self.count, self.capacity - write_pos)
+                self.buffer[write_pos:write_pos + n] = data[pos:pos + n]
+                self.count += n
+                pos += n
+                self.cond.notify_all()
+        return True
+
+    def read(self, num_samples, out=None):
+        """
+        Read num_samples, waiting for data; fewer are returned only once the ring is closed and drained.
+        """
+        if out is None:
+            out = np.empty(num_samples, dtype=np.int16)
+        pos = 0
+        while pos < num_samples:
+            with self.cond:
+                while self.count == 0 and not self.closed:
+                    self.cond.wait()
+                if self.count == 0:
+                    break
+                n = min(num_samples - pos, self.count, self.capacity - self.read_pos)
+                out[pos:pos + n] = self.buffer[self.read_pos:self.read_pos + n]
+                self.read_pos = (self.read_pos + n) % self.capacity
+                self.count -= n
+                pos += n
+                self.cond.notify_all()
+        return out[:pos]
+
+    def close(self):
+        """
+        Mark end of stream (or abort): wakes both sides; buffered samples can still be read.
+        """
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+class StreamingDecoder:
+    """
+    Decodes a file on a background thread into a bounded PCMRing.
+    PCM arrives already at the target rate and channel count (ffmpeg does the
+    conversion), playback can start after the first block, and memory stays at
+    buffer_seconds of audio regardless of track length.
+    """
+    def __init__(self, path, sample_rate, channels, buffer_seconds=2.0, block_frames=4096, command=None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_frames = block_frames
+        self.seekable = command is None
+        self.command = command or ffmpeg_command(path, sample_rate, channels)
+        self.capacity = max(block_frames, int(buffer_seconds * sample_rate)) * channels
+        self.ring = PCMRing(self.capacity)
+        self.thread = None
+        self.error = None
+
+    def seek(self, sample):
+        """
+        Restart decoding at interleaved sample index `sample`; buffered audio is discarded.
+        """
+        if not self.seekable:
+            raise RuntimeError("Cannot seek a custom decoder command")
+        self.close()
+        frame = sample // self.channels
+        self.command = ffmpeg_command(self.path, self.sample_rate, self.channels, start=frame / self.sample_rate)
+        self.ring = PCMRing(self.capacity)
+        self.error = None
+        self.start()
+
+    def start(self):
+        # The thread keeps its own ring and command, so a seek can replace them while it winds down
+        self.thread = threading.Thread(target=self._run, args=(self.command, self.ring), daemon=True)
+        self.thread.start()
+
+    def _run(self, command, ring):
+        try:
+            for block in decode_blocks(command, self.channels, self.block_frames):
+                if not ring.write(block):
+                    break
+        except Exception as e:
+            self.error = e
+            logger.error(f"Error decoding {self.path}: {e}")
+        finally:
+            ring.close()
+
+    def read(self, num_samples, out=None):
+        """
+        Next num_samples interleaved samples; a short (possibly empty) array at end of stream.
+        """
+        return self.ring.read(num_samples, out)
+
+    def close(self):
+        self.ring.close()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+
+class ArraySource:
+    """
+    Sequential reader over already decoded samples (an array or np.memmap).
+    Reads return views (or fill `out`), so a memory-mapped track is paged in
+    chunk by chunk.
+    """
+    def __init__(self, samples):
+        self.samples = samples
+        self.pos = 0
+
+    def read(self, num_samples, out=None):
+        chunk = self.samples[self.pos:self.pos + num_samples]
+        self.pos += len(chunk)
+        if out is None:
+            return chunk
+        out[:len(chunk)] = chunk
+        return out[:len(chunk)]
+
+    def seek(self, sample):
+        self.pos = min(max(0, sample), len(self.samples))
+
+    def close(self):
+        pass
+
+def iter_blocks(samples, block_samples=65536):
+    """
+    Yield successive views of an array (or np.memmap) of interleaved samples.
+    """
+    for start in range(0, len(samples), block_samples):
+        yield samples[start:start + block_samples]
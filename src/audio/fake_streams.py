@@ -0,0 +1,103 @@
+import threading
+import time
+import numpy as np
+
+class FakeInputStream:
+    """
+    Stand-in for a callback-mode PyAudio input stream.
+    A thread hands successive frames_per_buffer blocks of `samples` (interleaved
+    int16) to stream_callback with PyAudio's signature, paced in real time or
+    as fast as possible, until the samples run out or the callback stops it.
+    """
+    def __init__(self, stream_callback, frames_per_buffer, channels=1, rate=44100, samples=None, realtime=True):
+        self.callback = stream_callback
+        self.frames_per_buffer = frames_per_buffer
+        self.channels = channels
+        self.rate = rate
+        self.samples = np.zeros(rate * channels, dtype=np.int16) if samples is None else samples
+        self.realtime = realtime
+        self.active = False
+        self.thread = None
+
+    def start_stream(self):
+        self.active = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        block = self.frames_per_buffer * self.channels
+        start = time.monotonic()
+        for i, pos in enumerate(range(0, len(self.samples) - block + 1, block)):
+            if not self.active:
+                break
+            data = self.samples[pos:pos + block].astype('<i2').tobytes()
+            _, flag = self.callback(data, self.frames_per_buffer, {}, 0)
+            if flag != 0: # paContinue
+                break
+            if self.realtime:
+                time.sleep(max(0.0, start + (i + 1) * self.frames_per_buffer / self.rate - time.monotonic()))
+        self.active = False
+
+    def is_active(self):
+        return self.active
+
+    def stop_stream(self):
+        self.active = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+
+    def close(self):
+        self.stop_stream()
+
+class NullOutputStream:
+    """
+    In-memory sink standing in for a callback-mode PyAudio output stream.
+    A thread pulls frames_per_buffer blocks from stream_callback, paced in real
+    time or as fast as possible, and keeps them in `output` when record=True.
+    """
+    def __init__(self, stream_callback, frames_per_buffer, channels=1, rate=44100, realtime=True, record=True):
+        self.callback = stream_callback
+        self.frames_per_buffer = frames_per_buffer
+        self.channels = channels
+        self.rate = rate
+        self.realtime = realtime
+        self.record = record
+        self.output = []
+        self.active = False
+        self.thread = None
+
+    def start_stream(self):
+        self.active = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        start = time.monotonic()
+        pulled = 0
+        while self.active:
+            data, flag = self.callback(None, self.frames_per_buffer, {}, 0)
+            if self.record:
+                self.output.append(np.frombuffer(data, dtype=np.int16).copy())
+            pulled += 1
+            if flag != 0: # paContinue
+                break
+            if self.realtime:
+                time.sleep(max(0.0, start + pulled * self.frames_per_buffer / self.rate - time.monotonic()))
+        self.active = False
+
+    def samples(self):
+        return np.concatenate(self.output) if self.output else np.zeros(0, dtype=np.int16)
+
+    def get_output_latency(self):
+        return 0.0
+
+    def is_active(self):
+        return self.active
+
+    def stop_stream(self):
+        self.active = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+
+    def close(self):
+        self.stop_stream()
@@ -0,0 +1,103 @@
+from functools import lru_cache
+import numpy as np
+from scipy import sparse
+
+# Frequency warps (Hz -> perceptual scale); filters are equally spaced on the warped axis
+SCALES = {
+    'mel': lambda f: 2595.0 * np.log10(1.0 + f / 700.0),
+    'bark': lambda f: 26.81 * f / (1960.0 + f) - 0.53, # Traunmueller
+    'erb': lambda f: 21.4 * np.log10(1.0 + 0.00437 * f),
+    'cqt': lambda f: np.log2(f), # constant-Q: equal width per octave fraction
+}
+
+INVERSE = {
+    'mel': lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0),
+    'bark': lambda z: 1960.0 * (z + 0.53) / (26.28 - z),
+    'erb': lambda e: (10.0 ** (e / 21.4) - 1.0) / 0.00437,
+    'cqt': lambda x: 2.0 ** x,
+}
+
+def bar_filterbank(scale, frequencies, num_bars, freq_range, clip=True):
+    """
+    Sparse (num_bars, bins) matrix of triangular filters spaced evenly on `scale`.
+    Rows are normalized to sum to 1, so bars are weighted averages of bin magnitudes.
+    With clip, the range is narrowed to the bins the axis actually has; without,
+    it is used as given so several axes can share one bar layout.
+    Cached per (scale, bin axis, bar count, range).
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Unknown bar scale: {scale}")
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    key = (len(frequencies), float(frequencies[0]), float(frequencies[-1])) if len(frequencies) else (0, 0.0, 0.0)
+    lo, hi = float(freq_range[0]), float(freq_range[1])
+    if clip:
+        positive = frequencies[frequencies > 0]
+        lo = max(lo, positive[0] if len(positive) else 1.0)
+        hi = min(hi, key[2])
+    return _build(scale, key, int(num_bars), (lo, max(hi, lo * 1.001)))
+
+def bar_centers(scale, num_bars, freq_range):
+    """
+    Centre frequency in Hz of each filter of an unclipped bar_filterbank layout.
+    """
+    warp = SCALES[scale]
+    points = np.linspace(warp(freq_range[0]), warp(freq_range[1]), num_bars + 2)
+    return INVERSE[scale](points[1:-1])
+
+@lru_cache(maxsize=32)
+def _build(scale, axis_key, num_bars, freq_range):
+    warp = SCALES[scale]
+    # rfft bin axes are linear, so (count, first, last) identifies them exactly
+    num_bins, first, last = axis_key
+    frequencies = np.linspace(first, last, num_bins)
+
+    lo, hi = freq_range
+    # num_bars + 2 points: each triangle spans its neighbours' centres
+    points = np.linspace(warp(lo), warp(hi), num_bars + 2)
+    with np.errstate(divide='ignore'):
+        warped = warp(np.maximum(frequencies, 1e-9))
+
+    left, center, right = points[:-2, np.newaxis], points[1:-1, np.newaxis], points[2:, np.newaxis]
+    rising = (warped - left) / (center - left)
+    falling = (right - warped) / (right - center)
+    weights = np.maximum(0.0, np.minimum(rising, falling))
+
+    # Filters narrower than the bin spacing catch no bin; give them their nearest one
+    empty = weights.sum(axis=1) == 0
+    if np.any(empty):
+        nearest = np.abs(warped[np.newaxis, :] - center[empty]).argmin(axis=1)
+        weights[np.flatnonzero(empty), nearest] = 1.0
+
+    weights /= weights.sum(axis=1, keepdims=True)
+    return sparse.csr_matrix(weights.astype(np.float32))
+
+def apply_filterbank(bank, magnitudes):
+    """
+    Apply a (bars, bins) filterbank to (bins,) or (channels, bins) magnitudes in one product.
+    """
+    return np.asarray(bank @ magnitudes.T).T
+
+@lru_cache(maxsize=16)
+def log_segments(num_bins, num_bars):
+    """
+    Log-spaced bin-index segment edges and widths for the 'log' bar layout.
+    Empty segments (start == end) fall back to the single bin at start.
+    """
+    edges = np.round(np.logspace(0, np.log10(num_bins - 1), num_bars + 1)).astype(np.intp)
+    widths = np.maximum(np.diff(edges), 1).astype(np.float32)
+    return edges, widths
+
+def project_bars(magnitudes, frequencies, num_bars, scale, freq_range):
+    """
+    Bars for magnitudes with any leading shape, (..., bins) -> (..., num_bars).
+    """
+    num_bins = magnitudes.shape[-1]
+    if num_bins < 2:
+        return np.repeat(magnitudes, num_bars, axis=-1)
+    flat = magnitudes.reshape(-1, num_bins)
+    if scale == 'log':
+        edges, widths = log_segments(num_bins, num_bars)
+        bars = np.add.reduceat(flat, edges, axis=-1)[:, :num_bars] / widths
+    else:
+        bars = apply_filterbank(bar_filterbank(scale, frequencies, num_bars, freq_range), flat)
+    return bars.reshape(magnitudes.shape[:-1] + (num_bars,))
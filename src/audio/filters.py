@@ -0,0 +1,73 @@
+import numpy as np
+from functools import lru_cache
+from scipy import signal
+
+@lru_cache(maxsize=64)
+def design_sos(btype, order, cutoff, fs):
+    """
+    Butterworth design as second-order sections, LRU-cached on (type, order, cutoff, fs).
+    The returned array is shared between callers and must not be modified.
+    """
+    return signal.butter(order, cutoff, btype=btype, fs=fs, output='sos')
+
+class FilterChain:
+    """
+    Low-pass and high-pass stages run as a single second-order-sections cascade.
+    Each stage owns a slice of the cascade state, so a cutoff change swaps
+    coefficients without touching state, and enabling or disabling one stage
+    keeps the other stage's state intact.
+    """
+    def __init__(self, sample_rate, channels=1, order=4, dtype=np.float32):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.order = order
+        # Coefficients and state share the bus dtype so sosfilt does not upcast
+        self.dtype = dtype
+        self.sections = (order + 1) // 2
+        self.stages = ()
+        self.sos = None
+        self.zi = None
+
+    def reset(self):
+        self.stages = ()
+        self.sos = None
+        self.zi = None
+
+    def _state_shape(self, num_sections, ndim):
+        return (num_sections, 2) if ndim == 1 else (num_sections, 2, self.channels)
+
+    def _rebuild(self, stages, ndim):
+        # Carry over the state of stages that stay active, zero-init new ones
+        old = {btype: self.zi[i * self.sections:(i + 1) * self.sections]
+               for i, (btype, _) in enumerate(self.stages)} if self.zi is not None else {}
+        zi = np.zeros(self._state_shape(len(stages) * self.sections, ndim), dtype=self.dtype)
+        for i, (btype, _) in enumerate(stages):
+            if btype in old:
+                zi[i * self.sections:(i + 1) * self.sections] = old[btype]
+        self.zi = zi
+
+    def process(self, data, lpf_cutoff, hpf_cutoff):
+        """
+        Filter a chunk along axis 0; data is (frames,) or (frames, channels).
+        """
+        stages = []
+        if lpf_cutoff < self.sample_rate / 2:
+            stages.append(('lowpass', float(lpf_cutoff)))
+        if hpf_cutoff > 0:
+            stages.append(('highpass', float(hpf_cutoff)))
+        stages = tuple(stages)
+
+        if not stages:
+            self.reset()
+            return data
+        if len(data) == 0:
+            return data
+
+        if stages != self.stages:
+            if [btype for btype, _ in stages] != [btype for btype, _ in self.stages]:
+                self._rebuild(stages, data.ndim)
+            self.sos = np.concatenate([design_sos(btype, self.order, cutoff, self.sample_rate) for btype, cutoff in stages]).astype(self.dtype)
+            self.stages = stages
+
+        out, self.zi = signal.sosfilt(self.sos, data, axis=0, zi=self.zi)
+        return out
@@ -6,6 +6,10 @@ from pydub import AudioSegment
 import io
 import os
 from utils.logger import logger
+from .decoder import StreamingDecoder, ArraySource, decode_blocks, iter_blocks, ffmpeg_available
+from .pcm_cache import PCMCache
+from .scheduler import DeadlineScheduler
+from .ringbuffer import SPSCRing
 
 class AudioInput:
     def __init__(self, config):
@@ -64,40 +68,177 @@ class AudioInput:
         raise NotImplementedError
 
 class MicrophoneInput(AudioInput):
-    def _run(self):
+    """
+    Callback-mode capture: the PortAudio callback only copies each block into
+    a preallocated SPSCRing, and this input's thread drains the ring in
+    chunk_size blocks and runs the processing chain, so a slow stage delays
+    processing instead of dropping input. Samples that do not fit in the ring
+    (capture_buffer seconds) are counted as dropped.
+    """
+    def __init__(self, config, stream_factory=None):
+        super().__init__(config)
+        capacity = max(2 * self.chunk_size, int(config.get('audio.capture_buffer', 0.5) * self.sample_rate))
+        self.ring = SPSCRing(capacity * self.channels)
+        self.data_ready = threading.Event()
+        # callable(callback) -> started stream; defaults to a PyAudio input stream
+        self.stream_factory = stream_factory or self._open_stream
+        self.overflows = 0 # callbacks that did not fit in the ring
+        self.dropped_samples = 0
+        self.device_overflows = 0 # overflows reported by PortAudio itself
+
+    def _open_stream(self, callback):
         if not self.p:
-            logger.error("PyAudio not initialized, cannot start microphone input")
-            self.running = False
-            return
+            raise RuntimeError("PyAudio not initialized")
+        return self.p.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.chunk_size,
+            stream_callback=callback,
+            start=False
+        )
+
+    def _capture(self, in_data, frame_count, time_info, status):
+        # PortAudio thread: copy and signal, nothing else
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        written = self.ring.write(samples)
+        if written < len(samples):
+            self.overflows += 1
+            self.dropped_samples += len(samples) - written
+        if status & pyaudio.paInputOverflow:
+            self.device_overflows += 1
+        self.data_ready.set()
+        return (None, pyaudio.paContinue)
+
+    def stats(self):
+        """
+        Capture health: ring overflows, dropped samples, device overflows and current fill (0..1).
+        """
+        return {
+            "overflows": self.overflows,
+            "dropped_samples": self.dropped_samples,
+            "device_overflows": self.device_overflows,
+            "fill": round(self.ring.available() / self.ring.capacity, 3),
+        }
 
+    def _run(self):
         try:
-            self.stream = self.p.open(
-                format=pyaudio.paInt16,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
-            )
+            self.stream = self.stream_factory(self._capture)
+            self.stream.start_stream()
         except Exception as e:
             logger.error(f"Failed to open microphone stream: {e}")
             self.running = False
             return
 
         logger.info("Microphone stream opened successfully")
+        chunk = np.zeros(self.chunk_size * self.channels, dtype=np.int16)
         while self.running:
-            try:
-                data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                self._notify_callbacks(audio_data)
-            except Exception as e:
-                logger.error(f"Error reading from microphone: {e}")
-                time.sleep(0.1) # Avoid tight loop on error
+            if self.ring.available() < len(chunk):
+                self.data_ready.wait(0.1)
+                self.data_ready.clear()
+                continue
+            self.ring.read(len(chunk), chunk)
+            self._notify_callbacks(chunk)
+        logger.info(f"Microphone capture stats: {self.stats()}")
                 
 class FileInput(AudioInput):
     def __init__(self, config):
         super().__init__(config)
         self.file_path = config.get('audio.file_path')
-        self.audio_segment = None
+        self.decode_buffer = config.get('audio.decode_buffer', 2.0) # seconds decoded ahead of playback
+        self.scheduler = DeadlineScheduler(
+            self.sample_rate,
+            max_lateness=config.get('audio.max_lateness', 0.25),
+            late_policy=config.get('audio.late_policy', 'resync')
+        )
+        self.pcm_cache = None
+        if config.get('cache.pcm', True):
+            self.pcm_cache = PCMCache(
+                config.get('cache.pcm_dir', '~/.cache/audiovisualizer/pcm'),
+                int(config.get('cache.pcm_max_mb', 2048) * 1024 * 1024)
+            )
+        self.source = None
+        self.current_path = None
+        self.position = 0 # source frames delivered, including the chunk being processed
+        self.on_open = None # callable(path, open_blocks); open_blocks() yields the decoded track in blocks
+        self.seek_request = None # seconds, applied by the reader thread (_run) before its next read
+        self.on_seek = None # callable(position) after a seek, on the reader thread
+
+    def seek(self, seconds, relative=False):
+        """
+        Request a jump to `seconds` into the track (or by `seconds` when relative).
+        """
+        if relative:
+            pending = self.seek_request
+            seconds += pending if pending is not None else self.position / self.sample_rate
+        self.seek_request = max(0.0, seconds)
+
+    def _apply_seek(self):
+        seconds, self.seek_request = self.seek_request, None
+        frame = int(seconds * self.sample_rate)
+        if not isinstance(self.source, ArraySource) and self.pcm_cache:
+            # Once the background fill has finished, jump within the mapped track instead of restarting the decoder
+            samples = self.pcm_cache.open(self.current_path, self.sample_rate, self.channels)
+            if samples is not None:
+                self.source.close()
+                self.source = ArraySource(samples)
+        try:
+            self.source.seek(frame * self.channels)
+        except Exception as e:
+            logger.error(f"Error seeking to {seconds:.2f}s: {e}")
+            return
+        self.position = frame
+        logger.info(f"Seeked to {seconds:.2f}s")
+        if self.on_seek:
+            self.on_seek(frame)
+
+    def _open_source(self, path, fill_cache=True):
+        """
+        Open a file for sequential reading.
+        fill_cache: on a PCM cache miss, also run the second, full-speed ffmpeg decode that fills the cache
+        returns: source with read(n)/close(), and open_blocks() re-decoding the track for analysis
+        """
+        cache = self.pcm_cache
+        if cache:
+            samples = cache.open(path, self.sample_rate, self.channels)
+            if samples is not None:
+                logger.info(f"Playing decoded PCM from cache, {len(samples)} samples")
+                return ArraySource(samples), lambda: iter_blocks(samples)
+
+        if ffmpeg_available():
+            decoder = StreamingDecoder(path, self.sample_rate, self.channels, buffer_seconds=self.decode_buffer)
+            decoder.start()
+            command = decoder.command
+            if not (cache and fill_cache):
+                return decoder, lambda: decode_blocks(command, self.channels)
+            return decoder, self._fill_cache(path, command)
+
+        # Without ffmpeg pydub can still read WAV, but only by decoding everything up front
+        logger.warning("ffmpeg not found, decoding the whole file in memory")
+        audio = AudioSegment.from_file(path)
+        audio = audio.set_frame_rate(self.sample_rate).set_channels(self.channels)
+        raw_data = np.array(audio.get_array_of_samples(), dtype=np.int16)
+        logger.info(f"File loaded successfully, {len(raw_data)} samples")
+        if cache:
+            cache.fill(path, self.sample_rate, self.channels, [raw_data])
+        return ArraySource(raw_data), lambda: iter_blocks(raw_data)
+
+    def _fill_cache(self, path, command):
+        """
+        Fill the PCM cache at full decode speed alongside the paced playback stream.
+        returns: open_blocks() reading the filled entry (decoding again if the fill failed)
+        """
+        cache = self.pcm_cache
+        fill = threading.Thread(target=cache.fill, daemon=True,
+                                args=(path, self.sample_rate, self.channels, decode_blocks(command, self.channels)))
+        fill.start()
+
+        def open_blocks():
+            fill.join()
+            samples = cache.open(path, self.sample_rate, self.channels)
+            return iter_blocks(samples) if samples is not None else decode_blocks(command, self.channels)
+        return open_blocks
         
     def _run(self):
         if not self.file_path:
@@ -112,38 +253,225 @@ class FileInput(AudioInput):
 
         logger.info(f"Loading audio file: {self.file_path}")
         try:
-            audio = AudioSegment.from_file(self.file_path)
-            audio = audio.set_frame_rate(self.sample_rate).set_channels(self.channels)
-            self.audio_segment = audio
+            self.source, open_blocks = self._open_source(self.file_path)
         except Exception as e:
             logger.error(f"Error loading file {self.file_path}: {e}")
             self.running = False
             return
 
-        # Convert to raw data
-        raw_data = np.array(self.audio_segment.get_array_of_samples())
-        num_samples = len(raw_data)
-        logger.info(f"File loaded successfully, {num_samples} samples")
+        try:
+            self.current_path = self.file_path
+            if self.on_open:
+                self.on_open(self.file_path, open_blocks)
         
-        i = 0
-        while i < num_samples and self.running:
-            timescale = self.config.get('processing.timescale', 1.0)
-            pitch = self.config.get('processing.pitch', 1.0)
-            if timescale <= 0: timescale = 1.0
-            if pitch <= 0: pitch = 1.0
+            buffer = np.zeros(self.chunk_size, dtype=np.int16)
+            self.scheduler.start()
+            while self.running:
+                if self.seek_request is not None:
+                    self._apply_seek()
+                chunk = self.source.read(self.chunk_size, out=buffer)
+                if len(chunk) == 0:
+                    break
+                self.position += len(chunk) // self.channels
+                if len(chunk) < self.chunk_size:
+                    chunk = np.pad(chunk, (0, self.chunk_size - len(chunk)))
             
-            chunk = raw_data[i:i + self.chunk_size]
-            if len(chunk) < self.chunk_size:
-                chunk = np.pad(chunk, (0, self.chunk_size - len(chunk)))
+                self._notify_callbacks(chunk)
             
-            self._notify_callbacks(chunk)
-            i += self.chunk_size
-            
-            actual_duration = (len(chunk) / (pitch * self.channels)) / self.sample_rate
-            sleep_time = actual_duration / timescale
-            time.sleep(max(0, sleep_time))
+                # Deadline pacing from the stream start; pitch no longer changes duration, only timescale does
+                skip = self.scheduler.wait(len(chunk) // self.channels, self.config.snapshot.processing.timescale)
+                if skip:
+                    self._skip(skip, buffer)
             
-        if i >= num_samples:
-            logger.info("Reached end of audio file")
+            if self.running:
+                logger.info("Reached end of audio file")
+                self.running = False
+            logger.info(f"File pacing stats: {self.scheduler.stats()}")
+        finally:
+            # The only place the source is closed: stop() just signals and joins this thread
+            self.source.close()
+
+    def _skip(self, frames, buffer):
+        # Discard source audio the scheduler fell behind on
+        remaining = frames * self.channels
+        while remaining > 0:
+            skipped = len(self.source.read(min(remaining, len(buffer)), out=buffer))
+            if skipped == 0:
+                break
+            remaining -= skipped
+            self.position += skipped // self.channels
+
+class TrackPrefetch:
+    """
+    The next track of a playlist being opened on a background thread.
+    discard() never waits for the open: a result that arrives afterwards is
+    closed by the opening thread, so a queue edit cannot stall playback.
+    """
+    def __init__(self, path, open_source):
+        self.path = path
+        self.result = None
+        self.stale = False
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, args=(open_source,), daemon=True)
+        self.thread.start()
+
+    def _run(self, open_source):
+        try:
+            result = open_source(self.path)
+        except Exception as e:
+            logger.error(f"Error prefetching {self.path}: {e}")
+            return
+        with self.lock:
+            if not self.stale:
+                self.result = result
+                return
+        result[0].close()
+
+    def take(self):
+        """
+        Wait for the open to finish; returns (source, open_blocks), or None if it failed.
+        """
+        self.thread.join()
+        return self.result
+
+    def discard(self):
+        with self.lock:
+            self.stale = True
+            result, self.result = self.result, None
+        if result:
+            result[0].close()
+
+class PlaylistInput(FileInput):
+    """
+    Plays a Playlist back to back with no gap or padding between tracks.
+    While a track plays, the next one is opened on a background thread (a
+    PCM cache hit maps it, a miss starts its decoder buffering ahead), and the
+    chunk that reaches the end of a track is completed with the first samples
+    of the next, so one scheduler paces the whole queue without a restart.
+    """
+    def __init__(self, config, playlist):
+        super().__init__(config)
+        self.playlist = playlist
+        self.on_track_change = None # callable(path) at each track start
+        self.prefetch = None # TrackPrefetch of the upcoming track
+        self.prefetch_version = None
+
+    def stop(self):
+        super().stop()
+        self._discard_next()
+
+    def _prefetch(self, path):
+        self._discard_next()
+        # No cache fill yet: a prefetch the queue drops again should not cost a full decode
+        self.prefetch = TrackPrefetch(path, lambda path: self._open_source(path, fill_cache=False))
+
+    def _discard_next(self):
+        if self.prefetch:
+            self.prefetch.discard()
+        self.prefetch = None
+
+    def _take_next(self, path):
+        """
+        The prefetched (source, open_blocks) for path, or a freshly opened one.
+        """
+        prefetch = self.prefetch
+        if prefetch and prefetch.path == path:
+            self.prefetch = None
+            result = prefetch.take()
+            if result:
+                source, open_blocks = result
+                if isinstance(source, StreamingDecoder) and self.pcm_cache:
+                    # The track is playing now, so it is worth caching
+                    open_blocks = self._fill_cache(path, source.command)
+                return source, open_blocks
+        return self._open_source(path)
+
+    def _update_prefetch(self):
+        # Queue edits can change which track follows the playing one
+        self.prefetch_version = self.playlist.version
+        upcoming = self.playlist.peek_next()
+        if upcoming is None:
+            self._discard_next()
+        elif self.prefetch is None or upcoming != self.prefetch.path:
+            self._prefetch(upcoming)
+
+    def _start_track(self, path):
+        """
+        Switch the source to path (or the first playable track after it); False at the end of the queue.
+        """
+        while path is not None:
+            if os.path.exists(path):
+                try:
+                    source, open_blocks = self._take_next(path)
+                    break
+                except Exception as e:
+                    logger.error(f"Error loading file {path}: {e}")
+            else:
+                logger.error(f"File not found: {path}")
+            path = self.playlist.advance()
+        if path is None:
+            return False
+
+        if self.source:
+            self.source.close()
+        self.source = source
+        self.current_path = path
+        self.position = 0
+        self.seek_request = None
+        self.prefetch_version = None
+        logger.info(f"Playing track: {path}")
+        if self.on_open:
+            self.on_open(path, open_blocks)
+        if self.on_track_change:
+            self.on_track_change(path)
+        return True
+
+    def _fill(self, buffer):
+        """
+        Fill buffer from the playing track, continuing into the next one at its end.
+        returns: samples filled; short only when the queue is exhausted
+        """
+        filled = 0
+        while filled < len(buffer):
+            got = len(self.source.read(len(buffer) - filled, out=buffer[filled:]))
+            if got:
+                filled += got
+                self.position += got // self.channels
+            elif not self._start_track(self.playlist.advance()):
+                break
+        return filled
+
+    def _run(self):
+        if not self._start_track(self.playlist.resume()):
+            logger.error("Playlist is empty, nothing to play")
             self.running = False
+            return
+
+        try:
+            buffer = np.zeros(self.chunk_size, dtype=np.int16)
+            self.scheduler.start()
+            while self.running:
+                if self.playlist.take_skip() and not self._start_track(self.playlist.advance()):
+                    break
+                if self.seek_request is not None:
+                    self._apply_seek()
+                if self.playlist.version != self.prefetch_version:
+                    self._update_prefetch()
+
+                filled = self._fill(buffer)
+                if filled == 0:
+                    break
+                chunk = buffer if filled == len(buffer) else np.pad(buffer[:filled], (0, len(buffer) - filled))
+
+                self._notify_callbacks(chunk)
+
+                skip = self.scheduler.wait(len(chunk) // self.channels, self.config.snapshot.processing.timescale)
+                if skip:
+                    self._skip(skip, buffer)
 
+            if self.running:
+                logger.info("Reached end of playlist")
+                self.running = False
+            logger.info(f"Playlist pacing stats: {self.scheduler.stats()}")
+        finally:
+            self.source.close()
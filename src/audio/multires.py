@@ -0,0 +1,110 @@
+import numpy as np
+from scipy.fft import rfft, rfftfreq
+from .stft import get_window
+from .filterbank import bar_filterbank, bar_centers, apply_filterbank
+
+DEFAULT_RESOLUTIONS = [[8192, 2048, 250], [2048, 512, 2500], [512, 512, 20000]]
+
+def level_power(spectrum, norm):
+    """
+    |spectrum|^2 scaled by norm (1 / window energy), so white noise, and a tone
+    averaged over a bar's bandwidth, read the same whatever the FFT size.
+    """
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    power *= norm
+    return power
+
+class MultiResolutionAnalyzer:
+    """
+    Bars stitched from several FFT sizes over one shared sample ring.
+    Each resolution is (fft_size, hop_size, max_freq): it owns the bars whose
+    centre lies at or below max_freq (and above the previous resolution's),
+    so long windows resolve the bass while short ones keep treble transients.
+    A resolution's FFT only runs once hop_size new samples have arrived;
+    in between its last spectrum is reused. Windows and the per-resolution
+    filterbank rows are cached.
+    Each level's power spectrum is divided by its window energy and bars are
+    the root of the filterbank-averaged power. That puts every FFT size on one
+    scale, so flat noise and equal tones stay level across the crossovers.
+    """
+    def __init__(self, ring, sample_rate, resolutions=None, window='hann', workers=None):
+        resolutions = sorted(resolutions or DEFAULT_RESOLUTIONS, key=lambda r: r[2])
+        if max(r[0] for r in resolutions) > ring.capacity:
+            raise ValueError("Ring capacity is shorter than the longest FFT")
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.workers = workers
+        self.levels = []
+        for fft_size, hop_size, max_freq in resolutions:
+            level_window = get_window(window, int(fft_size))
+            self.levels.append({
+                'fft_size': int(fft_size),
+                'hop_size': int(hop_size),
+                'max_freq': float(max_freq),
+                'window': level_window[:, np.newaxis],
+                'norm': 1.0 / float(np.sum(level_window.astype(np.float64) ** 2)),
+                'frequencies': rfftfreq(int(fft_size), 1 / sample_rate),
+                'power': None,
+                'countdown': 0,
+                'computed': 0,
+            })
+        self.layout_key = None
+        self.layout = None
+
+    def reset(self):
+        for level in self.levels:
+            level['power'] = None
+            level['countdown'] = 0
+
+    def update(self, num_samples):
+        """
+        Account for num_samples new frames in the ring; re-run each FFT whose hop has elapsed.
+        """
+        for level in self.levels:
+            level['countdown'] -= num_samples
+            if level['countdown'] > 0 and level['power'] is not None:
+                continue
+            frame = self.ring.latest(level['fft_size']) * level['window']
+            # (channels, bins)
+            level['power'] = level_power(rfft(frame, axis=0, workers=self.workers).T, level['norm'])
+            level['computed'] += 1
+            # Stay on the hop grid even when a chunk spans several hops
+            level['countdown'] %= level['hop_size']
+            if level['countdown'] == 0:
+                level['countdown'] = level['hop_size']
+
+    def bar_layout(self, num_bars, scale, freq_range):
+        """
+        Per resolution: the bar indices it owns and the matching filterbank rows.
+        """
+        nyquist = self.sample_rate / 2
+        lo = max(float(freq_range[0]), min(level['frequencies'][1] for level in self.levels))
+        hi = min(float(freq_range[1]), nyquist)
+        centers = bar_centers(scale, num_bars, (lo, hi))
+        limits = np.array([level['max_freq'] for level in self.levels])
+        owner = np.minimum(np.searchsorted(limits, centers, side='left'), len(self.levels) - 1)
+
+        layout = []
+        for i, level in enumerate(self.levels):
+            rows = np.flatnonzero(owner == i)
+            bank = bar_filterbank(scale, level['frequencies'], num_bars, (lo, hi), clip=False)[rows] if len(rows) else None
+            layout.append((rows, bank))
+        return layout
+
+    def bars(self, num_bars, freq_range, scale='cqt'):
+        """
+        Stitch the latest spectra of every resolution into one bar vector.
+        returns: (num_bars,) for mono or (channels, num_bars)
+        """
+        key = (num_bars, scale, tuple(freq_range))
+        if key != self.layout_key:
+            self.layout = self.bar_layout(num_bars, scale, freq_range)
+            self.layout_key = key
+
+        channels = self.ring.channels
+        out = np.zeros((channels, num_bars), dtype=np.float32)
+        for level, (rows, bank) in zip(self.levels, self.layout):
+            if bank is None or level['power'] is None:
+                continue
+            out[:, rows] = np.sqrt(apply_filterbank(bank, level['power']))
+        return out[0] if channels == 1 else out
@@ -0,0 +1,163 @@
+import json
+import os
+import time
+import wave
+import numpy as np
+from utils.logger import logger
+from .bus import quantize
+from .decoder import decode_blocks, ffmpeg_command, ffmpeg_available, iter_blocks
+from .pcm_cache import PCMCache
+from .processor import AudioProcessor
+from .analysis_cache import TimelineBuilder
+from .smoothing import BarSmoother
+
+def file_blocks(path, sample_rate, channels, block_frames=65536, pcm_cache=None):
+    """
+    Decoded int16 blocks of a whole file: a PCM cache hit, ffmpeg, or pydub (in memory) without ffmpeg.
+    """
+    if pcm_cache:
+        samples = pcm_cache.open(path, sample_rate, channels)
+        if samples is not None:
+            return iter_blocks(samples, block_frames * channels)
+    if ffmpeg_available():
+        return decode_blocks(ffmpeg_command(path, sample_rate, channels), channels, block_frames)
+
+    from pydub import AudioSegment
+    logger.warning("ffmpeg not found, decoding the whole file in memory")
+    audio = AudioSegment.from_file(path).set_frame_rate(sample_rate).set_channels(channels)
+    return iter_blocks(np.array(audio.get_array_of_samples(), dtype=np.int16), block_frames * channels)
+
+class OfflineRenderer:
+    """
+    Headless, faster than real time processing and analysis of a whole file.
+    Decoded blocks of block_frames run through the same apply_transformations
+    chain as playback, and the processed audio is framed, transformed and
+    reduced to bars and onset strengths in batches by the TimelineBuilder.
+    Smoothing, beat flags and tempo then follow frame by frame, one frame
+    every hop_size samples of processed audio. Nothing waits on a clock.
+
+    Writes into out_dir:
+        audio.wav       processed audio (16-bit), unless write_audio is False
+        times.npy       (frames,) seconds of processed audio at each frame's end
+        bars.npy        smoothed bars, 0..1, (frames, num_bars) or (frames, channels, num_bars)
+        bars_raw.npy    the bars before smoothing and auto-gain
+        peaks.npy       peak markers, same shape as bars
+        onsets.npy      (frames, bands) onset strengths
+        beats.npy       (frames,) bool, an onset in the lowest band
+        tempo.npy       (frames, 3) bpm, confidence, beat phase
+        render.json     analysis parameters, frame count and durations
+    """
+    def __init__(self, config_manager, block_frames=65536):
+        self.config_manager = config_manager
+        self.block_frames = block_frames
+        self.processor = AudioProcessor(config_manager)
+        self.sample_rate = self.processor.sample_rate
+        self.channels = self.processor.channels
+        self.pcm_cache = None
+        if config_manager.get('cache.pcm', True):
+            self.pcm_cache = PCMCache(
+                config_manager.get('cache.pcm_dir', '~/.cache/audiovisualizer/pcm'),
+                int(config_manager.get('cache.pcm_max_mb', 2048) * 1024 * 1024)
+            )
+
+    def render(self, path, out_dir, write_audio=True, blocks=None, progress=None):
+        """
+        Process and analyse path into out_dir.
+        blocks: optional iterable of decoded int16 blocks to use instead of decoding path
+        progress: optional callable(source_seconds) after every block
+        returns: the render.json summary
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        if blocks is None:
+            blocks = file_blocks(path, self.sample_rate, self.channels, self.block_frames, self.pcm_cache)
+        params = self.processor.analysis_params()
+        raw_bars = os.path.join(out_dir, 'bars_raw.npy')
+        onsets_path = os.path.join(out_dir, 'onsets.npy')
+        builder = TimelineBuilder(params, raw_bars, onsets_path)
+        wav = None
+        if write_audio:
+            wav = wave.open(os.path.join(out_dir, 'audio.wav'), 'wb')
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(2) # 16-bit
+            wav.setframerate(self.sample_rate)
+
+        started = time.perf_counter()
+        source_frames = 0
+        output_frames = 0
+        try:
+            for block in blocks:
+                processed = self.processor.apply_transformations(block)
+                if wav:
+                    wav.writeframes(quantize(processed).tobytes())
+                builder.feed(processed)
+                source_frames += len(block) // self.channels
+                output_frames += len(processed) // self.channels
+                if progress:
+                    progress(source_frames / self.sample_rate)
+            num_frames = builder.finish()
+        except BaseException:
+            builder.abort()
+            raise
+        finally:
+            if wav:
+                wav.close()
+
+        self._frame_features(raw_bars, onsets_path, out_dir)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            'source': os.path.abspath(path),
+            'frames': num_frames,
+            'frame_rate': self.sample_rate / params['hop_size'],
+            'source_seconds': source_frames / self.sample_rate,
+            'output_seconds': output_frames / self.sample_rate,
+            'render_seconds': round(elapsed, 3),
+            'processing': dict(self.config_manager.get('processing', {})),
+            'analysis': {k: list(v) if isinstance(v, tuple) else v for k, v in params.items()},
+            'tempo_columns': ['bpm', 'confidence', 'phase'],
+        }
+        with open(os.path.join(out_dir, 'render.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Rendered {path}: {summary['source_seconds']:.1f}s of audio, {num_frames} frames in {elapsed:.1f}s")
+        return summary
+
+    def _frame_features(self, raw_bars, onsets_path, out_dir, batch=4096):
+        """
+        Smoothing, beat flags and tempo over the batch analysis, streamed through memory-mapped outputs.
+        """
+        processor = self.processor
+        visualizer = self.config_manager.snapshot.visualizer
+        bars = np.load(raw_bars, mmap_mode='r')
+        onsets = np.load(onsets_path, mmap_mode='r')
+        num_frames = len(bars)
+        frame_rate = processor.stft.frame_rate
+        smoother = BarSmoother(
+            frame_rate,
+            attack=self.config_manager.get('visualizer.bar_attack', 0.01),
+            release=self.config_manager.get('visualizer.bar_release', 0.2),
+            peak_hold=self.config_manager.get('visualizer.peak_hold', 0.4),
+            peak_release=self.config_manager.get('visualizer.peak_release', 0.8),
+            gain_release=self.config_manager.get('visualizer.gain_release', 4.0)
+        )
+        tempo = processor.tempo
+
+        np.save(os.path.join(out_dir, 'times.npy'), (np.arange(1, num_frames + 1) * processor.hop_size / self.sample_rate))
+        np.save(os.path.join(out_dir, 'beats.npy'), np.asarray(onsets[:, 0] > visualizer.beat_threshold))
+        if num_frames == 0:
+            for name, shape in (('bars', bars.shape), ('peaks', bars.shape), ('tempo', (0, 3))):
+                np.save(os.path.join(out_dir, name + '.npy'), np.zeros(shape, dtype=np.float32))
+            return
+        smoothed = np.lib.format.open_memmap(os.path.join(out_dir, 'bars.npy'), mode='w+', dtype=np.float32, shape=bars.shape)
+        peaks = np.lib.format.open_memmap(os.path.join(out_dir, 'peaks.npy'), mode='w+', dtype=np.float32, shape=bars.shape)
+        tempo_track = np.lib.format.open_memmap(os.path.join(out_dir, 'tempo.npy'), mode='w+', dtype=np.float32, shape=(num_frames, 3))
+        for start in range(0, num_frames, batch):
+            # One batch of the mapped inputs in memory at a time
+            bar_batch = np.asarray(bars[start:start + batch])
+            strengths = np.asarray(onsets[start:start + batch]).mean(axis=1)
+            for i in range(len(bar_batch)):
+                smoothed[start + i], peaks[start + i] = smoother.process(bar_batch[i])
+                tempo.update(strengths[i])
+                state = tempo.state()
+                tempo_track[start + i] = (state['bpm'], state['confidence'], state['phase'])
+        for array in (smoothed, peaks, tempo_track):
+            array.flush()
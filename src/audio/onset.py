@@ -0,0 +1,85 @@
+import numpy as np
+
+DEFAULT_BANDS = [[20, 150], [150, 2000], [2000, 8000]]
+
+def band_weights(bands, frequencies):
+    """
+    (bands, bins) matrix averaging a spectrum over each band's bins.
+    """
+    bands = np.asarray(bands, dtype=np.float64)
+    weights = ((frequencies >= bands[:, 0:1]) & (frequencies < bands[:, 1:2])).astype(np.float64)
+    weights /= np.maximum(weights.sum(axis=1, keepdims=True), 1)
+    return weights
+
+class OnsetDetector:
+    """
+    Multi-band positive spectral-flux onset detector.
+    Flux for every band is computed in one matrix-vector product and compared
+    with its running mean over a fixed-size ring buffer. The history is given
+    in seconds and sized from the analysis frame rate.
+    """
+    def __init__(self, frame_rate, bands=None, history_seconds=1.0):
+        self.bands = np.asarray(bands if bands is not None else DEFAULT_BANDS, dtype=np.float64)
+        self.frame_rate = frame_rate
+        self.history_len = max(1, int(round(history_seconds * frame_rate)))
+
+        num_bands = len(self.bands)
+        self.history = np.zeros((self.history_len, num_bands))
+        self.running_sum = np.zeros(num_bands)
+        self.count = 0
+        self.pos = 0
+
+        self.previous = None
+        self.weights = None
+        self.weights_key = None
+
+    def reset(self):
+        self.history.fill(0)
+        self.running_sum.fill(0)
+        self.count = 0
+        self.pos = 0
+        self.previous = None
+
+    def _band_weights(self, frequencies):
+        """
+        (bands, bins) matrix averaging the flux over each band's bins, cached per frequency axis.
+        """
+        key = (len(frequencies), frequencies[0], frequencies[-1]) if len(frequencies) else (0,)
+        if key != self.weights_key:
+            self.weights = band_weights(self.bands, frequencies)
+            self.weights_key = key
+            self.previous = None
+        return self.weights
+
+    def process(self, magnitudes, frequencies):
+        """
+        Feed one spectrum frame; (bins,) or (channels, bins) with channels averaged.
+        returns: per-band onset strength (flux / running mean flux); 0 until history exists
+        """
+        weights = self._band_weights(frequencies)
+        if magnitudes.ndim > 1:
+            magnitudes = magnitudes.mean(axis=0)
+
+        if self.previous is None:
+            self.previous = np.array(magnitudes, dtype=np.float64)
+            flux = np.zeros(len(self.bands))
+        else:
+            flux = weights @ np.maximum(magnitudes - self.previous, 0)
+            self.previous[:] = magnitudes
+
+        if self.count:
+            mean = self.running_sum / self.count
+            strengths = np.divide(flux, mean, out=np.zeros_like(flux), where=mean > 0)
+        else:
+            strengths = np.zeros_like(flux)
+
+        # Ring buffer update with O(1) running sums
+        self.running_sum += flux - self.history[self.pos]
+        self.history[self.pos] = flux
+        self.pos = (self.pos + 1) % self.history_len
+        self.count = min(self.count + 1, self.history_len)
+        if self.pos == 0:
+            # Re-sync once per lap so floating point drift cannot accumulate
+            self.running_sum[:] = self.history.sum(axis=0)
+
+        return strengths
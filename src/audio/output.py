@@ -1,43 +1,138 @@
 import pyaudio
+import threading
+import time
 import numpy as np
 from utils.logger import logger
+from .bus import quantize
+from .ringbuffer import SPSCRing
 
 class AudioOutput:
-    def __init__(self, config):
+    """
+    Callback-mode playback from a preallocated jitter buffer.
+    play() quantizes a chunk into an SPSCRing, and the PortAudio callback pulls
+    from it. Output starts once target_latency seconds are buffered. When the
+    buffer runs dry the callback emits silence, counts an underrun and
+    re-primes, so a late producer (GC pause, slow broadcast) costs one gap
+    instead of a blocked device write.
+    """
+    def __init__(self, config, stream_factory=None):
         self.config = config
         self.sample_rate = config.get('audio.sample_rate', 44100)
         self.channels = config.get('audio.channels', 1)
         self.chunk_size = config.get('audio.chunk_size', 1024)
+        self.pcm = np.empty(0, dtype=np.int16)
+
+        # Jitter buffer: filled up to the target, plus one chunk of headroom for the producer
+        self.target = max(self.chunk_size, int(config.get('audio.target_latency', 0.1) * self.sample_rate)) * self.channels
+        self.ring = SPSCRing(self.target + self.chunk_size * self.channels)
+        self.space_ready = threading.Event()
+        self.primed = False
+        self.flush_requested = False
+        self.callback_pcm = np.zeros(self.chunk_size * self.channels, dtype=np.int16)
+
+        # Metrics
+        self.underruns = 0
+        self.underrun_samples = 0
+        self.overruns = 0 # chunks cut short because the buffer stayed full
+        self.device_underflows = 0 # underflows reported by PortAudio itself
+
+        self.p = None
+        self.stream = None
         try:
-            self.p = pyaudio.PyAudio()
-            self.stream = self.p.open(
-                format=pyaudio.paInt16,
-                channels=self.channels,
-                rate=self.sample_rate,
-                output=True,
-                frames_per_buffer=self.chunk_size
-            )
+            if stream_factory is None:
+                self.p = pyaudio.PyAudio()
+                stream_factory = self._open_stream
+            self.stream = stream_factory(self._pull)
+            self.stream.start_stream()
             logger.info("Audio output stream opened successfully")
         except Exception as e:
             logger.error(f"Failed to initialize AudioOutput: {e}")
-            self.p = None
             self.stream = None
 
-    def play(self, data):
+    def _open_stream(self, callback):
+        return self.p.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            output=True,
+            frames_per_buffer=self.chunk_size,
+            stream_callback=callback,
+            start=False
+        )
+
+    def _pull(self, in_data, frame_count, time_info, status):
+        # PortAudio thread: copy out of the jitter buffer, never wait
+        if len(self.callback_pcm) < frame_count * self.channels:
+            self.callback_pcm = np.zeros(frame_count * self.channels, dtype=np.int16)
+        out = self.callback_pcm[:frame_count * self.channels]
+        out.fill(0)
+        if self.flush_requested:
+            self.ring.clear()
+            self.flush_requested = False
+            self.primed = False
+        if status & pyaudio.paOutputUnderflow:
+            self.device_underflows += 1
+        if not self.primed and self.ring.available() >= self.target:
+            self.primed = True
+        if self.primed:
+            n = self.ring.read(len(out), out)
+            if n < len(out):
+                self.underruns += 1
+                self.underrun_samples += len(out) - n
+                self.primed = False
+            self.space_ready.set()
+        return (out.tobytes(), pyaudio.paContinue)
+
+    def play(self, data, timeout=0.5):
         """
-        Play a chunk of audio data.
-        data: numpy array (int16)
+        Queue a chunk of audio data for playback, waiting (up to timeout) for buffer space.
+        data: float32 bus chunk (int16 full scale) or int16; quantized here
+        The chunk is written as space frees up, so chunks longer than the
+        headroom (pitch/timescale) still fill the buffer up to the target.
         """
         if not self.stream:
             return
-            
-        try:
-            self.stream.write(data.tobytes())
-        except Exception as e:
-            logger.error(f"Error writing to audio output stream: {e}")
+
+        if len(self.pcm) < len(data):
+            self.pcm = np.empty(len(data), dtype=np.int16)
+        pcm = quantize(data, out=self.pcm[:len(data)])
+        deadline = time.monotonic() + timeout
+        written = self.ring.write(pcm)
+        while written < len(pcm):
+            if time.monotonic() >= deadline:
+                # Drop the rest of the chunk
+                self.overruns += 1
+                return
+            self.space_ready.wait(0.01)
+            self.space_ready.clear()
+            written += self.ring.write(pcm[written:])
+
+    def flush(self):
+        """
+        Drop buffered audio (applied by the callback, which then re-primes).
+        """
+        self.flush_requested = True
+
+    def stats(self):
+        """
+        Jitter buffer fill (0..1 of the target), output latency in ms (buffer plus device) and underrun counts.
+        """
+        buffered = self.ring.available()
+        device = 0.0
+        if self.stream is not None and hasattr(self.stream, 'get_output_latency'):
+            device = self.stream.get_output_latency()
+        return {
+            "fill": round(buffered / self.target, 3),
+            "latency_ms": round((buffered / self.channels / self.sample_rate + device) * 1000, 1),
+            "underruns": self.underruns,
+            "underrun_ms": round(self.underrun_samples / self.channels / self.sample_rate * 1000, 1),
+            "overruns": self.overruns,
+            "device_underflows": self.device_underflows,
+        }
 
     def stop(self):
         logger.info("Stopping AudioOutput")
+        logger.info(f"Output stats: {self.stats()}")
         if self.stream:
             try:
                 self.stream.stop_stream()
@@ -49,4 +144,3 @@ class AudioOutput:
                 self.p.terminate()
             except Exception as e:
                 logger.error(f"Error terminating PyAudio in AudioOutput: {e}")
-
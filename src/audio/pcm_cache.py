@@ -0,0 +1,84 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+from utils.logger import logger
+
+class PCMCache:
+    """
+    Size-bounded on-disk LRU cache of decoded int16 PCM.
+    Each entry is a raw interleaved .pcm file keyed by (path, mtime, size,
+    sample_rate, channels) and opened as a read-only np.memmap, so a hit
+    starts playback without decoding or reading the track into RAM.
+    Recency is the entry's mtime, refreshed on every hit; filling an entry
+    evicts the least recently used ones until the total fits max_bytes.
+    """
+    def __init__(self, directory, max_bytes):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+
+    def _entry(self, path, sample_rate, channels):
+        stat = os.stat(path)
+        ident = repr((os.path.abspath(path), stat.st_mtime_ns, stat.st_size, sample_rate, channels))
+        return os.path.join(self.directory, hashlib.sha1(ident.encode()).hexdigest()[:24] + '.pcm')
+
+    def open(self, path, sample_rate, channels):
+        """
+        Memory-map a cached track, or return None on a miss.
+        """
+        entry = self._entry(path, sample_rate, channels)
+        try:
+            size = os.path.getsize(entry)
+            os.utime(entry) # mark as most recently used
+        except OSError:
+            return None
+        if size == 0:
+            return np.zeros(0, dtype=np.int16)
+        return np.memmap(entry, dtype=np.int16, mode='r')
+
+    def fill(self, path, sample_rate, channels, blocks):
+        """
+        Store decoded int16 blocks as the entry for path, then enforce the size bound.
+        The entry only appears once complete, so an interrupted fill leaves no partial track.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._entry(path, sample_rate, channels)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in blocks:
+                    f.write(np.ascontiguousarray(block, dtype=np.int16).tobytes())
+            os.replace(tmp, entry)
+        except Exception as e:
+            logger.error(f"Error caching decoded PCM for {path}: {e}")
+            os.remove(tmp)
+            return None
+        self.evict(keep=entry)
+        return entry
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache fits max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pcm'):
+                continue
+            full = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(full)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, full))
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if full == keep:
+                continue
+            try:
+                # Open memmaps of an evicted track stay valid until closed
+                os.remove(full)
+                total -= size
+            except OSError:
+                pass
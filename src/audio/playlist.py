@@ -0,0 +1,103 @@
+import threading
+
+class Playlist:
+    """
+    Thread-safe track queue shared by PlaylistInput and the control surfaces.
+    Edits bump `version` so the input can re-check what it has prefetched;
+    a skip request is a flag the input consumes on its next chunk.
+    """
+    def __init__(self, tracks=None):
+        self.tracks = list(tracks or [])
+        self.current = -1 # index of the playing track, -1 before the first
+        self.version = 0
+        self.skip_requested = False
+        self.lock = threading.Lock()
+
+    def _changed(self):
+        self.version += 1
+
+    def enqueue(self, path, index=None):
+        """
+        Insert a track (appended by default); the playing track keeps playing.
+        """
+        with self.lock:
+            if index is None or index > len(self.tracks):
+                index = len(self.tracks)
+            index = max(0, index)
+            self.tracks.insert(index, path)
+            if index <= self.current:
+                self.current += 1
+            self._changed()
+
+    def remove(self, index):
+        with self.lock:
+            if not 0 <= index < len(self.tracks) or index == self.current:
+                return False
+            del self.tracks[index]
+            if index < self.current:
+                self.current -= 1
+            self._changed()
+            return True
+
+    def reorder(self, src, dst):
+        """
+        Move the track at src to dst; `current` follows the playing track.
+        """
+        with self.lock:
+            if not (0 <= src < len(self.tracks) and 0 <= dst < len(self.tracks)):
+                return False
+            track = self.tracks.pop(src)
+            self.tracks.insert(dst, track)
+            if self.current == src:
+                self.current = dst
+            elif self.current >= 0:
+                # Positions between src and dst shift by one
+                if src < self.current <= dst:
+                    self.current -= 1
+                elif dst <= self.current < src:
+                    self.current += 1
+            self._changed()
+            return True
+
+    def skip(self):
+        with self.lock:
+            self.skip_requested = True
+            self._changed()
+
+    def take_skip(self):
+        with self.lock:
+            requested = self.skip_requested
+            self.skip_requested = False
+            return requested
+
+    def peek_next(self):
+        with self.lock:
+            index = self.current + 1
+            return self.tracks[index] if index < len(self.tracks) else None
+
+    def resume(self):
+        """
+        Path of the playing track, starting the queue if nothing has played yet.
+        """
+        with self.lock:
+            if self.current < 0:
+                if not self.tracks:
+                    return None
+                self.current = 0
+                self._changed()
+            return self.tracks[self.current]
+
+    def advance(self):
+        """
+        Move to the next track; returns its path, or None at the end of the queue.
+        """
+        with self.lock:
+            if self.current + 1 >= len(self.tracks):
+                return None
+            self.current += 1
+            self._changed()
+            return self.tracks[self.current]
+
+    def state(self):
+        with self.lock:
+            return {"tracks": list(self.tracks), "current": self.current}
@@ -1,7 +1,17 @@
 import numpy as np
 from scipy.fft import rfft, rfftfreq
-from scipy.interpolate import interp1d
-from scipy import signal
+from utils.logger import logger
+from .bus import BufferPool
+from .stft import STFTAnalyzer
+from .resampler import StreamingResampler
+from .timestretch import PhaseVocoder
+from .filters import FilterChain
+from .onset import OnsetDetector
+from .tempo import TempoTracker
+from .smoothing import BarSmoother
+from .filterbank import bar_filterbank, apply_filterbank, log_segments
+from .multires import MultiResolutionAnalyzer
+from .analysis_cache import AnalysisCache
 
 class AudioProcessor:
     def __init__(self, config_manager):
@@ -10,213 +20,471 @@ class AudioProcessor:
         self.fft_size = config_manager.get('visualizer.fft_size', 1024)
         self.freq_range = config_manager.get('visualizer.frequency_range', [20, 20000])
         self.channels = config_manager.get('audio.channels', 1)
+        self.fft_workers = config_manager.get('visualizer.fft_workers', None) # scipy.fft threads
+        self.hop_size = config_manager.get('visualizer.hop_size', None) or config_manager.get('audio.chunk_size', 1024)
         self.modulation_phase = 0.0
+        self.params_version = None
         
-        # Filter states
-        self.lpf_zi = None
-        self.hpf_zi = None
-        self.last_lpf_cutoff = None
-        self.last_hpf_cutoff = None
+        # Float32 bus scratch buffers, reused across chunks
+        self.buffers = BufferPool()
+        self.ramp = np.zeros(0, dtype=np.float32)
+        
+        # Pitch = time-stretch by pitch/timescale, then resample by pitch
+        self.stretcher = PhaseVocoder(config_manager.get('processing.stretch_fft_size', 2048), channels=self.channels)
+        self.stretcher_active = False
+        self.resampler = StreamingResampler(channels=self.channels)
+        self.resampler_active = False
+        
+        # Filter chain (LRU-cached SOS designs)
+        self.filters = FilterChain(self.sample_rate, channels=self.channels)
         
         # FFT Caching
         self.cached_window = None
         self.cached_frequencies = None
-        self.last_fft_len = 0
+        self.cached_mask = None
+        self.fft_cache_key = None
+
+        # Optional multi-resolution bars: [[fft_size, hop_size, max_freq], ...] over the STFT's ring
+        resolutions = config_manager.get('visualizer.resolutions', None)
+
+        # Streaming STFT (fft_size frames every hop_size samples, independent of chunk size)
+        self.stft = STFTAnalyzer(
+            self.fft_size,
+            self.hop_size,
+            self.sample_rate,
+            channels=self.channels,
+            window=config_manager.get('visualizer.window', 'hann'),
+            zero_pad=config_manager.get('visualizer.zero_pad', 1),
+            workers=self.fft_workers,
+            history=max((r[0] for r in resolutions or []), default=0)
+        )
+        self.multires = None
+        if resolutions:
+            self.multires = MultiResolutionAnalyzer(
+                self.stft.ring,
+                self.sample_rate,
+                resolutions,
+                window=config_manager.get('visualizer.window', 'hann'),
+                workers=self.fft_workers
+            )
+        self.stream_mask = None
+        self.stream_frequencies = None
+        self.stream_cache_key = None
         
-        # Peak tracking
-        self.peaks = None
-        self.peak_fall_speed = 0.95 # Factor to multiply peak by each frame
+        # Bar smoothing, peak hold and auto-gain (one bar frame per chunk that completes an STFT frame)
+        bar_rate = self.sample_rate / max(self.hop_size, config_manager.get('audio.chunk_size', 1024))
+        self.smoother = BarSmoother(
+            bar_rate,
+            attack=config_manager.get('visualizer.bar_attack', 0.01),
+            release=config_manager.get('visualizer.bar_release', 0.2),
+            peak_hold=config_manager.get('visualizer.peak_hold', 0.4),
+            peak_release=config_manager.get('visualizer.peak_release', 0.8),
+            gain_release=config_manager.get('visualizer.gain_release', 4.0)
+        )
+
+        # Beat detection (history sized from the STFT frame rate)
+        self.onset_detector = OnsetDetector(
+            self.stft.frame_rate,
+            bands=config_manager.get('visualizer.onset_bands', None),
+            history_seconds=config_manager.get('visualizer.onset_history', 1.0)
+        )
+        self.beat_threshold = config_manager.get('visualizer.beat_threshold', 1.3)
+        self.tempo = TempoTracker(
+            self.stft.frame_rate,
+            window_seconds=config_manager.get('visualizer.tempo_window', 8.0),
+            update_interval=config_manager.get('visualizer.tempo_update', 0.5),
+            bpm_range=config_manager.get('visualizer.tempo_range', [60, 200])
+        )
 
-        # Beat detection
-        self.energy_history = []
-        self.history_size = 43 # roughly 1 second at 43 fps
-        self.beat_threshold = 1.3
+        # Precomputed analysis timelines for file playback, looked up by source position
+        self.analysis_cache = None
+        if config_manager.get('cache.analysis', True):
+            self.analysis_cache = AnalysisCache(config_manager.get('cache.analysis_dir', '~/.cache/audiovisualizer/analysis'))
+        self.timeline = None
+        self.timeline_index = -1
+        self.timeline_generation = 0 # bumped by clear_timeline; timelines of older tracks are stale
 
-    def detect_beat(self, magnitudes, frequencies):
+    def detect_beat(self, spectra, frequencies):
         """
-        Simple beat detection based on low-frequency energy.
+        Multi-band spectral-flux onset detection.
+        spectra: one frame (bins,)/(channels, bins) or a stack of frames from process_stream
+        returns: is_beat (onset in the lowest band on any frame), per-band strengths of the newest frame
         """
-        # Focus on 20Hz - 150Hz
-        mask = (frequencies >= 20) & (frequencies <= 150)
-        low_energy = np.mean(magnitudes[mask]) if np.any(mask) else 0
-        
+        if spectra.ndim == 1 or (spectra.ndim == 2 and self.channels > 1):
+            spectra = spectra[np.newaxis]
+
         is_beat = False
-        if len(self.energy_history) > 0:
-            avg_energy = np.mean(self.energy_history)
-            if low_energy > avg_energy * self.beat_threshold:
-                is_beat = True
-                
-        self.energy_history.append(low_energy)
-        if len(self.energy_history) > self.history_size:
-            self.energy_history.pop(0)
-            
-        return is_beat
+        strengths = np.zeros(len(self.onset_detector.bands))
+        for frame in spectra:
+            strengths = self.onset_detector.process(frame, frequencies)
+            self.tempo.update(strengths.mean())
+            is_beat = is_beat or bool(strengths[0] > self.beat_threshold)
+        return is_beat, strengths
+
+    def reset_transformations(self):
+        """
+        Drop the stretch, resample, modulation and filter history, e.g. after a seek.
+        Call from the thread that runs apply_transformations.
+        """
+        self.stretcher.reset()
+        self.resampler.reset()
+        self.filters.reset()
+        self.modulation_phase = 0.0
+
+    def reset_analysis(self):
+        """
+        Drop STFT, onset, tempo and smoothing history so no frame mixes audio from before a seek.
+        Call from the thread that runs the analysis.
+        """
+        self.stft.reset()
+        if self.multires is not None:
+            self.multires.reset()
+        self.onset_detector.reset()
+        self.tempo.reset()
+        self.smoother.reset()
+        self.timeline_index = -1
+
+    def analysis_params(self):
+        """
+        Everything a precomputed timeline depends on, as a flat dict.
+        """
+        visualizer = self.config_manager.snapshot.visualizer
+        return {
+            'sample_rate': self.sample_rate,
+            'channels': self.channels,
+            'fft_size': self.fft_size,
+            'hop_size': self.hop_size,
+            'window': visualizer.window,
+            'zero_pad': visualizer.zero_pad,
+            'num_bars': visualizer.num_bars,
+            'bar_scale': visualizer.bar_scale,
+            'freq_range': tuple(self.freq_range),
+            'resolutions': tuple(tuple(r) for r in visualizer.resolutions) if self.multires is not None else None,
+            'onset_bands': tuple(map(tuple, self.onset_detector.bands.tolist())),
+            'history_frames': self.onset_detector.history_len,
+        }
+
+    def prepare_timeline(self, path, open_blocks, generation=None):
+        """
+        Open (or build, on a miss) the analysis timeline of a file.
+        open_blocks() yields the decoded track in blocks; building is a full
+        batch pass, so callers run this off the audio thread.
+        generation: clear_timeline()'s value when the track was opened (default: now);
+        a timeline finished after another track was opened is discarded.
+        returns: the timeline, None on errors or when it is stale
+        """
+        if self.analysis_cache is None:
+            return None
+        if generation is None:
+            generation = self.timeline_generation
+        try:
+            timeline = self.analysis_cache.get(path, open_blocks, self.analysis_params())
+        except Exception as e:
+            logger.error(f"Error preparing analysis timeline for {path}: {e}")
+            return None
+        if generation != self.timeline_generation:
+            logger.debug(f"Discarding stale analysis timeline for {path}")
+            return None
+        timeline.generation = generation
+        self.timeline_index = -1
+        self.timeline = timeline
+        return timeline
+
+    def load_timeline(self, path):
+        """
+        Open a timeline another process has already built; None on a miss.
+        """
+        if self.analysis_cache is None:
+            return None
+        timeline = self.analysis_cache.load(path, self.analysis_params())
+        if timeline is not None:
+            timeline.generation = self.timeline_generation
+        self.timeline_index = -1
+        self.timeline = timeline
+        return timeline
+
+    def clear_timeline(self):
+        """
+        Drop the timeline of the previous track.
+        returns: the new generation, to pass to prepare_timeline for the next track
+        """
+        self.timeline_generation += 1
+        self.timeline = None
+        self.timeline_index = -1
+        return self.timeline_generation
+
+    def _current_timeline(self):
+        """
+        The timeline of the current track; None if there is none or it belongs to an earlier one.
+        """
+        timeline = self.timeline
+        if timeline is None or getattr(timeline, 'generation', None) != self.timeline_generation:
+            return None
+        return timeline
+
+    def timeline_active(self):
+        """
+        True when the timeline matches the current analysis parameters and the
+        processing chain leaves the spectrum in the visualized range unchanged
+        (volume and timescale only), so cached frames equal live analysis.
+        """
+        timeline = self._current_timeline()
+        if timeline is None or timeline.params != self.analysis_params():
+            return False
+        params = self._processing_params()
+        return (self.pitch == 1.0 and params.modulation_freq <= 0
+                and params.lpf_cutoff >= self.freq_range[1] and params.hpf_cutoff <= self.freq_range[0])
+
+    def timeline_frame(self, position):
+        """
+        Cached bars and onsets at a source position (frames), replacing STFT + bars + onsets.
+        Onset strengths of every frame since the previous lookup feed the beat flag and tempo tracker.
+        returns: bars, is_beat, per-band strengths of the newest frame; None when the timeline is gone or stale
+        """
+        timeline = self._current_timeline()
+        if timeline is None:
+            return None
+        index = timeline.frame_index(position)
+        if index < 0:
+            bar_shape = timeline.bars.shape[1:]
+            return np.zeros(bar_shape, dtype=np.float32), False, np.zeros(timeline.onsets.shape[1], dtype=np.float32)
+
+        # New frames since the last lookup; a backwards jump (seek, restart) only contributes the current one
+        first = self.timeline_index + 1 if 0 <= self.timeline_index <= index else index
+        strengths = np.asarray(timeline.onsets[first:index + 1])
+        for value in strengths.mean(axis=1):
+            self.tempo.update(value)
+        self.timeline_index = index
+        is_beat = bool(np.any(strengths[:, 0] > self.beat_threshold))
+        return np.array(timeline.bars[index]), is_beat, np.array(timeline.onsets[index])
+
+    def analyze(self, data, position=None):
+        """
+        One visualization frame from a processed chunk: a timeline lookup for file
+        playback with a usable precomputed timeline, streaming analysis otherwise.
+        returns: smoothed bars, peaks, is_beat, onsets; None when no STFT frame completed
+        """
+        frame = None
+        if position is not None and self.timeline_active():
+            # No FFTs: frame looked up by source position (None if the track changed meanwhile)
+            frame = self.timeline_frame(position)
+        if frame is not None:
+            bars, is_beat, onsets = frame
+        else:
+            # Streaming STFT; chunks shorter than the hop may not complete a frame
+            spectra, frequencies = self.process_stream(data)
+            if len(spectra) == 0:
+                return None
+            # Multi-band onset detection over every new frame (channels averaged)
+            is_beat, onsets = self.detect_beat(spectra, frequencies)
+            visualizer = self.config_manager.snapshot.visualizer
+            bars = self.stream_bars(spectra, frequencies, num_bars=visualizer.num_bars, scale=visualizer.bar_scale)
+        bars, peaks = self.smooth_bars(bars)
+        return bars, peaks, is_beat, onsets
+
+    def _processing_params(self):
+        """
+        Current processing parameters; derived values are recomputed only when the snapshot version changes.
+        """
+        snapshot = self.config_manager.snapshot
+        if snapshot.version != self.params_version:
+            params = snapshot.processing
+            # Timescale changes duration only, pitch changes frequency only
+            self.pitch = params.pitch if params.pitch > 0 else 1.0
+            timescale = params.timescale if params.timescale > 0 else 1.0
+            self.stretch = round(self.pitch / timescale, 6)
+            self.params = params
+            self.params_version = snapshot.version
+        return self.params
 
     def apply_transformations(self, data):
         """
         Apply volume, pitch, timescale, and modulation transformations.
+        data: int16 or float32 samples, interleaved if multi-channel
+        returns: float32 bus chunk (int16 full scale). The array is reused by the
+            processor and only valid until the next call; copy it to keep it.
         """
-        volume = self.config_manager.get('processing.volume', 1.0)
-        pitch = self.config_manager.get('processing.pitch', 1.0)
-        timescale = self.config_manager.get('processing.timescale', 1.0)
-        modulation_freq = self.config_manager.get('processing.modulation_freq', 0.0)
-        modulation_type = self.config_manager.get('processing.modulation_type', 'ring')
+        # One snapshot per chunk: consistent values, no per-key string parsing
+        params = self._processing_params()
+        pitch = self.pitch
+        stretch = self.stretch
         
-        # Combined resampling factor
-        resample_factor = pitch * timescale
+        # Copy into the float32 bus (int16 full scale), reshaped if multi-channel
+        num_frames = len(data) // self.channels
+        audio_float = self.buffers.get('input', num_frames, self.channels)
+        np.copyto(audio_float, data.reshape(audio_float.shape), casting='unsafe')
         
-        # Convert to float for processing
-        audio_float = data.astype(np.float32)
-        
-        # Reshape if multi-channel
-        if self.channels > 1:
-            audio_float = audio_float.reshape(-1, self.channels)
+        # Apply Time-Stretch (duration changes by pitch / timescale, pitch unchanged)
+        if stretch != 1.0:
+            audio_float = self.stretcher.process(audio_float, stretch)
+            self.stretcher_active = True
+        elif self.stretcher_active:
+            self.stretcher.reset()
+            self.stretcher_active = False
         
-        # Apply Resampling (Pitch + Timescale)
-        if resample_factor != 1.0 and resample_factor > 0:
-            num_samples = len(audio_float)
-            old_indices = np.arange(num_samples)
-            new_indices = np.arange(0, num_samples, resample_factor)
-            
-            if self.channels > 1:
-                # Interp each channel separately
-                new_audio = np.zeros((len(new_indices), self.channels), dtype=np.float32)
-                for i in range(self.channels):
-                    new_audio[:, i] = np.interp(new_indices, old_indices, audio_float[:, i])
-                audio_float = new_audio
-            else:
-                audio_float = np.interp(new_indices, old_indices, audio_float)
+        # Apply Resampling (shifts pitch and undoes the stretch's duration change)
+        if pitch != 1.0:
+            audio_float = self.resampler.process(audio_float, pitch)
+            self.resampler_active = True
+        elif self.resampler_active:
+            # Bypassed: restart cleanly the next time resampling kicks in
+            self.resampler.reset()
+            self.resampler_active = False
         
         # Apply Modulation
+        modulation_freq = params.modulation_freq
         if modulation_freq > 0:
             num_samples = len(audio_float)
             # Maintain phase to avoid clicks
-            t = np.arange(num_samples) / self.sample_rate
-            phase_step = 2 * np.pi * modulation_freq
-            carrier = np.sin(self.modulation_phase + phase_step * t)
-            self.modulation_phase = (self.modulation_phase + phase_step * num_samples / self.sample_rate) % (2 * np.pi)
+            phase_step = 2 * np.pi * modulation_freq / self.sample_rate
+            carrier = self.buffers.get('carrier', num_samples)
+            np.multiply(self._ramp(num_samples), phase_step, out=carrier)
+            carrier += self.modulation_phase
+            np.sin(carrier, out=carrier)
+            self.modulation_phase = (self.modulation_phase + phase_step * num_samples) % (2 * np.pi)
             
             if self.channels > 1:
                 carrier = carrier.reshape(-1, 1) # Broadcast across channels
             
-            if modulation_type == 'am':
-                audio_float = audio_float * (0.5 + 0.5 * carrier)
-            else: # 'ring'
-                audio_float *= carrier
+            if params.modulation_type == 'am':
+                carrier *= 0.5
+                carrier += 0.5
+            # 'ring' multiplies by the raw carrier
+            audio_float *= carrier
         else:
             self.modulation_phase = 0.0 # Reset phase if modulation is off
 
-        # Apply Filters
-        lpf_cutoff = self.config_manager.get('processing.lpf_cutoff', 20000.0)
-        hpf_cutoff = self.config_manager.get('processing.hpf_cutoff', 0.0)
-
-        # Low Pass Filter
-        if lpf_cutoff < self.sample_rate / 2:
-            if lpf_cutoff != self.last_lpf_cutoff:
-                # Design filter
-                b, a = signal.butter(4, lpf_cutoff, btype='low', fs=self.sample_rate)
-                self.lpf_b, self.lpf_a = b, a
-                # Initialize zi for all channels
-                self.lpf_zi = signal.lfilter_zi(b, a)
-                if self.channels > 1:
-                    self.lpf_zi = np.tile(self.lpf_zi, (self.channels, 1)).T
-                self.last_lpf_cutoff = lpf_cutoff
-            
-            audio_float, self.lpf_zi = signal.lfilter(self.lpf_b, self.lpf_a, audio_float, axis=0, zi=self.lpf_zi)
-
-        # High Pass Filter
-        if hpf_cutoff > 0:
-            if hpf_cutoff != self.last_hpf_cutoff:
-                # Design filter
-                b, a = signal.butter(4, hpf_cutoff, btype='high', fs=self.sample_rate)
-                self.hpf_b, self.hpf_a = b, a
-                # Initialize zi for all channels
-                self.hpf_zi = signal.lfilter_zi(b, a)
-                if self.channels > 1:
-                    self.hpf_zi = np.tile(self.hpf_zi, (self.channels, 1)).T
-                self.last_hpf_cutoff = hpf_cutoff
-            
-            audio_float, self.hpf_zi = signal.lfilter(self.hpf_b, self.hpf_a, audio_float, axis=0, zi=self.hpf_zi)
+        # Apply Filters (LPF + HPF as one SOS cascade, state kept across cutoff changes)
+        audio_float = self.filters.process(audio_float, params.lpf_cutoff, params.hpf_cutoff)
         
         # Apply Volume
-        if volume != 1.0:
-            audio_float *= volume
+        if params.volume != 1.0:
+            audio_float *= params.volume
             
-        # Flatten back if multi-channel
+        # Flatten back to interleaved (a view unless a stage produced a transposed layout)
         if self.channels > 1:
-            audio_float = audio_float.flatten()
+            audio_float = audio_float.reshape(-1)
             
-        # Clip and convert back to int16
-        return np.clip(audio_float, -32768, 32767).astype(np.int16)
+        # Stays float32; quantization happens in AudioOutput.play / AudioRecorder.write
+        return audio_float
+
+    def _ramp(self, length):
+        """
+        Cached 0..length-1 sample index ramp for the modulation carrier.
+        """
+        if len(self.ramp) < length:
+            self.ramp = np.arange(max(length, 2 * len(self.ramp)), dtype=np.float32)
+        return self.ramp[:length]
 
     def process_fft(self, data):
         """
         Perform FFT on the audio data.
-        data: numpy array (int16)
-        returns: magnitudes, frequencies (or list of magnitudes if multi-channel)
+        data: int16 samples or the float32 bus, interleaved if multi-channel
+        returns: magnitudes, frequencies
+            magnitudes is (bins,) for mono and (channels, bins) for multi-channel
         """
         if len(data) == 0:
             return np.array([]), np.array([])
             
         if self.channels == 1:
-            return self._fft_mono(data)
-        else:
-            # Process each channel separately
-            mags = []
-            freqs = None
-            for i in range(self.channels):
-                m, f = self._fft_mono(data[i::self.channels])
-                mags.append(m)
-                freqs = f
-            return mags, freqs
-
-    def _fft_mono(self, data):
-        if len(data) < 2:
+            return self._fft_frames(data)
+
+        # View interleaved samples as (frames, channels) without copying
+        usable = len(data) - len(data) % self.channels
+        frames = data[:usable].reshape(-1, self.channels)
+        magnitudes, frequencies = self._fft_frames(frames)
+        if magnitudes.ndim == 1:
+            return np.zeros((self.channels, 0)), frequencies
+        return magnitudes.T, frequencies
+
+    def process_stream(self, data):
+        """
+        Feed a chunk into the streaming STFT.
+        data: float32 bus (or int16) samples, interleaved if multi-channel
+        returns: spectra, frequencies
+            spectra holds every frame completed by this chunk, (frames, bins) for mono
+            or (frames, channels, bins), restricted to the frequency range
+        """
+        spectra = self.stft.push(data)
+        if self.multires is not None:
+            self.multires.update(data.size // self.channels)
+
+        key = (self.stft.n_fft, tuple(self.freq_range))
+        if key != self.stream_cache_key:
+            frequencies = self.stft.frequencies
+            self.stream_mask = (frequencies >= self.freq_range[0]) & (frequencies <= self.freq_range[1])
+            self.stream_frequencies = frequencies[self.stream_mask]
+            self.stream_cache_key = key
+
+        return spectra[..., self.stream_mask], self.stream_frequencies
+
+    def _fft_frames(self, frames):
+        """
+        Windowed real FFT along the time axis (axis 0) of a (frames,) or (frames, channels) array.
+        """
+        num_frames = len(frames)
+        if num_frames < 2:
             return np.array([]), np.array([])
             
-        # Cache window and frequencies if length changed
-        if len(data) != self.last_fft_len:
-            self.cached_window = np.hanning(len(data))
-            self.cached_frequencies = rfftfreq(len(data), 1 / self.sample_rate)
-            self.last_fft_len = len(data)
+        # Cache window, frequencies and range mask if length or range changed
+        key = (num_frames, tuple(self.freq_range), self.sample_rate)
+        if key != self.fft_cache_key:
+            self.cached_window = np.hanning(num_frames).astype(np.float32)
+            frequencies = rfftfreq(num_frames, 1 / self.sample_rate)
+            self.cached_mask = (frequencies >= self.freq_range[0]) & (frequencies <= self.freq_range[1])
+            self.cached_frequencies = frequencies[self.cached_mask]
+            self.fft_cache_key = key
             
-        # Windowing to reduce spectral leakage
-        windowed_data = data.astype(np.float32) * self.cached_window
+        # Windowing to reduce spectral leakage (broadcast across channels)
+        window = self.cached_window if frames.ndim == 1 else self.cached_window[:, np.newaxis]
+        windowed_data = frames * window
         
-        # Perform real FFT
-        fft_data = rfft(windowed_data)
-        magnitudes = np.abs(fft_data)
+        # Perform one real FFT over all channels
+        fft_data = rfft(windowed_data, axis=0, workers=self.fft_workers)
         
-        # Filter by frequency range
-        mask = (self.cached_frequencies >= self.freq_range[0]) & (self.cached_frequencies <= self.freq_range[1])
-        return magnitudes[mask], self.cached_frequencies[mask]
+        # Filter by frequency range before taking magnitudes
+        return np.abs(fft_data[self.cached_mask]), self.cached_frequencies
 
-    def get_bars(self, magnitudes, frequencies, num_bars=64):
+    def get_bars(self, magnitudes, frequencies, num_bars=64, scale='log'):
         """
         Group FFT results into bars for visualization.
+        magnitudes: (bins,) or (channels, bins); returns (num_bars,) or (channels, num_bars)
+        scale: 'log' (log-spaced bin index segments) or a perceptual filterbank: 'mel', 'bark', 'erb', 'cqt'
         """
-        if isinstance(magnitudes, list):
-            # Handle multi-channel
-            return [self._get_bars_mono(m, frequencies, num_bars) for m in magnitudes]
-        return self._get_bars_mono(magnitudes, frequencies, num_bars)
-
-    def _get_bars_mono(self, magnitudes, frequencies, num_bars=64):
-        if len(magnitudes) == 0:
-            return np.zeros(num_bars)
+        magnitudes = np.asarray(magnitudes)
+        num_bins = magnitudes.shape[-1]
+        if num_bins == 0:
+            return np.zeros(magnitudes.shape[:-1] + (num_bars,))
             
         # Logarithmic scaling for bars
         # Avoid log(0)
-        if len(magnitudes) < 2:
-             return np.full(num_bars, magnitudes[0] if len(magnitudes) > 0 else 0)
+        if num_bins < 2:
+            return np.repeat(magnitudes, num_bars, axis=-1)
+
+        if scale != 'log':
+            # Precomputed sparse filterbank, one product across all channels
+            bank = bar_filterbank(scale, frequencies, num_bars, self.freq_range)
+            return apply_filterbank(bank, magnitudes)
              
-        indices = np.round(np.logspace(0, np.log10(len(magnitudes)-1), num_bars+1)).astype(int)
-        bars = []
-        for i in range(num_bars):
-            start, end = indices[i], indices[i+1]
-            if start == end:
-                val = magnitudes[start] if start < len(magnitudes) else 0
-            else:
-                val = np.mean(magnitudes[start:end])
-            bars.append(val)
-            
-        return np.array(bars)
\ No newline at end of file
+        edges, widths = log_segments(num_bins, num_bars) # lru-cached per layout
+        # One segment sum per bar; reduceat yields magnitudes[start] for empty segments
+        sums = np.add.reduceat(magnitudes, edges, axis=-1)[..., :num_bars]
+        return sums / widths
+
+    def stream_bars(self, spectra, frequencies, num_bars=64, scale='log'):
+        """
+        Bars for the newest streamed frame.
+        Multi-resolution when visualizer.resolutions is set (the 'log' layout maps
+        to 'cqt' there, its frequency-spaced equivalent); otherwise get_bars on the
+        last STFT frame.
+        """
+        if self.multires is not None:
+            return self.multires.bars(num_bars, self.freq_range, 'cqt' if scale == 'log' else scale)
+        return self.get_bars(spectra[-1], frequencies, num_bars=num_bars, scale=scale)
+
+    def smooth_bars(self, bars):
+        """
+        Attack/release smoothing, peak hold and auto-gain for one bar frame.
+        returns: bars, peaks scaled to 0..1
+        """
+        return self.smoother.process(bars)
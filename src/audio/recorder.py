@@ -4,6 +4,7 @@ import time
 from utils.state import RecordingState
 
 from utils.logger import logger
+from .bus import quantize
 
 class AudioRecorder:
     def __init__(self, config_manager, state_machine=None):
@@ -54,8 +55,11 @@ class AudioRecorder:
             self.wave_file = None
 
     def write(self, data):
+        """
+        Append a float32 bus chunk (or int16) to the recording, quantized to 16-bit.
+        """
         if self.recording and self.wave_file:
-            self.wave_file.writeframes(data.tobytes())
+            self.wave_file.writeframes(quantize(data).tobytes())
 
     def toggle(self):
         if self.recording:
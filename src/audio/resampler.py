@@ -0,0 +1,103 @@
+import numpy as np
+from fractions import Fraction
+from functools import lru_cache
+
+@lru_cache(maxsize=32)
+def polyphase_kernels(num, den, half_taps=8, beta=8.0):
+    """
+    Kaiser-windowed sinc interpolation kernels for a read step of num/den input samples.
+    returns: (den, 2 * half_taps) float32 table, one row per fractional phase m/den
+    """
+    taps = 2 * half_taps
+    # Lower the cutoff when decimating to avoid aliasing
+    cutoff = min(1.0, den / num)
+    phases = np.arange(den)[:, np.newaxis] / den
+    offsets = np.arange(taps)[np.newaxis, :] - half_taps + 1 - phases
+    window = np.i0(beta * np.sqrt(np.clip(1 - (offsets / half_taps) ** 2, 0, None))) / np.i0(beta)
+    kernels = cutoff * np.sinc(cutoff * offsets) * window
+    # Unity DC gain for every phase
+    kernels /= kernels.sum(axis=1, keepdims=True)
+    return kernels.astype(np.float32)
+
+class StreamingResampler:
+    """
+    Stateful rational polyphase resampler.
+    Each output sample advances the read position by `ratio` input samples,
+    so ratio > 1 shortens the signal. The ratio is approximated by num/den and
+    the read position is tracked exactly in units of 1/den, carrying fractional
+    phase and filter history across chunk boundaries. Over any run of input
+    the output count is exactly ceil(total_input / ratio), delayed by
+    half_taps input samples of filter latency.
+    """
+    def __init__(self, channels=1, half_taps=8, max_denominator=1000):
+        self.channels = channels
+        self.half_taps = half_taps
+        self.taps = 2 * half_taps
+        self.max_denominator = max_denominator
+        self.num = 1
+        self.den = 1
+        self.ratio = None
+        self._allocate(self.taps)
+        self.out = np.empty((0, channels), dtype=np.float32)
+        self.reset()
+
+    def _allocate(self, length):
+        # Work buffer laid out (channels, samples) so every tap window is a contiguous row slice
+        self.work = np.zeros((self.channels, length), dtype=np.float32)
+        self.windows = np.lib.stride_tricks.sliding_window_view(self.work, self.taps, axis=1)
+
+    def reset(self):
+        """
+        Drop filter history and restart the read position.
+        """
+        self.work[:, :self.taps] = 0
+        # Read position (in 1/den units) relative to the start of the history;
+        # starting half_taps early gives every output a full window of input
+        self.position = (self.taps - self.half_taps) * self.den
+
+    def set_ratio(self, ratio):
+        if ratio == self.ratio:
+            return
+        frac = Fraction(ratio).limit_denominator(self.max_denominator)
+        # Carry the current read position over to the new denominator
+        self.position = round(self.position * frac.denominator / self.den)
+        self.num, self.den = frac.numerator, frac.denominator
+        self.ratio = ratio
+
+    def process(self, data, ratio):
+        """
+        Resample a chunk.
+        data: (frames,) for mono or (frames, channels) float array
+        returns: float32 array with the same number of dimensions, backed by an
+            internal output buffer that is reused on the next call
+        """
+        self.set_ratio(ratio)
+        frames = data.reshape(len(data), self.channels)
+        n = len(frames)
+        history = self.taps
+
+        # Reuse the work buffer: [history | chunk]
+        if self.work.shape[1] < history + n:
+            previous = self.work[:, :history].copy()
+            self._allocate(history + n)
+            self.work[:, :history] = previous
+        self.work[:, history:history + n] = frames.T
+
+        # Outputs whose window ends inside the buffer: floor(p) + half_taps <= history + n - 1
+        limit = (history + n - self.half_taps) * self.den
+        count = max(0, -(-(limit - self.position) // self.num))
+        positions = self.position + np.arange(count, dtype=np.int64) * self.num
+        base, phase = np.divmod(positions, self.den)
+
+        # Window for output k starts at base - half_taps + 1
+        kernels = polyphase_kernels(self.num, self.den, self.half_taps)[phase]
+        if len(self.out) < count:
+            self.out = np.empty((max(count, 2 * len(self.out)), self.channels), dtype=np.float32)
+        out = self.out[:count]
+        np.einsum('kt,ckt->kc', kernels, self.windows[:, base - self.half_taps + 1], out=out)
+
+        # Keep the newest samples as history and rebase the read position
+        self.work[:, :history] = self.work[:, n:n + history]
+        self.position += count * self.num - n * self.den
+
+        return out[:, 0] if data.ndim == 1 else out
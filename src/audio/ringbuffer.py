@@ -0,0 +1,178 @@
+import threading
+import numpy as np
+
+class SPSCRing:
+    """
+    Preallocated single-producer/single-consumer sample FIFO that never blocks.
+    The producer only advances `written` and the consumer only advances
+    `consumed`; each publishes its counter after copying, so neither side
+    takes a lock and an audio callback can use it directly. Writes that do
+    not fit and reads with too little data are truncated, never waited on.
+    """
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=dtype)
+        self.written = 0 # total samples ever written (producer side)
+        self.consumed = 0 # total samples ever read (consumer side)
+
+    def available(self):
+        return self.written - self.consumed
+
+    def space(self):
+        return self.capacity - (self.written - self.consumed)
+
+    def write(self, data):
+        """
+        Append as much of data as fits; returns the number of samples written.
+        """
+        n = min(len(data), self.space())
+        pos = self.written % self.capacity
+        first = min(n, self.capacity - pos)
+        self.buffer[pos:pos + first] = data[:first]
+        self.buffer[:n - first] = data[first:n]
+        self.written += n
+        return n
+
+    def read(self, num_samples, out):
+        """
+        Copy up to num_samples into out; returns the number of samples read.
+        """
+        n = min(num_samples, self.available())
+        pos = self.consumed % self.capacity
+        first = min(n, self.capacity - pos)
+        out[:first] = self.buffer[pos:pos + first]
+        out[first:n] = self.buffer[:n - first]
+        self.consumed += n
+        return n
+
+    def clear(self):
+        """
+        Drop buffered samples (consumer side).
+        """
+        self.consumed = self.written
+
+class FrameRing:
+    """
+    Single-producer/multi-consumer ring of preallocated frame slots.
+    The producer copies each chunk into the next slot once, with its length
+    and source position; every FrameReader follows with its own cursor. A
+    reader that falls more than the ring behind skips ahead to the oldest
+    intact slot and counts the frames it missed, so a slow consumer never
+    blocks the producer. `claimed` is advanced before a slot is overwritten
+    and `written` after, so a reader can tell when its copy was torn.
+    Counters and slots live in one buffer, which may be shared memory.
+    """
+    def __init__(self, num_slots, slot_size, dtype=np.float32, buffer=None):
+        self.num_slots = num_slots
+        self.slot_size = slot_size
+        self.dtype = np.dtype(dtype)
+        if buffer is None:
+            buffer = np.zeros(self.nbytes(num_slots, slot_size, dtype), dtype=np.uint8)
+        # Layout: counters (claimed, written), lengths, positions, then the slots
+        self.counters = np.ndarray(2, dtype=np.int64, buffer=buffer)
+        self.lengths = np.ndarray(num_slots, dtype=np.int64, buffer=buffer, offset=16)
+        self.positions = np.ndarray(num_slots, dtype=np.int64, buffer=buffer, offset=16 + 8 * num_slots)
+        self.slots = np.ndarray((num_slots, slot_size), dtype=self.dtype, buffer=buffer, offset=16 + 16 * num_slots)
+        self.events = [] # set after every write; one per reader, or a process-shared event
+        self.readers = []
+
+    @staticmethod
+    def nbytes(num_slots, slot_size, dtype=np.float32):
+        return 16 + 16 * num_slots + num_slots * slot_size * np.dtype(dtype).itemsize
+
+    @property
+    def claimed(self):
+        return int(self.counters[0])
+
+    @property
+    def written(self):
+        return int(self.counters[1])
+
+    def reader(self, name, max_lag=None):
+        reader = FrameReader(self, name, max_lag)
+        self.readers.append(reader)
+        self.events.append(reader.ready)
+        return reader
+
+    def write(self, data, position=None):
+        """
+        Publish a chunk (copied into the next slot) and wake the readers.
+        A chunk longer than a slot (extreme pitch/timescale) spans several slots.
+        """
+        for start in range(0, max(len(data), 1), self.slot_size):
+            piece = data[start:start + self.slot_size]
+            written = self.written
+            slot = written % self.num_slots
+            self.counters[0] = written + 1
+            self.slots[slot, :len(piece)] = piece
+            self.lengths[slot] = len(piece)
+            self.positions[slot] = -1 if position is None else position
+            self.counters[1] = written + 1
+        for event in self.events:
+            event.set()
+
+class FrameReader:
+    """
+    One consumer's cursor into a FrameRing, with lag and drop counters.
+    Frames are copied into a buffer owned by the reader, valid until its next read.
+    max_lag caps how many frames the reader may trail by before it skips ahead
+    (the ring size minus one, by default).
+    """
+    def __init__(self, ring, name, max_lag=None, ready=None):
+        self.ring = ring
+        self.name = name
+        # Keep a slot of margin: the producer may be rewriting the oldest one
+        self.max_lag = ring.num_slots - 1 if max_lag is None else min(max_lag, ring.num_slots - 1)
+        self.cursor = ring.written
+        self.buffer = np.zeros(ring.slot_size, dtype=ring.dtype)
+        self.ready = ready or threading.Event()
+        self.flush_to = 0
+        # Statistics
+        self.frames = 0
+        self.dropped = 0
+        self.peak_lag = 0
+
+    def flush(self):
+        """
+        Skip everything published so far (applied on the reader's next read; safe from any thread).
+        """
+        self.flush_to = self.ring.written
+
+    def read(self, timeout=0.1):
+        """
+        Next frame as (samples, position), position None when the source has none;
+        None if nothing arrived within timeout.
+        """
+        ring = self.ring
+        while True:
+            if self.flush_to > self.cursor:
+                self.cursor = self.flush_to
+            if ring.written == self.cursor:
+                self.ready.clear()
+                # Re-check after clearing so a write in between is not missed
+                if ring.written == self.cursor and not self.ready.wait(timeout):
+                    return None
+                continue
+
+            lag = ring.written - self.cursor
+            self.peak_lag = max(self.peak_lag, lag)
+            if lag > self.max_lag:
+                skip = lag - self.max_lag
+                self.dropped += skip
+                self.cursor += skip
+
+            slot = self.cursor % ring.num_slots
+            n = int(ring.lengths[slot])
+            self.buffer[:n] = ring.slots[slot, :n]
+            position = int(ring.positions[slot])
+            if ring.claimed - self.cursor > ring.num_slots:
+                # Overwritten while copying: count it and move on
+                self.dropped += 1
+                self.cursor += 1
+                continue
+            self.cursor += 1
+            self.frames += 1
+            return self.buffer[:n], (None if position < 0 else position)
+
+    def stats(self):
+        return {"frames": self.frames, "dropped": self.dropped, "peak_lag": self.peak_lag}
@@ -0,0 +1,109 @@
+import math
+import time
+
+class DeadlineScheduler:
+    """
+    Paces a sample stream against the monotonic clock.
+    The deadline of every chunk is derived from an anchor (time, frames) and
+    the cumulative frames emitted since, never from the previous sleep, so
+    callback time and sleep overshoot do not accumulate into drift. A
+    timescale change re-anchors at the current position. Falling behind by
+    up to max_lateness is caught up by skipping sleeps; beyond that the
+    scheduler either re-anchors ('resync', the stall is forgiven) or asks the
+    caller to drop the frames it is behind by ('drop', wall-clock sync kept).
+    """
+    def __init__(self, sample_rate, max_lateness=0.25, late_policy='resync', clock=time.monotonic, sleep=time.sleep):
+        if late_policy not in ('resync', 'drop'):
+            raise ValueError(f"Unknown late policy: {late_policy}")
+        self.sample_rate = sample_rate
+        self.max_lateness = max_lateness
+        self.late_policy = late_policy
+        self.clock = clock
+        self.sleep = sleep
+        self.start()
+
+    def start(self):
+        self.anchor_time = self.clock()
+        self.anchor_frames = 0
+        self.frames = 0
+        self.timescale = None
+        # Statistics
+        self.chunks = 0
+        self.late_chunks = 0
+        self.resyncs = 0
+        self.dropped_frames = 0
+        self.max_lateness_seen = 0.0
+        self.lateness_sum = 0.0
+        self.wake_count = 0
+        self.wake_mean = 0.0
+        self.wake_m2 = 0.0
+
+    def _anchor(self, frames, at_time):
+        self.anchor_frames = frames
+        self.anchor_time = at_time
+
+    def deadline(self):
+        """
+        Monotonic time at which everything emitted so far has been played out.
+        """
+        return self.anchor_time + (self.frames - self.anchor_frames) / (self.sample_rate * self.timescale)
+
+    def wait(self, frames, timescale=1.0):
+        """
+        Account for a chunk of `frames` just emitted and wait until the next chunk is due.
+        returns: frames the caller should skip to get back in sync (only with the 'drop' policy)
+        """
+        if timescale <= 0:
+            timescale = 1.0
+        if timescale != self.timescale:
+            if self.timescale is not None:
+                # Keep the time already scheduled; only frames from here on use the new rate
+                self._anchor(self.frames, self.deadline())
+            self.timescale = timescale
+        self.frames += frames
+        self.chunks += 1
+
+        deadline = self.deadline()
+        lateness = self.clock() - deadline
+        if lateness <= 0:
+            self.sleep(-lateness)
+            self._record_wake(self.clock() - deadline)
+            return 0
+
+        self.late_chunks += 1
+        self.lateness_sum += lateness
+        self.max_lateness_seen = max(self.max_lateness_seen, lateness)
+        if lateness <= self.max_lateness:
+            return 0 # catch up: emit the next chunk immediately
+
+        if self.late_policy == 'drop':
+            skip = int(math.ceil(lateness * self.sample_rate * timescale))
+            self.frames += skip
+            self.dropped_frames += skip
+            return skip
+        self.resyncs += 1
+        self._anchor(self.frames, self.clock())
+        return 0
+
+    def _record_wake(self, error):
+        # Welford running mean/variance of how far past the deadline sleeps wake up
+        self.wake_count += 1
+        delta = error - self.wake_mean
+        self.wake_mean += delta / self.wake_count
+        self.wake_m2 += delta * (error - self.wake_mean)
+
+    def stats(self):
+        """
+        Pacing statistics: wake-up jitter and lateness in milliseconds, late/resync/drop counts.
+        """
+        jitter = math.sqrt(self.wake_m2 / self.wake_count) if self.wake_count > 1 else 0.0
+        return {
+            "chunks": self.chunks,
+            "late_chunks": self.late_chunks,
+            "resyncs": self.resyncs,
+            "dropped_frames": self.dropped_frames,
+            "wake_error_ms": round(self.wake_mean * 1000, 3),
+            "jitter_ms": round(jitter * 1000, 3),
+            "mean_lateness_ms": round(self.lateness_sum / self.late_chunks * 1000, 3) if self.late_chunks else 0.0,
+            "max_lateness_ms": round(self.max_lateness_seen * 1000, 3),
+        }
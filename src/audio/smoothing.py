@@ -0,0 +1,76 @@
+import numpy as np
+
+def _time_coefficient(seconds, frame_rate):
+    """
+    One-pole smoothing coefficient for a time constant in seconds (0 means instant).
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        return np.where(seconds > 0, np.exp(-1.0 / (np.maximum(seconds, 1e-9) * frame_rate)), 0.0)
+
+def _per_bar(value, num_bars):
+    """
+    Scalar, or a [low, high] pair spread geometrically from the first to the last bar.
+    """
+    if np.ndim(value) == 0:
+        return np.full(num_bars, float(value))
+    low, high = value
+    if low <= 0 or high <= 0:
+        return np.linspace(low, high, num_bars)
+    return np.geomspace(low, high, num_bars)
+
+class BarSmoother:
+    """
+    Temporal smoothing for bar frames.
+    Bars follow the input with per-bar attack/release one-pole filters, peaks
+    hold for peak_hold seconds then fall, and a running-max auto-gain (falling
+    with gain_release) scales both to 0..1 so clients no longer normalize
+    each frame on their own.
+    """
+    def __init__(self, frame_rate, attack=0.01, release=0.2, peak_hold=0.4, peak_release=0.8, gain_release=4.0):
+        self.frame_rate = frame_rate
+        self.attack = attack
+        self.release = release
+        self.hold_frames = int(round(peak_hold * frame_rate))
+        self.peak_coef = float(_time_coefficient(peak_release, frame_rate))
+        self.gain_coef = float(_time_coefficient(gain_release, frame_rate))
+        self.reset()
+
+    def reset(self):
+        self.smoothed = None
+        self.peaks = None
+        self.hold = None
+        self.gain = 0.0
+
+    def _init_state(self, bars):
+        num_bars = bars.shape[-1]
+        self.attack_coef = _time_coefficient(_per_bar(self.attack, num_bars), self.frame_rate)
+        self.release_coef = _time_coefficient(_per_bar(self.release, num_bars), self.frame_rate)
+        self.smoothed = np.array(bars, dtype=np.float64)
+        self.peaks = self.smoothed.copy()
+        self.hold = np.zeros(bars.shape, dtype=np.int32)
+
+    def process(self, bars):
+        """
+        Smooth one frame of bars, (num_bars,) or (channels, num_bars).
+        returns: smoothed bars, peaks (both scaled to 0..1 by the auto-gain)
+        """
+        bars = np.asarray(bars)
+        if self.smoothed is None or self.smoothed.shape != bars.shape:
+            self._init_state(bars)
+
+        # Attack when rising, release when falling
+        coef = np.where(bars > self.smoothed, self.attack_coef, self.release_coef)
+        self.smoothed += (1 - coef) * (bars - self.smoothed)
+
+        # Peak hold, then exponential fall once the hold expires
+        rising = self.smoothed >= self.peaks
+        self.hold = np.where(rising, self.hold_frames, self.hold - 1)
+        self.peaks = np.where(rising, self.smoothed,
+                              np.where(self.hold > 0, self.peaks, self.peaks * self.peak_coef))
+        np.maximum(self.peaks, self.smoothed, out=self.peaks)
+
+        # Running-max auto-gain
+        self.gain = max(float(self.peaks.max()) if self.peaks.size else 0.0, self.gain * self.gain_coef)
+        scale = 1.0 / self.gain if self.gain > 0 else 0.0
+        return self.smoothed * scale, self.peaks * scale
@@ -0,0 +1,137 @@
+import numpy as np
+from scipy import signal
+from scipy.fft import rfft, rfftfreq
+
+# Supported analysis windows (config name -> scipy.signal.get_window name)
+WINDOWS = {
+    'hann': 'hann',
+    'blackmanharris': 'blackmanharris',
+    'blackman-harris': 'blackmanharris',
+    'flattop': 'flattop',
+    'flat-top': 'flattop',
+}
+
+_window_cache = {}
+
+def get_window(name, size):
+    """
+    Return a cached float32 analysis window.
+    """
+    key = (name, size)
+    window = _window_cache.get(key)
+    if window is None:
+        if name not in WINDOWS:
+            raise ValueError(f"Unknown window '{name}', expected one of {sorted(WINDOWS)}")
+        window = signal.get_window(WINDOWS[name], size).astype(np.float32)
+        _window_cache[key] = window
+    return window
+
+class SampleRing:
+    """
+    Preallocated circular buffer of (frames, channels) float32 samples.
+    Every sample is stored twice, one capacity apart, so the newest N frames
+    can always be read as a single contiguous view without copying history.
+    """
+    def __init__(self, capacity, channels=1):
+        self.capacity = capacity
+        self.channels = channels
+        self.buffer = np.zeros((2 * capacity, channels), dtype=np.float32)
+        self.write_pos = 0
+        self.total_written = 0
+
+    def write(self, frames):
+        """
+        Append frames; data is (n,) for mono or (n, channels).
+        """
+        frames = frames.reshape(-1, self.channels)
+        n = len(frames)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest capacity frames can ever be read back
+            self.write_pos = (self.write_pos + n - self.capacity) % self.capacity
+            self.total_written += n - self.capacity
+            frames = frames[-self.capacity:]
+            n = self.capacity
+
+        pos = self.write_pos
+        first = min(n, self.capacity - pos)
+        self.buffer[pos:pos + first] = frames[:first]
+        self.buffer[pos + self.capacity:pos + self.capacity + first] = frames[:first]
+        rest = n - first
+        if rest:
+            self.buffer[:rest] = frames[first:]
+            self.buffer[self.capacity:self.capacity + rest] = frames[first:]
+        self.write_pos = (pos + n) % self.capacity
+        self.total_written += n
+
+    def latest(self, length, lag=0):
+        """
+        Contiguous view of `length` frames ending `lag` frames before the newest.
+        """
+        if length + lag > self.capacity:
+            raise ValueError("Requested span exceeds ring capacity")
+        stop = self.write_pos + self.capacity - lag
+        return self.buffer[stop - length:stop]
+
+    def clear(self):
+        self.buffer.fill(0)
+        self.write_pos = 0
+        self.total_written = 0
+
+class STFTAnalyzer:
+    """
+    Streaming short-time Fourier transform.
+    Chunks of any size are pushed in; a frame of fft_size samples is analysed
+    every hop_size samples, optionally zero-padded to fft_size * zero_pad.
+    history extends the sample ring beyond fft_size for other readers of it.
+    """
+    def __init__(self, fft_size, hop_size, sample_rate, channels=1, window='hann', zero_pad=1, workers=None, history=0):
+        if fft_size < 2 or hop_size < 1:
+            raise ValueError("fft_size must be >= 2 and hop_size >= 1")
+        self.fft_size = fft_size
+        self.hop_size = hop_size
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.n_fft = fft_size * max(1, int(zero_pad))
+        self.workers = workers
+        self.window = get_window(window, fft_size)[:, np.newaxis]
+        self.frequencies = rfftfreq(self.n_fft, 1 / sample_rate)
+        self.frame_rate = sample_rate / hop_size
+
+        self.ring = SampleRing(max(fft_size, history), channels)
+        self.until_next = hop_size
+        # Frame staging area, grown on demand; the zero-padded tail is never written
+        self.frames = np.zeros((1, self.n_fft, channels), dtype=np.float32)
+
+    def reset(self):
+        self.ring.clear()
+        self.until_next = self.hop_size
+
+    def push(self, data):
+        """
+        Feed interleaved samples and return the magnitudes of every frame completed.
+        returns: (frames, bins) for mono or (frames, channels, bins)
+        """
+        data = data.reshape(-1, self.channels)
+        n = len(data)
+        num_frames = 0 if n < self.until_next else 1 + (n - self.until_next) // self.hop_size
+        if num_frames > len(self.frames):
+            self.frames = np.zeros((num_frames, self.n_fft, self.channels), dtype=np.float32)
+
+        pos = 0
+        for k in range(num_frames):
+            step = self.until_next if k == 0 else self.hop_size
+            self.ring.write(data[pos:pos + step])
+            pos += step
+            np.multiply(self.ring.latest(self.fft_size), self.window, out=self.frames[k, :self.fft_size])
+        self.ring.write(data[pos:])
+        self.until_next = (self.until_next - n) if num_frames == 0 else self.hop_size - (n - pos)
+
+        if num_frames == 0:
+            shape = (0, len(self.frequencies)) if self.channels == 1 else (0, self.channels, len(self.frequencies))
+            return np.zeros(shape, dtype=np.float32)
+
+        spectra = rfft(self.frames[:num_frames], axis=1, workers=self.workers)
+        magnitudes = np.abs(spectra).transpose(0, 2, 1)
+        return magnitudes[:, 0, :] if self.channels == 1 else magnitudes
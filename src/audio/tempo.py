@@ -0,0 +1,90 @@
+import numpy as np
+from scipy.fft import rfft, irfft, next_fast_len
+from .stft import SampleRing
+
+class TempoTracker:
+    """
+    Streaming tempo (BPM) and beat-phase estimator.
+    Onset strengths are appended to a rolling envelope in a ring buffer; the
+    FFT autocorrelation and beat-phase search only run every update_interval
+    seconds, so per-frame cost is a single ring write and the periodic
+    estimate is bounded by one FFT of twice the window length.
+    """
+    def __init__(self, frame_rate, window_seconds=8.0, update_interval=0.5, bpm_range=(60, 200)):
+        self.frame_rate = frame_rate
+        self.length = max(4, int(round(window_seconds * frame_rate)))
+        self.ring = SampleRing(self.length)
+        self.n_fft = next_fast_len(2 * self.length)
+        self.update_frames = max(1, int(round(update_interval * frame_rate)))
+        self.min_lag = max(1, int(np.floor(frame_rate * 60 / bpm_range[1])))
+        self.max_lag = min(self.length // 2, int(np.ceil(frame_rate * 60 / bpm_range[0])))
+        lag_bpm = 60.0 * frame_rate / np.arange(self.min_lag, self.max_lag + 1)
+        self.prior = np.exp(-0.5 * np.log2(lag_bpm / 120.0) ** 2)
+        self.reset()
+
+    def reset(self):
+        self.ring.clear()
+        self.frames_seen = 0
+        self.frames_since_update = 0
+        self.estimates = 0
+        self.bpm = 0.0
+        self.confidence = 0.0
+        self.period = 0.0
+        self.last_beat_frame = 0
+
+    def update(self, strength):
+        """
+        Append one frame's onset strength; re-estimate when the update interval has elapsed.
+        """
+        self.ring.write(np.array([strength], dtype=np.float32))
+        self.frames_seen += 1
+        self.frames_since_update += 1
+        if self.frames_since_update >= self.update_frames and self.frames_seen >= 2 * self.max_lag:
+            self.frames_since_update = 0
+            self._estimate()
+
+    def _estimate(self):
+        available = min(self.frames_seen, self.length)
+        envelope = self.ring.latest(available)[:, 0]
+        centered = envelope - envelope.mean()
+
+        spectrum = rfft(centered, n=self.n_fft)
+        acf = irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=self.n_fft)[:available]
+        self.estimates += 1
+        if acf[0] <= 0:
+            self.confidence = 0.0
+            return
+
+        # Log-normal tempo prior around 120 BPM resolves octave ambiguity
+        best = int(np.argmax(acf[self.min_lag:self.max_lag + 1] * self.prior)) + self.min_lag
+        # Parabolic interpolation for a fractional lag
+        period = float(best)
+        if self.min_lag < best < self.max_lag:
+            a, b, c = acf[best - 1], acf[best], acf[best + 1]
+            denom = a - 2 * b + c
+            if denom < 0:
+                period += float(0.5 * (a - c) / denom)
+        self.period = period
+        self.bpm = 60.0 * self.frame_rate / period
+        self.confidence = float(max(0.0, acf[best] / acf[0]))
+
+        # Beat phase: the offset whose comb (one tooth per period) collects the most onset energy
+        teeth = np.round(np.arange(available // best) * period).astype(np.intp)
+        offsets = np.arange(best)
+        positions = available - 1 - offsets[:, np.newaxis] - teeth[np.newaxis, :]
+        scores = np.where(positions >= 0, envelope[np.maximum(positions, 0)], 0).sum(axis=1)
+        self.last_beat_frame = self.frames_seen - 1 - int(np.argmax(scores))
+
+    def state(self):
+        """
+        Current estimate: bpm, confidence (0-1), beat phase (0-1) and seconds until the next beat.
+        """
+        if self.period <= 0:
+            return {"bpm": 0.0, "confidence": 0.0, "phase": 0.0, "next_beat": None}
+        since = (self.frames_seen - 1 - self.last_beat_frame) % self.period
+        return {
+            "bpm": round(self.bpm, 2),
+            "confidence": round(self.confidence, 3),
+            "phase": round(since / self.period, 3),
+            "next_beat": round((self.period - since) / self.frame_rate, 4),
+        }
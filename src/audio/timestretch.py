@@ -0,0 +1,123 @@
+import numpy as np
+from scipy.fft import rfft, irfft
+from .stft import get_window
+
+class PhaseVocoder:
+    """
+    Streaming phase-vocoder time stretcher.
+    stretch > 1 lengthens the signal (slower) without changing its pitch.
+    Frames are synthesised every fft_size // 4 samples and read from the input
+    every synthesis_hop / stretch samples. Analysis/synthesis phases, the input
+    remainder and the overlap-add tail are carried across chunks; all frames
+    available in a chunk are transformed and overlap-added in one batch.
+    """
+    OVERLAP = 4
+
+    def __init__(self, fft_size=2048, channels=1):
+        self.fft_size = fft_size
+        self.channels = channels
+        self.hop = fft_size // self.OVERLAP
+        self.window = get_window('hann', fft_size)
+        # Hann at 75% overlap sums (squared) to a constant
+        self.norm = np.float32(np.sum(self.window[:self.hop * self.OVERLAP].reshape(self.OVERLAP, -1) ** 2, axis=0).mean())
+        self.omega = (2 * np.pi * np.arange(fft_size // 2 + 1) / fft_size).astype(np.float32)
+
+        self.input = np.zeros((channels, fft_size), dtype=np.float32)
+        self.acc = np.zeros((channels, self.hop * self.OVERLAP), dtype=np.float32)
+        self.out = np.empty((channels, 0), dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """
+        Clear buffered input, phase state and the overlap-add tail.
+        """
+        bins = self.fft_size // 2 + 1
+        self.input_len = 0
+        self.read_pos = 0.0
+        self.last_start = None
+        self.last_phase = np.zeros((self.channels, bins), dtype=np.float32)
+        self.synth_phase = np.zeros((self.channels, bins), dtype=np.float32)
+        self.tail = np.zeros((self.channels, self.hop * (self.OVERLAP - 1)), dtype=np.float32)
+
+    def _append(self, frames):
+        n = len(frames)
+        if self.input.shape[1] < self.input_len + n:
+            grown = np.zeros((self.channels, 2 * (self.input_len + n)), dtype=np.float32)
+            grown[:, :self.input_len] = self.input[:, :self.input_len]
+            self.input = grown
+        self.input[:, self.input_len:self.input_len + n] = frames.T
+        self.input_len += n
+
+    def process(self, data, stretch):
+        """
+        Time-stretch a chunk.
+        data: (frames,) for mono or (frames, channels) float array
+        returns: float32 array with the same number of dimensions (length varies per call),
+            backed by an internal output buffer that is reused on the next call
+        """
+        self._append(data.reshape(len(data), self.channels))
+        analysis_hop = self.hop / stretch
+        N = self.fft_size
+
+        # Every frame whose window fits in the buffered input
+        num_frames = 0
+        if self.input_len >= N:
+            num_frames = int(np.floor((self.input_len - N - self.read_pos) / analysis_hop)) + 1
+        if num_frames <= 0:
+            out = np.zeros((0, self.channels), dtype=np.float32)
+            return out[:, 0] if data.ndim == 1 else out
+
+        starts = np.round(self.read_pos + np.arange(num_frames) * analysis_hop).astype(np.intp)
+        starts = np.minimum(starts, self.input_len - N)
+        windows = np.lib.stride_tricks.sliding_window_view(self.input[:, :self.input_len], N, axis=1)
+        spectra = rfft(windows[:, starts] * self.window, axis=-1)  # (channels, frames, bins)
+        magnitudes = np.abs(spectra)
+        phases = np.angle(spectra)
+
+        # Actual hop between consecutive analysis frames
+        previous = starts[0] - int(round(analysis_hop)) if self.last_start is None else self.last_start
+        hops = np.diff(starts, prepend=previous).astype(np.float32)
+        hops = np.maximum(hops, 1)[:, np.newaxis]
+
+        # Instantaneous frequency from the phase difference against the expected advance
+        phase_diff = np.diff(phases, axis=1, prepend=self.last_phase[:, np.newaxis, :])
+        deviation = phase_diff - self.omega * hops
+        deviation -= 2 * np.pi * np.round(deviation / (2 * np.pi))
+        increments = (self.omega + deviation / hops) * self.hop
+        if self.last_start is None:
+            # Nothing to unwrap against yet: start from the analysis phase
+            increments[:, 0] = phases[:, 0] - self.synth_phase
+        synth = self.synth_phase[:, np.newaxis, :] + np.cumsum(increments, axis=1)
+
+        frames = irfft(magnitudes * np.exp(1j * synth), n=N, axis=-1) * self.window
+
+        # Overlap-add: frame m lands at m * hop, so each quarter of a frame adds into a shifted block
+        length = (num_frames + self.OVERLAP - 1) * self.hop
+        if self.acc.shape[1] < length:
+            self.acc = np.zeros((self.channels, length), dtype=np.float32)
+        acc = self.acc[:, :length]
+        acc.fill(0)
+        acc[:, :self.tail.shape[1]] = self.tail
+        quarters = frames.reshape(self.channels, num_frames, self.OVERLAP, self.hop)
+        for q in range(self.OVERLAP):
+            block = acc[:, q * self.hop:(q + num_frames) * self.hop]
+            block += quarters[:, :, q, :].reshape(self.channels, -1)
+
+        ready = num_frames * self.hop
+        if self.out.shape[1] < ready:
+            self.out = np.empty((self.channels, max(ready, 2 * self.out.shape[1])), dtype=np.float32)
+        out = self.out[:, :ready]
+        np.divide(acc[:, :ready], self.norm, out=out)
+        self.tail[:] = acc[:, ready:length]
+
+        # Carry phase state and drop input that no future frame can reach
+        self.last_phase = phases[:, -1].astype(np.float32)
+        self.synth_phase = np.mod(synth[:, -1], 2 * np.pi).astype(np.float32)
+        self.read_pos += num_frames * analysis_hop
+        consumed = min(int(self.read_pos), starts[-1])
+        self.input[:, :self.input_len - consumed] = self.input[:, consumed:self.input_len]
+        self.input_len -= consumed
+        self.read_pos -= consumed
+        self.last_start = starts[-1] - consumed
+
+        return out[0] if data.ndim == 1 else out.T
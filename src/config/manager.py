@@ -1,11 +1,19 @@
 import yaml
 import os
+import threading
+from .snapshot import build_snapshot
+
+_MISSING = object()
 
 class ConfigManager:
     def __init__(self, config_path="config/default.yaml"):
         self.config_path = config_path
         self.config = self.load_config()
         self.callbacks = []
+        self._lock = threading.Lock()
+        self.version = 0
+        # Hot-path readers use this immutable snapshot instead of get()
+        self.snapshot = build_snapshot(self.config, self.version)
 
     def register_callback(self, callback):
         self.callbacks.append(callback)
@@ -28,15 +36,39 @@ class ConfigManager:
 
     def set(self, key, value):
         keys = key.split('.')
-        target = self.config
-        for k in keys[:-1]:
-            target = target.setdefault(k, {})
-        target[keys[-1]] = value
+        with self._lock:
+            target = self.config
+            for k in keys[:-1]:
+                target = target.setdefault(k, {})
+            previous = target.get(keys[-1], _MISSING)
+            target[keys[-1]] = value
+
+            # Rebuild and atomically swap the snapshot; a value the typed
+            # snapshot rejects (e.g. 'abc' for a float) is rolled back
+            try:
+                snapshot = build_snapshot(self.config, self.version + 1)
+            except (TypeError, ValueError):
+                if previous is _MISSING:
+                    del target[keys[-1]]
+                else:
+                    target[keys[-1]] = previous
+                raise
+            self.version += 1
+            self.snapshot = snapshot
         
         # Notify callbacks
         for callback in self.callbacks:
             callback(key, value)
 
+    def replace(self, config):
+        """
+        Swap in a whole config dict (e.g. the parent's live state in a worker process).
+        """
+        with self._lock:
+            self.config = config
+            self.version += 1
+            self.snapshot = build_snapshot(self.config, self.version)
+
     def save(self):
         with open(self.config_path, 'w') as f:
             yaml.dump(self.config, f)
\ No newline at end of file
@@ -0,0 +1,89 @@
+from dataclasses import dataclass, fields
+
+@dataclass(frozen=True)
+class AudioParams:
+    input_type: str = 'microphone'
+    file_path: str = None
+    sample_rate: int = 44100
+    chunk_size: int = 1024
+    channels: int = 1
+
+@dataclass(frozen=True)
+class ProcessingParams:
+    volume: float = 1.0
+    pitch: float = 1.0
+    timescale: float = 1.0
+    stretch_fft_size: int = 2048
+    modulation_freq: float = 0.0
+    modulation_type: str = 'ring'
+    lpf_cutoff: float = 20000.0
+    hpf_cutoff: float = 0.0
+
+@dataclass(frozen=True)
+class VisualizerParams:
+    type: str = None
+    fps: int = 30
+    num_bars: int = 64
+    bar_scale: str = 'log'
+    fft_size: int = 1024
+    fft_workers: int = None
+    hop_size: int = None
+    window: str = 'hann'
+    zero_pad: int = 1
+    resolutions: tuple = None
+    frequency_range: tuple = (20, 20000)
+    onset_bands: tuple = None
+    onset_history: float = 1.0
+    beat_threshold: float = 1.3
+    tempo_window: float = 8.0
+    tempo_update: float = 0.5
+    tempo_range: tuple = (60, 200)
+    bar_attack: object = None # seconds, or a (low, high) per-bar pair
+    bar_release: object = None
+    peak_hold: float = 0.4
+    peak_release: float = 0.8
+    gain_release: float = 4.0
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable, typed view of the hot-path config sections.
+    Rebuilt by ConfigManager.set and swapped in as a single attribute, so a
+    reader that grabs `config_manager.snapshot` once sees consistent values.
+    """
+    version: int
+    audio: AudioParams
+    processing: ProcessingParams
+    visualizer: VisualizerParams
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _build_section(cls, values):
+    if not isinstance(values, dict):
+        values = {}
+    kwargs = {}
+    for f in fields(cls):
+        value = values.get(f.name)
+        if value is None:
+            continue
+        # Coerce to the type of the default (e.g. YAML ints into float fields)
+        if isinstance(f.default, bool):
+            value = bool(value)
+        elif isinstance(f.default, float):
+            value = float(value)
+        elif isinstance(f.default, int):
+            value = int(value)
+        kwargs[f.name] = _freeze(value)
+    return cls(**kwargs)
+
+def build_snapshot(config, version=0):
+    config = config or {}
+    return ConfigSnapshot(
+        version=version,
+        audio=_build_section(AudioParams, config.get('audio')),
+        processing=_build_section(ProcessingParams, config.get('processing')),
+        visualizer=_build_section(VisualizerParams, config.get('visualizer')),
+    )
@@ -3,10 +3,12 @@ import os
 import signal
 import time
 import threading
-import queue
 import numpy as np
 from config.manager import ConfigManager
-from audio.input import MicrophoneInput, FileInput
+from audio.input import MicrophoneInput, FileInput, PlaylistInput
+from audio.playlist import Playlist
+from audio.ringbuffer import FrameRing
+from audio.analysis_worker import AnalysisWorker
 from audio.output import AudioOutput
 from audio.processor import AudioProcessor
 from audio.recorder import AudioRecorder
@@ -34,12 +36,32 @@ class AudioVisualizerApp:
         self.server = VisualizerServer(self.config_manager)
         self.server.on_toggle_recording = self.recorder.toggle
         self.server.is_recording_callback = lambda: self.recorder.recording
+        self.playlist = Playlist(self.config_manager.get('audio.playlist') or
+                                 [p for p in [self.config_manager.get('audio.file_path')] if p])
+        self.server.playlist = self.playlist
+        self.server.on_seek = self.seek
         self.keyboard = KeyboardHandler(self.handle_key)
         
-        self.viz_queue = queue.Queue(maxsize=2)
-        self.playback_queue = queue.Queue(maxsize=5)
+        # Processed chunks are published once; each consumer follows with its own cursor
+        chunk_samples = self.config_manager.get('audio.chunk_size', 1024) * self.config_manager.get('audio.channels', 1)
+        num_slots = self.config_manager.get('audio.frame_slots', 16)
+        self.worker = None
+        self.worker_lost = False
+        if self.config_manager.get('visualizer.analysis_process', False):
+            # Analysis in a separate process reading the same ring from shared memory
+            try:
+                self.worker = AnalysisWorker(self.config_manager, num_slots, 4 * chunk_samples)
+            except Exception as e:
+                logger.error(f"Analysis worker unavailable, analysing in-thread: {e}")
+        self.frames = self.worker.frames if self.worker else FrameRing(num_slots, 4 * chunk_samples)
+        self.playback_reader = self.frames.reader('playback')
+        self.viz_reader = self.frames.reader('visualization', max_lag=2) # stay near real time, skip when behind
+        self.record_reader = self.frames.reader('recorder')
+        self.analysis_reset = threading.Event() # set by a seek, consumed by the visualization thread
+        self.timeline_lock = threading.Lock() # orders timeline switches sent to the worker
         self.viz_thread = None
         self.playback_thread = None
+        self.record_thread = None
         self.tui = None
         
         self.input = None
@@ -54,8 +76,16 @@ class AudioVisualizerApp:
             
         input_type = self.config_manager.get('audio.input_type', 'microphone')
         logger.info(f"Initializing input type: {input_type}")
+        self.clear_timeline()
         if input_type == 'file':
             self.input = FileInput(self.config_manager)
+            self.input.on_open = self.on_file_opened
+            self.input.on_seek = self.on_seek
+        elif input_type == 'playlist':
+            self.input = PlaylistInput(self.config_manager, self.playlist)
+            self.input.on_open = self.on_file_opened
+            self.input.on_track_change = self.on_track_change
+            self.input.on_seek = self.on_seek
         else:
             self.input = MicrophoneInput(self.config_manager)
             
@@ -63,15 +93,63 @@ class AudioVisualizerApp:
         if hasattr(self, 'running') and self.running:
             self.input.start()
 
+    def on_file_opened(self, path, open_blocks):
+        # Open or build the analysis timeline without delaying playback; until
+        # it is ready (e.g. after a playlist splice) the live path takes over
+        generation = self.clear_timeline()
+        threading.Thread(target=self.prepare_timeline, args=(path, open_blocks, generation), daemon=True).start()
+
+    def prepare_timeline(self, path, open_blocks, generation):
+        # The worker opens the timeline once it is on disk, unless another track was opened meanwhile
+        if self.processor.prepare_timeline(path, open_blocks, generation) is not None and self.worker:
+            with self.timeline_lock:
+                if generation == self.processor.timeline_generation:
+                    self.worker.send('timeline', path)
+
+    def clear_timeline(self):
+        with self.timeline_lock:
+            generation = self.processor.clear_timeline()
+            if self.worker:
+                self.worker.send('clear_timeline')
+        return generation
+
+    def analysis_in_process(self):
+        if self.worker is None or self.worker_lost:
+            return False
+        if self.worker.process is not None and not self.worker.alive():
+            logger.error("Analysis worker exited, analysing in-thread")
+            self.worker_lost = True
+            return False
+        return self.worker.process is not None
+
+    def seek(self, seconds, relative=False):
+        """
+        Jump file playback to `seconds` (or by `seconds` when relative); ignored for live input.
+        """
+        if isinstance(self.input, FileInput):
+            self.input.seek(seconds, relative)
+
+    def on_seek(self, position):
+        # FileInput reader thread, between two chunks: audio_callback runs on the same thread, so
+        # the effect chain is reset while no apply_transformations call is in flight. Then drop the
+        # audio queued from before the seek
+        self.processor.reset_transformations()
+        self.playback_reader.flush()
+        self.viz_reader.flush()
+        self.output.flush()
+        self.analysis_reset.set()
+        if self.worker:
+            self.worker.send('seek', self.frames.written)
+
+    def on_track_change(self, path):
+        self.server.send_playlist()
+
     def on_config_change(self, key, value):
         logger.debug(f"Config changed: {key} = {value}")
+        if self.worker:
+            self.worker.send('config', key, value)
         if key in ['audio.input_type', 'audio.file_path']:
             self.init_input()
-        if key == 'processing.volume':
-            # Clear playback queue on volume change to make it feel responsive
-            while not self.playback_queue.empty():
-                try: self.playback_queue.get_nowait()
-                except queue.Empty: break
 
     def handle_key(self, char):
         logger.debug(f"Key pressed: {char}")
@@ -128,6 +206,10 @@ class AudioVisualizerApp:
             self.config_manager.set('processing.hpf_cutoff', max(0.0, hpf - 100.0))
         elif char == 'r':
             self.recorder.toggle()
+        elif char == ',':
+            self.seek(-self.config_manager.get('audio.seek_step', 5.0), relative=True)
+        elif char == '.':
+            self.seek(self.config_manager.get('audio.seek_step', 5.0), relative=True)
         elif char == 'c':
             # Reset effects
             logger.info("Resetting all audio effects")
@@ -139,63 +221,67 @@ class AudioVisualizerApp:
             self.config_manager.set('processing.hpf_cutoff', 0.0)
 
     def audio_callback(self, data):
-        # Apply transformations (volume, pitch, etc.)
+        # Apply transformations (volume, pitch, etc.) and publish the bus chunk
+        # once; it is copied into a ring slot, so the reused bus buffer is safe
         processed_data = self.processor.apply_transformations(data)
-        
-        # Write to recorder
-        self.recorder.write(processed_data)
-        
-        # Push to playback queue
-        try:
-            self.playback_queue.put(processed_data, timeout=0.1)
-        except queue.Full:
-            pass
-        
-        # Push to visualization queue (non-blocking)
-        try:
-            self.viz_queue.put_nowait(processed_data)
-        except queue.Full:
-            pass
+        # Source position of this chunk's end, for precomputed file analysis
+        position = getattr(self.input, 'position', None)
+        self.frames.write(processed_data, position)
 
     def playback_loop(self):
         logger.info("Starting playback loop")
         self.state_machine.set_playback_state(PlaybackState.PLAYING)
         while self.running:
-            try:
-                data = self.playback_queue.get(timeout=0.1)
-                self.output.play(data)
-                self.playback_queue.task_done()
-            except queue.Empty:
-                continue
+            frame = self.playback_reader.read(timeout=0.1)
+            if frame is not None:
+                self.output.play(frame[0])
+        logger.info(f"Playback reader stats: {self.playback_reader.stats()}")
         self.state_machine.set_playback_state(PlaybackState.STOPPED)
 
+    def record_loop(self):
+        while self.running:
+            frame = self.record_reader.read(timeout=0.1)
+            if frame is not None:
+                self.recorder.write(frame[0])
+        logger.info(f"Recorder reader stats: {self.record_reader.stats()}")
+
     def visualization_loop(self):
         logger.info("Starting visualization loop")
         while self.running:
-            try:
-                processed_data = self.viz_queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
+            if self.analysis_in_process():
+                # Bars computed by the worker process
+                result = self.worker.read(timeout=0.1)
+                if result is None:
+                    continue
+                bars, peaks, is_beat, onsets, tempo, position = result
+            else:
+                frame = self.viz_reader.read(timeout=0.1)
+                if frame is None:
+                    continue
+                processed_data, position = frame
 
-            # Process FFT
-            magnitudes, frequencies = self.processor.process_fft(processed_data)
-            
-            # Simple beat detection (use the first channel if stereo)
-            m_beat = magnitudes[0] if isinstance(magnitudes, list) else magnitudes
-            is_beat = self.processor.detect_beat(m_beat, frequencies)
+                if self.analysis_reset.is_set():
+                    self.analysis_reset.clear()
+                    self.processor.reset_analysis()
+
+                # Timeline lookup for cached files, streaming STFT + onsets + bars otherwise
+                result = self.processor.analyze(processed_data, position)
+                if result is None:
+                    continue
+                bars, peaks, is_beat, onsets = result
+                tempo = self.processor.tempo.state()
 
-            # Get bars for visualization
-            num_bars = self.config_manager.get('visualizer.num_bars', 64)
-            bars = self.processor.get_bars(magnitudes, frequencies, num_bars=num_bars)
+            snapshot = self.config_manager.snapshot
             
             # Send to browser
-            self.server.send_data(bars, is_beat=is_beat)
+            self.server.send_data(bars, is_beat=is_beat, onsets=onsets, tempo=tempo, peaks=peaks,
+                                  position=position / self.processor.sample_rate if position is not None else None)
             
             # Render in terminal if enabled
-            if self.config_manager.get('visualizer.type') == 'terminal':
+            if snapshot.visualizer.type == 'terminal':
                 # If multi-channel, average for terminal
                 terminal_bars = bars
-                if isinstance(bars, list):
+                if bars.ndim > 1:
                     terminal_bars = np.mean(bars, axis=0)
                 
                 if self.tui:
@@ -225,9 +311,11 @@ class AudioVisualizerApp:
         sys.stdout.write(f"Display:    {self.config_manager.get('terminal.display_type', 'bar')} (t)\n")
         sys.stdout.write(f"Color:      {self.config_manager.get('terminal.color_profile', 'default')} (p)\n")
         sys.stdout.write(f"Recording:  {'ON' if self.recorder.recording else 'OFF'} (r)\n")
+        output = self.output.stats()
+        sys.stdout.write(f"Output:     {output['latency_ms']:.0f} ms, {output['underruns']} underruns\n")
         sys.stdout.write(f"Input:      {self.config_manager.get('audio.input_type')} \n")
         sys.stdout.write(f"File:       {os.path.basename(self.config_manager.get('audio.file_path', 'N/A'))}\n")
-        sys.stdout.write("\nPress 'c' to reset all effects.\n")
+        sys.stdout.write("\nPress ',' / '.' to seek, 'c' to reset all effects.\n")
         sys.stdout.write("Press 'm' to close menu, 'q' to quit.\n")
         sys.stdout.flush()
 
@@ -236,6 +324,11 @@ class AudioVisualizerApp:
         self.running = True
         self.state_machine.set_app_state(AppState.RUNNING)
         self.server.start()
+        if self.worker:
+            try:
+                self.worker.start()
+            except Exception as e:
+                logger.error(f"Failed to start analysis worker, analysing in-thread: {e}")
         
         # Start threads
         self.viz_thread = threading.Thread(target=self.visualization_loop, daemon=True)
@@ -243,6 +336,9 @@ class AudioVisualizerApp:
         
         self.playback_thread = threading.Thread(target=self.playback_loop, daemon=True)
         self.playback_thread.start()
+
+        self.record_thread = threading.Thread(target=self.record_loop, daemon=True)
+        self.record_thread.start()
         
         self.input.start()
 
@@ -283,6 +379,12 @@ class AudioVisualizerApp:
             self.recorder.stop()
         if self.server:
             self.server.stop()
+        if self.worker:
+            # The visualization thread may still be reading the result ring
+            if self.viz_thread and self.viz_thread is not threading.current_thread():
+                self.viz_thread.join(timeout=1.0)
+            self.worker.stop()
+            self.worker.close()
         if self.keyboard:
             self.keyboard.stop()
             
@@ -0,0 +1,65 @@
+"""
+Headless offline render: process and analyse audio files as fast as the CPU allows.
+
+Usage: python src/render.py track.mp3 [more files...] -o renders/ [--config config/default.yaml]
+           [--set processing.pitch=0.8 ...] [--no-audio]
+
+Each input gets its own folder under the output directory (see OfflineRenderer
+for the files written there).
+"""
+import argparse
+import os
+import sys
+import yaml
+from config.manager import ConfigManager
+from audio.offline import OfflineRenderer
+from utils.logger import logger
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render processed audio and per-frame analysis without playback.")
+    parser.add_argument('inputs', nargs='+', help="audio files to render")
+    parser.add_argument('-o', '--output', default='renders', help="output directory (one folder per input)")
+    parser.add_argument('-c', '--config', default='config/default.yaml', help="processing and analysis config")
+    parser.add_argument('-s', '--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="override a config value, e.g. processing.pitch=0.8 (repeatable)")
+    parser.add_argument('--no-audio', action='store_true', help="only write the analysis, not the processed audio")
+    parser.add_argument('--block-seconds', type=float, default=1.5, help="seconds of audio processed per block")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    config_manager = ConfigManager(args.config)
+    for override in args.set:
+        key, sep, value = override.partition('=')
+        if not sep:
+            sys.exit(f"Invalid override {override!r}, expected KEY=VALUE")
+        config_manager.set(key, yaml.safe_load(value))
+
+    sample_rate = config_manager.get('audio.sample_rate', 44100)
+    failed = 0
+    for path in args.inputs:
+        if not os.path.exists(path):
+            logger.error(f"File not found: {path}")
+            failed += 1
+            continue
+        # A fresh renderer per file: no effect or analysis state carries over
+        renderer = OfflineRenderer(config_manager, block_frames=max(1, int(args.block_seconds * sample_rate)))
+        out_dir = os.path.join(args.output, os.path.splitext(os.path.basename(path))[0])
+
+        def progress(seconds):
+            sys.stderr.write(f"\r{os.path.basename(path)}: {seconds:.0f}s")
+            sys.stderr.flush()
+        try:
+            summary = renderer.render(path, out_dir, write_audio=not args.no_audio, progress=progress)
+        except Exception as e:
+            sys.stderr.write("\n")
+            logger.error(f"Error rendering {path}: {e}")
+            failed += 1
+            continue
+        speed = summary['source_seconds'] / summary['render_seconds'] if summary['render_seconds'] > 0 else 0.0
+        sys.stderr.write(f"\r{os.path.basename(path)}: {summary['source_seconds']:.1f}s in "
+                         f"{summary['render_seconds']:.1f}s ({speed:.0f}x real time) -> {out_dir}\n")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,123 @@ import json
 import threading
 import queue
 import os
+import yaml
 from utils.logger import logger
 
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aac')
+
 class VisualizerServer:
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+        self.host = config_manager.get('browser.host', '0.0.0.0')
+        self.port = config_manager.get('browser.port', 8000)
+        self.app = FastAPI()
+        self.clients = []
+        self.queue = queue.Queue()
+        self.on_toggle_recording = None
+        self.is_recording_callback = None
+        self.playlist = None # Playlist edited by playlist_* messages
+        self.on_seek = None # callable(seconds, relative)
+        self.color_profiles = self.load_color_profiles()
+        self.setup_routes()
+        config_manager.register_callback(self.on_config_change)
+
+    def load_color_profiles(self):
+        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config', 'colors.yaml')
+        if os.path.exists(config_path):
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f).get('profiles', {})
+        return {}
+
+    def is_recording(self):
+        return bool(self.is_recording_callback and self.is_recording_callback())
+
+    def list_files(self):
+        """
+        Audio files offered by the browser's source picker (browser.media_dir, or the folder of audio.file_path).
+        """
+        media_dir = self.config_manager.get('browser.media_dir') or os.path.dirname(self.config_manager.get('audio.file_path') or '')
+        media_dir = os.path.expanduser(media_dir)
+        if not media_dir or not os.path.isdir(media_dir):
+            return []
+        return sorted(os.path.join(media_dir, name) for name in os.listdir(media_dir)
+                      if name.lower().endswith(AUDIO_EXTENSIONS))
+
+    def setup_routes(self):
+        static_dir = os.path.join(os.path.dirname(__file__), 'static')
+
+        @self.app.get("/files")
+        async def files():
+            return {"files": self.list_files()}
+
+        @self.app.websocket("/ws")
+        async def websocket_endpoint(websocket: WebSocket):
+            await websocket.accept()
+            self.clients.append(websocket)
+            await websocket.send_text(json.dumps({
+                "type": "init",
+                "profiles": self.color_profiles,
+                "config": self.config_manager.config
+            }))
+            if self.playlist is not None:
+                await websocket.send_text(json.dumps(self.playlist_message()))
+            try:
+                while True:
+                    text = await websocket.receive_text()
+                    # A bad message is logged and skipped; only a disconnect ends the session
+                    try:
+                        self.handle_message(json.loads(text))
+                    except Exception as e:
+                        logger.error(f"Error handling WebSocket message {text[:200]!r}: {e}")
+            except WebSocketDisconnect:
+                pass
+            finally:
+                if websocket in self.clients:
+                    self.clients.remove(websocket)
+
+        self.app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
+
+    def handle_message(self, message):
+        kind = message.get('type')
+        if kind == 'config_update':
+            for key, value in message.get('data', {}).items():
+                self.config_manager.set(key, value)
+        elif kind == 'toggle_recording':
+            if self.on_toggle_recording:
+                self.on_toggle_recording()
+        elif kind == 'seek':
+            if self.on_seek:
+                self.on_seek(float(message['position']), bool(message.get('relative', False)))
+        elif kind in ('playlist_enqueue', 'playlist_skip', 'playlist_reorder', 'playlist_remove'):
+            self.handle_playlist_message(kind, message)
+
+    def handle_playlist_message(self, kind, message):
+        playlist = self.playlist
+        if playlist is None:
+            return
+        if kind == 'playlist_enqueue':
+            playlist.enqueue(message['path'], message.get('index'))
+        elif kind == 'playlist_skip':
+            playlist.skip()
+        elif kind == 'playlist_reorder':
+            playlist.reorder(int(message['from']), int(message['to']))
+        elif kind == 'playlist_remove':
+            playlist.remove(int(message['index']))
+        self.send_playlist()
+
+    def on_config_change(self, key, value):
+        self.queue.put({"type": "config_update", "config": self.config_manager.config})
+
+    def playlist_message(self):
+        return {"type": "playlist", **self.playlist.state()}
+
+    def send_playlist(self):
+        """
+        Broadcast the queue and the playing index to all connected clients.
+        """
+        if self.playlist is not None:
+            self.queue.put(self.playlist_message())
+
     async def broadcast_worker(self):
         while True:
             try:
@@ -75,14 +189,12 @@ class VisualizerServer:
         if hasattr(self, 'server'):
             self.server.should_exit = True
 
-    def send_data(self, bars, audio_data=None, is_beat=False):
+    def send_data(self, bars, audio_data=None, is_beat=False, onsets=None, tempo=None, peaks=None, position=None):
         """
         Queue FFT data and optionally audio data to all connected clients.
         """
-        if isinstance(bars, list):
-            bars_data = [b.tolist() if hasattr(b, 'tolist') else b for b in bars]
-        else:
-            bars_data = bars.tolist() if hasattr(bars, 'tolist') else bars
+        # (num_bars,) or (channels, num_bars) arrays serialize to nested lists
+        bars_data = bars.tolist() if hasattr(bars, 'tolist') else bars
             
         data = {
             "type": "visualization",
@@ -90,4 +202,16 @@ class VisualizerServer:
             "recording": self.is_recording(),
             "is_beat": is_beat
         }
+        if onsets is not None:
+            # Per-band onset strengths (flux relative to its running mean)
+            data["onsets"] = onsets.tolist() if hasattr(onsets, 'tolist') else onsets
+        if tempo is not None:
+            # {"bpm", "confidence", "phase", "next_beat"} from the tempo tracker
+            data["tempo"] = tempo
+        if peaks is not None:
+            # Peak-hold markers, same shape and 0..1 scale as the smoothed bars
+            data["peaks"] = peaks.tolist() if hasattr(peaks, 'tolist') else peaks
+        if position is not None:
+            # Playback position in the file, seconds
+            data["position"] = round(position, 3)
         self.queue.put(data)
@@ -33,7 +33,7 @@ class TerminalVisualizer:
             
         if profile_type == 'amplitude':
             # Map bar value to color gradient
-            max_val = np.max(bars) if np.max(bars) > 0 else 1
+            max_val = max(np.max(bars), 1.0) # bars arrive smoothed and auto-gained to 0..1
             # We want to pick a color from the gradient based on the bar's relative amplitude
             gradient = get_color_gradient(colors, 100)
             result = []
@@ -59,7 +59,7 @@ class TerminalVisualizer:
         self.update_size()
         num_bars = min(len(bars), self.width)
         bars_subset = bars[:num_bars]
-        max_val = np.max(bars_subset) if np.max(bars_subset) > 0 else 1
+        max_val = max(np.max(bars_subset), 1.0)
         
         display_type = self.config_manager.get('terminal.display_type', 'bar')
         if display_type == 'bi-directional':
@@ -83,7 +83,7 @@ class TerminalVisualizer:
         self.update_size()
         num_bars = min(len(bars), self.width)
         bars_subset = bars[:num_bars]
-        max_val = np.max(bars_subset) if np.max(bars_subset) > 0 else 1
+        max_val = max(np.max(bars_subset), 1.0)
         
         half_height = (self.height - 2) // 2
         scaled_bars = (bars_subset / max_val * half_height).astype(int)
@@ -112,7 +112,7 @@ class TerminalVisualizer:
         self.update_size()
         num_points = min(len(bars), self.width * 2)
         bars_subset = bars[:num_points]
-        max_val = np.max(bars_subset) if np.max(bars_subset) > 0 else 1
+        max_val = max(np.max(bars_subset), 1.0)
         dot_height = self.height * 4
         scaled_points = (bars_subset / max_val * (dot_height - 1)).astype(int)
         
@@ -154,7 +154,7 @@ class TerminalVisualizer:
         self.update_size()
         num_bars = min(len(bars), self.width * 2)
         bars_subset = bars[:num_bars]
-        max_val = np.max(bars_subset) if np.max(bars_subset) > 0 else 1
+        max_val = max(np.max(bars_subset), 1.0)
         dot_height = self.height * 4
         scaled_bars = (bars_subset / max_val * dot_height).astype(int)
         
@@ -45,7 +45,7 @@ class VisualizerWidget(Static):
             indices = np.linspace(0, num_bars - 1, width).astype(int)
             bars = bars[indices]
         
-        max_val = np.max(bars) if np.max(bars) > 0 else 1
+        max_val = max(np.max(bars), 1.0) # bars arrive smoothed and auto-gained to 0..1
         
         profile = self.profiles.get(self.color_profile, self.profiles.get('default', {}))
         
@@ -62,7 +62,7 @@ class VisualizerWidget(Static):
             return [profile.get('color', colors[0])] * len(bars)
             
         if profile_type == 'amplitude':
-            max_val = np.max(bars) if np.max(bars) > 0 else 1
+            max_val = max(np.max(bars), 1.0)
             gradient = get_hex_gradient(colors, 100)
             return [gradient[int(min(v / max_val * 99, 99))] for v in bars]
             
@@ -155,7 +155,7 @@ class SettingsSidebar(Vertical):
             yield Switch(id="recording-switch")
             
         yield Button("Reset Effects", variant="error", id="reset-button")
-        yield Label("\n[Controls]\nQ: Quit\nM: Toggle Settings\n+/-: Volume\n[/]: Pitch\nR: Record\nT: Display Type", classes="help-text")
+        yield Label("\n[Controls]\nQ: Quit\nM: Toggle Settings\n+/-: Volume\n[/]: Pitch\nR: Record\nT: Display Type\n\u2190/\u2192: Seek", classes="help-text")
 
 class AudioVisualizerTUI(App):
     CSS = """
@@ -220,6 +220,8 @@ class AudioVisualizerTUI(App):
         Binding("p", "cycle_color_profile", "Colors"),
         Binding("right_bracket", "increment_pitch", "Pitch+"),
         Binding("left_bracket", "decrement_pitch", "Pitch-"),
+        Binding("left", "seek_backward", "Seek-"),
+        Binding("right", "seek_forward", "Seek+"),
     ]
 
     def __init__(self, app_instance, **kwargs):
@@ -254,6 +256,12 @@ class AudioVisualizerTUI(App):
         self.app_instance.handle_key('[')
         self._sync_sliders()
 
+    def action_seek_backward(self) -> None:
+        self.app_instance.handle_key(',')
+
+    def action_seek_forward(self) -> None:
+        self.app_instance.handle_key('.')
+
     def action_cycle_display_type(self) -> None:
         self.app_instance.handle_key('t')
         viz = self.query_one(VisualizerWidget)
@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+import sys
+import os
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.analysis_cache import AnalysisCache, compute_timeline, onset_strengths
+from audio.stft import STFTAnalyzer
+from audio.onset import OnsetDetector
+from audio.filterbank import project_bars
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.audio_path = os.path.join(self.dir, "track.wav")
+        with open(self.audio_path, 'wb') as f:
+            f.write(b"placeholder")
+        self.cache = AnalysisCache(os.path.join(self.dir, "cache"))
+        self.params = {
+            'sample_rate': 44100, 'channels': 1, 'fft_size': 1024, 'hop_size': 512,
+            'window': 'hann', 'zero_pad': 1, 'num_bars': 32, 'bar_scale': 'log',
+            'freq_range': (20, 20000), 'resolutions': None,
+            'onset_bands': ((20, 150), (150, 2000), (2000, 8000)), 'history_frames': 20,
+        }
+        rng = np.random.default_rng(0)
+        self.samples = (rng.standard_normal(44100) * 3000).astype(np.int16)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_matches_live_analysis(self):
+        timeline = self.cache.get(self.audio_path, lambda: [self.samples], self.params)
+        self.assertEqual(len(timeline), len(self.samples) // 512)
+        self.assertIsInstance(timeline.bars, np.memmap)
+
+        stft = STFTAnalyzer(1024, 512, 44100)
+        detector = OnsetDetector(stft.frame_rate, bands=self.params['onset_bands'])
+        detector.history_len = 20
+        detector.history = np.zeros((20, 3))
+        mask = (stft.frequencies >= 20) & (stft.frequencies <= 20000)
+        frequencies = stft.frequencies[mask]
+
+        frame = 0
+        for start in range(0, len(self.samples), 700):
+            for spectrum in stft.push(self.samples[start:start + 700])[..., mask]:
+                bars = project_bars(spectrum, frequencies, 32, 'log', (20, 20000))
+                strengths = detector.process(spectrum, frequencies)
+                np.testing.assert_allclose(timeline.bars[frame], bars, rtol=1e-3, atol=1e-2)
+                np.testing.assert_allclose(timeline.onsets[frame], strengths, rtol=1e-3, atol=1e-4)
+                frame += 1
+        self.assertEqual(frame, len(timeline))
+
+    def test_frame_lookup_by_position(self):
+        timeline = self.cache.get(self.audio_path, lambda: [self.samples], self.params)
+        self.assertEqual(timeline.frame_index(100), -1)
+        self.assertEqual(timeline.frame_index(512), 0)
+        self.assertEqual(timeline.frame_index(1535), 1)
+        self.assertEqual(timeline.frame_index(10 ** 9), len(timeline) - 1)
+
+    def test_key_includes_file_and_params(self):
+        self.cache.get(self.audio_path, lambda: [self.samples], self.params)
+        self.assertIsNotNone(self.cache.load(self.audio_path, self.params))
+        self.assertIsNone(self.cache.load(self.audio_path, dict(self.params, num_bars=64)))
+        with open(self.audio_path, 'ab') as f:
+            f.write(b"changed")
+        self.assertIsNone(self.cache.load(self.audio_path, self.params))
+
+    def test_multiresolution_timeline(self):
+        params = dict(self.params, channels=2, resolutions=((4096, 1024, 300), (1024, 512, 20000)))
+        stereo = np.repeat(self.samples, 2)
+        timeline = self.cache.get(self.audio_path, lambda: [stereo], params)
+        self.assertEqual(timeline.bars.shape, (len(self.samples) // 512, 2, 32))
+        self.assertTrue(np.all(np.asarray(timeline.bars[10:]) > 0))
+
+    def test_block_size_does_not_change_result(self):
+        for resolutions in (None, ((4096, 1024, 300), (1024, 512, 20000))):
+            params = dict(self.params, resolutions=resolutions)
+            whole = os.path.join(self.dir, "whole")
+            blocks = os.path.join(self.dir, "blocks")
+            compute_timeline(self.samples, params, whole + ".bars.npy", whole + ".onsets.npy")
+            sizes = [1, 100, 4000, 333, 7000]
+            pieces, pos = [], 0
+            while pos < len(self.samples):
+                size = sizes[len(pieces) % len(sizes)]
+                pieces.append(self.samples[pos:pos + size])
+                pos += size
+            compute_timeline(iter(pieces), params, blocks + ".bars.npy", blocks + ".onsets.npy")
+            np.testing.assert_allclose(np.load(blocks + ".bars.npy"), np.load(whole + ".bars.npy"), rtol=1e-5)
+            np.testing.assert_allclose(np.load(blocks + ".onsets.npy"), np.load(whole + ".onsets.npy"), rtol=1e-5)
+
+    def test_onset_strengths_running_mean(self):
+        flux = np.array([[0.0], [2.0], [4.0], [1.0]])
+        np.testing.assert_allclose(onset_strengths(flux, 2)[:, 0], [0, 0, 4 / 1.0, 1 / 3.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.analysis_worker import AnalysisWorker, pack_result, unpack_result
+from config.manager import ConfigManager
+
+class TestResultRecord(unittest.TestCase):
+    def test_round_trip(self):
+        bars = np.random.rand(2, 8).astype(np.float32)
+        peaks = np.random.rand(2, 8).astype(np.float32)
+        tempo = {"bpm": 120.0, "confidence": 0.5, "phase": 0.25, "next_beat": None}
+        record = pack_result(bars, peaks, True, np.array([1.5, 0.2, 0.0]), tempo, 4096)
+        out_bars, out_peaks, is_beat, onsets, out_tempo, position = unpack_result(record)
+        np.testing.assert_array_equal(out_bars, bars)
+        np.testing.assert_array_equal(out_peaks, peaks)
+        self.assertTrue(is_beat)
+        np.testing.assert_array_equal(onsets, [1.5, 0.2, 0.0])
+        self.assertEqual(out_tempo, tempo)
+        self.assertEqual(position, 4096)
+
+    def test_mono_without_position(self):
+        tempo = {"bpm": 0.0, "confidence": 0.0, "phase": 0.0, "next_beat": 0.3}
+        bars, peaks, is_beat, _, out_tempo, position = unpack_result(pack_result(np.ones(4), np.ones(4), False, [], tempo, None))
+        self.assertEqual(bars.shape, (4,))
+        self.assertFalse(is_beat)
+        self.assertIsNone(position)
+        self.assertEqual(out_tempo["next_beat"], 0.3)
+
+class TestAnalysisWorker(unittest.TestCase):
+    def test_worker_process_produces_bars(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        config_path = os.path.join(directory.name, 'config.yaml')
+        with open(config_path, 'w') as f:
+            f.write("audio:\n  sample_rate: 44100\n  chunk_size: 512\n"
+                    "visualizer:\n  fft_size: 1024\n  num_bars: 16\n"
+                    "cache:\n  analysis: false\n")
+        worker = AnalysisWorker(ConfigManager(config_path), 16, 2048)
+        worker.start()
+        try:
+            t = np.arange(512 * 40) / 44100
+            audio = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.float32)
+            result = None
+            deadline = time.monotonic() + 30
+            chunk = 0
+            while result is None and time.monotonic() < deadline:
+                if chunk < 40:
+                    worker.frames.write(audio[chunk * 512:(chunk + 1) * 512], position=(chunk + 1) * 512)
+                    chunk += 1
+                result = worker.read(timeout=0.05)
+            self.assertIsNotNone(result, "no result from the worker process")
+            bars, peaks, is_beat, onsets, tempo, position = result
+            self.assertEqual(bars.shape, (16,))
+            self.assertGreater(np.max(bars), 0)
+            self.assertIsNotNone(position)
+        finally:
+            worker.stop()
+            worker.close()
+        self.assertFalse(worker.alive())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+import sys
+import os
+
+# Add benchmarks (and, through it, src) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks")))
+
+import suite
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_compare_flags_only_changes_beyond_tolerance(self):
+        baseline = {'a': 100.0, 'b': 100.0, 'c': 100.0, 'gone': 5.0}
+        results = {'a': 124.0, 'b': 130.0, 'c': 70.0, 'new': 1.0}
+        regressions, improvements = suite.compare(results, baseline, tolerance=0.25)
+        self.assertEqual(regressions, [('b', 100.0, 130.0)])
+        self.assertEqual(improvements, [('c', 100.0, 70.0)])
+
+    def test_every_case_runs(self):
+        # One call per case keeps the suite from rotting as the code it times changes
+        cases = suite.collect(min_time=0)
+        results = suite.run(cases, repeat=1)
+        self.assertEqual(len(results), len(cases))
+        self.assertTrue(any(name.startswith('apply_transformations/') for name in results))
+        self.assertTrue(all(us > 0 for us in results.values()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.bus import BufferPool, quantize
+
+class TestBus(unittest.TestCase):
+    def test_quantize_clips_and_truncates(self):
+        data = np.array([1.7, -2.9, 40000.0, -40000.5, 0.0], dtype=np.float32)
+        out = quantize(data)
+        self.assertEqual(out.dtype, np.int16)
+        np.testing.assert_array_equal(out, [1, -2, 32767, -32768, 0])
+        
+        target = np.empty(5, dtype=np.int16)
+        self.assertIs(quantize(data, out=target), target)
+
+    def test_pool_reuses_buffers(self):
+        pool = BufferPool()
+        first = pool.get('stage', 512, 2)
+        self.assertEqual(first.shape, (512, 2))
+        self.assertEqual(first.dtype, np.float32)
+        # Same or smaller requests share memory, larger ones grow the buffer
+        self.assertTrue(np.shares_memory(first, pool.get('stage', 511, 2)))
+        self.assertFalse(np.shares_memory(first, pool.get('stage', 1024, 2)))
+        self.assertEqual(pool.get('mono', 256).shape, (256,))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,39 @@ class TestConfigManager(unittest.TestCase):
         self.manager.set('new.key', 123)
         self.assertEqual(self.manager.get('new.key'), 123)
 
+    def test_snapshot(self):
+        snapshot = self.manager.snapshot
+        self.assertEqual(snapshot.audio.input_type, 'microphone')
+        self.assertEqual(snapshot.visualizer.fps, 30)
+        self.assertEqual(snapshot.processing.volume, 1.0) # default
+        with self.assertRaises(Exception):
+            snapshot.processing.volume = 2.0
+        
+        # set() swaps in a new typed snapshot with a bumped version
+        self.manager.set('processing.volume', 2)
+        self.manager.set('visualizer.frequency_range', [30, 15000])
+        self.assertIsNot(self.manager.snapshot, snapshot)
+        self.assertEqual(self.manager.snapshot.version, snapshot.version + 2)
+        self.assertIsInstance(self.manager.snapshot.processing.volume, float)
+        self.assertEqual(self.manager.snapshot.visualizer.frequency_range, (30, 15000))
+        self.assertEqual(snapshot.processing.volume, 1.0) # old snapshot untouched
+
+    def test_rejected_value_is_rolled_back(self):
+        snapshot = self.manager.snapshot
+        with self.assertRaises(ValueError):
+            self.manager.set('processing.volume', 'abc')
+        self.assertIsNone(self.manager.get('processing.volume'))
+        self.assertIs(self.manager.snapshot, snapshot)
+
+        # Later updates still go through
+        self.manager.set('processing.pitch', 0.8)
+        self.assertEqual(self.manager.snapshot.processing.pitch, 0.8)
+        self.manager.set('processing.volume', 0.5)
+        with self.assertRaises(ValueError):
+            self.manager.set('processing.volume', 'abc')
+        self.assertEqual(self.manager.get('processing.volume'), 0.5)
+        self.assertEqual(self.manager.snapshot.processing.volume, 0.5)
+
     def test_save(self):
         self.manager.set('audio.input_type', 'file')
         self.manager.save()
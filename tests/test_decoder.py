@@ -0,0 +1,111 @@
+import unittest
+import numpy as np
+import sys
+import os
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.decoder import PCMRing, StreamingDecoder, ArraySource, decode_blocks, ffmpeg_command
+
+def pcm_command(num_samples, chunk_bytes=333, status=0):
+    # A stand-in decoder process writing a known int16 ramp in odd-sized pieces
+    script = (
+        "import sys, numpy as np\n"
+        f"data = (np.arange({num_samples}) % 30000).astype('<i2').tobytes()\n"
+        f"for i in range(0, len(data), {chunk_bytes}):\n"
+        f"    sys.stdout.buffer.write(data[i:i + {chunk_bytes}]); sys.stdout.buffer.flush()\n"
+        f"sys.exit({status})\n"
+    )
+    return [sys.executable, "-c", script]
+
+class TestPCMRing(unittest.TestCase):
+    def test_fifo_across_wraparound_with_backpressure(self):
+        ring = PCMRing(100)
+        data = (np.arange(5000) % 30000).astype(np.int16)
+
+        def produce():
+            for start in range(0, len(data), 37):
+                ring.write(data[start:start + 37])
+            ring.close()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        received = []
+        while True:
+            chunk = ring.read(64)
+            if len(chunk) == 0:
+                break
+            received.append(chunk.copy())
+            self.assertLessEqual(ring.count, ring.capacity)
+        producer.join()
+        np.testing.assert_array_equal(np.concatenate(received), data)
+
+    def test_close_unblocks_writer(self):
+        ring = PCMRing(10)
+        results = []
+        writer = threading.Thread(target=lambda: results.append(ring.write(np.zeros(50, dtype=np.int16))))
+        writer.start()
+        ring.close()
+        writer.join(timeout=2.0)
+        self.assertEqual(results, [False])
+
+class TestStreamingDecoder(unittest.TestCase):
+    def test_streams_whole_frames_in_order(self):
+        decoder = StreamingDecoder("track", 44100, 2, buffer_seconds=0.01, block_frames=100,
+                                   command=pcm_command(20000))
+        decoder.start()
+        received = []
+        while True:
+            chunk = decoder.read(512)
+            if len(chunk) == 0:
+                break
+            received.append(chunk.copy())
+        decoder.close()
+        self.assertIsNone(decoder.error)
+        # Memory is bounded by the ring, not the track
+        self.assertLess(decoder.ring.capacity, 20000)
+        np.testing.assert_array_equal(np.concatenate(received), np.arange(20000) % 30000)
+
+    def test_blocks_hold_whole_frames(self):
+        blocks = list(decode_blocks(pcm_command(9000), channels=2, block_frames=100))
+        self.assertTrue(all(len(block) % 2 == 0 for block in blocks))
+        self.assertEqual(sum(len(block) for block in blocks), 9000)
+
+    def test_failed_decode_reports_error(self):
+        decoder = StreamingDecoder("track", 44100, 1, command=pcm_command(100, status=1))
+        decoder.start()
+        self.assertEqual(len(decoder.read(1000)), 100)
+        decoder.close()
+        self.assertIsInstance(decoder.error, RuntimeError)
+
+    def test_seek_restarts_from_offset(self):
+        command = ffmpeg_command("track.mp3", 44100, 2, start=1.5)
+        self.assertLess(command.index('-ss'), command.index('-i'))
+        self.assertEqual(command[command.index('-ss') + 1], '1.500000')
+        self.assertNotIn('-ss', ffmpeg_command("track.mp3", 44100, 2))
+        # A custom command has no notion of a start offset
+        decoder = StreamingDecoder("track", 44100, 1, command=pcm_command(100))
+        with self.assertRaises(RuntimeError):
+            decoder.seek(10)
+
+class TestArraySource(unittest.TestCase):
+    def test_sequential_views(self):
+        source = ArraySource(np.arange(10, dtype=np.int16))
+        np.testing.assert_array_equal(source.read(4), [0, 1, 2, 3])
+        np.testing.assert_array_equal(source.read(10), [4, 5, 6, 7, 8, 9])
+        self.assertEqual(len(source.read(4)), 0)
+
+    def test_seek(self):
+        source = ArraySource(np.arange(10, dtype=np.int16))
+        source.seek(7)
+        out = np.zeros(4, dtype=np.int16)
+        np.testing.assert_array_equal(source.read(4, out=out), [7, 8, 9])
+        source.seek(2)
+        np.testing.assert_array_equal(source.read(2), [2, 3])
+        source.seek(100)
+        self.assertEqual(len(source.read(4)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
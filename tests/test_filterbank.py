@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.filterbank import bar_filterbank, apply_filterbank, SCALES
+
+class TestFilterbank(unittest.TestCase):
+    def setUp(self):
+        freqs = np.fft.rfftfreq(2048, 1 / 44100)
+        self.frequencies = freqs[(freqs >= 20) & (freqs <= 20000)]
+
+    def test_rows_are_normalized_and_nonempty(self):
+        for scale in SCALES:
+            bank = bar_filterbank(scale, self.frequencies, 64, (20, 20000))
+            self.assertEqual(bank.shape, (64, len(self.frequencies)))
+            np.testing.assert_allclose(np.asarray(bank.sum(axis=1)).ravel(), 1.0, rtol=1e-5)
+            # Sparse: each filter only touches its own band
+            self.assertLess(bank.nnz, 0.2 * 64 * len(self.frequencies))
+
+    def test_cached_per_axis(self):
+        a = bar_filterbank('mel', self.frequencies, 32, (20, 20000))
+        b = bar_filterbank('mel', self.frequencies.copy(), 32, [20, 20000])
+        self.assertIs(a, b)
+        self.assertIsNot(a, bar_filterbank('mel', self.frequencies, 48, (20, 20000)))
+
+    def test_tone_lands_in_increasing_bars(self):
+        for scale in SCALES:
+            bank = bar_filterbank(scale, self.frequencies, 40, (20, 20000))
+            positions = []
+            for tone in (100, 1000, 10000):
+                mags = np.zeros(len(self.frequencies))
+                mags[np.argmin(np.abs(self.frequencies - tone))] = 1.0
+                positions.append(int(np.argmax(apply_filterbank(bank, mags))))
+            self.assertEqual(positions, sorted(set(positions)), scale)
+
+    def test_multichannel_single_product(self):
+        bank = bar_filterbank('erb', self.frequencies, 24, (20, 20000))
+        rng = np.random.default_rng(0)
+        mags = rng.random((2, len(self.frequencies)))
+        bars = apply_filterbank(bank, mags)
+        self.assertEqual(bars.shape, (2, 24))
+        np.testing.assert_allclose(bars[1], apply_filterbank(bank, mags[1]), rtol=1e-5)
+
+    def test_unknown_scale(self):
+        with self.assertRaises(ValueError):
+            bar_filterbank('octave', self.frequencies, 8, (20, 20000))
+
+if __name__ == '__main__':
+    unittest.main()
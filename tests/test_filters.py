@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scipy import signal
+from audio.filters import FilterChain, design_sos
+
+class TestFilterChain(unittest.TestCase):
+    def test_design_cache(self):
+        design_sos.cache_clear()
+        first = design_sos('lowpass', 4, 1000.0, 44100)
+        second = design_sos('lowpass', 4, 1000.0, 44100)
+        self.assertIs(first, second)
+        self.assertEqual(design_sos.cache_info().hits, 1)
+
+    def test_merged_cascade_matches_separate_filters(self):
+        data = np.random.randn(4096, 2)
+        chain = FilterChain(44100, channels=2, dtype=np.float64)
+        out = np.concatenate([chain.process(data[i:i + 512], 5000.0, 200.0) for i in range(0, len(data), 512)])
+        
+        expected = signal.sosfilt(design_sos('lowpass', 4, 5000.0, 44100), data, axis=0)
+        expected = signal.sosfilt(design_sos('highpass', 4, 200.0, 44100), expected, axis=0)
+        np.testing.assert_allclose(out, expected, atol=1e-9)
+
+    def test_float32_bus_is_not_upcast(self):
+        chain = FilterChain(44100)
+        out = chain.process(np.random.randn(512).astype(np.float32), 1000.0, 50.0)
+        self.assertEqual(out.dtype, np.float32)
+
+    def test_state_survives_coefficient_swap(self):
+        rng = np.random.default_rng(0)
+        chunks = [rng.standard_normal(512) for _ in range(3)]
+        chain = FilterChain(44100, dtype=np.float64)
+        chain.process(chunks[0], 2000.0, 0.0)
+        lpf_state = chain.zi.copy()
+        self.assertEqual(chain.zi.shape, (2, 2))
+
+        # Enabling the HPF keeps the LPF sections' state and starts the HPF sections from zero
+        out = chain.process(chunks[1], 2000.0, 100.0)
+        self.assertEqual(chain.zi.shape, (4, 2))
+        lpf_sos = design_sos('lowpass', 4, 2000.0, 44100)
+        hpf_sos = design_sos('highpass', 4, 100.0, 44100)
+        expected, lpf_state = signal.sosfilt(lpf_sos, chunks[1], zi=lpf_state)
+        expected, hpf_state = signal.sosfilt(hpf_sos, expected, zi=np.zeros((2, 2)))
+        np.testing.assert_allclose(out, expected, atol=1e-9)
+
+        # Moving a cutoff swaps coefficients only: both stages continue from their state
+        out = chain.process(chunks[2], 2500.0, 100.0)
+        self.assertEqual(chain.zi.shape, (4, 2))
+        expected, _ = signal.sosfilt(design_sos('lowpass', 4, 2500.0, 44100), chunks[2], zi=lpf_state)
+        expected, _ = signal.sosfilt(hpf_sos, expected, zi=hpf_state)
+        np.testing.assert_allclose(out, expected, atol=1e-9)
+
+if __name__ == '__main__':
+    unittest.main()
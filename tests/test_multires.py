@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.stft import SampleRing
+from audio.multires import MultiResolutionAnalyzer
+from audio.filterbank import bar_centers
+
+class TestMultiResolutionAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.ring = SampleRing(8192)
+        self.analyzer = MultiResolutionAnalyzer(self.ring, 44100, [[8192, 2048, 250], [2048, 512, 2500], [512, 512, 20000]])
+
+    def feed(self, data, chunk=512):
+        for start in range(0, len(data), chunk):
+            block = data[start:start + chunk]
+            self.ring.write(block)
+            self.analyzer.update(len(block))
+
+    def test_long_ffts_follow_their_hop(self):
+        self.feed(np.zeros(512 * 32, dtype=np.float32))
+        computed = [level['computed'] for level in self.analyzer.levels]
+        # First chunk computes everything, then once per hop on the stream's hop grid
+        self.assertEqual(computed, [1 + 32 * 512 // 2048, 32, 32])
+
+    def test_bass_tone_resolved_by_long_fft(self):
+        t = np.arange(16384) / 44100
+        self.feed((np.sin(2 * np.pi * 60 * t) * 1000).astype(np.float32))
+        bars = self.analyzer.bars(48, (20, 20000))
+        self.assertEqual(bars.shape, (48,))
+        loudest = int(np.argmax(bars))
+        owner_rows = self.analyzer.layout[0][0]
+        self.assertIn(loudest, owner_rows)
+        # Bass bars come from the 8192-point FFT, treble from the 512-point one
+        self.assertGreater(len(owner_rows), 0)
+        self.assertGreater(len(self.analyzer.layout[2][0]), 0)
+
+    def bars_of(self, block, num_bars=64):
+        # One analysis of a full ring of `block`
+        self.ring.write(block)
+        self.analyzer.reset()
+        self.analyzer.update(len(block))
+        return self.analyzer.bars(num_bars, (20, 20000))
+
+    def test_levels_share_one_scale(self):
+        rng = np.random.default_rng(0)
+        noise = np.mean([self.bars_of(rng.standard_normal(8192).astype(np.float32) * 1000) for _ in range(16)], axis=0)
+        rows = [rows for rows, _ in self.analyzer.layout]
+        # (last bar of a resolution, first bar of the next) at every crossover
+        pairs = [(rows[i][-1], rows[i + 1][0]) for i in range(len(rows) - 1)]
+        centers = bar_centers('cqt', 64, (20, 20000))
+        t = np.arange(8192) / 44100
+        for low, high in pairs:
+            # Flat noise: no step at the crossover
+            self.assertAlmostEqual(noise[high] / noise[low], 1.0, delta=0.2)
+            # Equal-amplitude tones on either side read about the same
+            tones = [self.bars_of((np.sin(2 * np.pi * centers[bar] * t) * 1000).astype(np.float32))[bar] for bar in (low, high)]
+            self.assertAlmostEqual(tones[1] / tones[0], 1.0, delta=0.3)
+
+    def test_multichannel(self):
+        ring = SampleRing(2048, channels=2)
+        analyzer = MultiResolutionAnalyzer(ring, 44100, [[2048, 1024, 1000], [512, 512, 20000]])
+        ring.write(np.random.randn(2048, 2).astype(np.float32))
+        analyzer.update(2048)
+        self.assertEqual(analyzer.bars(32, (20, 20000), 'mel').shape, (2, 32))
+
+    def test_ring_must_hold_longest_fft(self):
+        with self.assertRaises(ValueError):
+            MultiResolutionAnalyzer(SampleRing(1024), 44100, [[2048, 512, 20000]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import sys
+import os
+import json
+import shutil
+import tempfile
+import wave
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.offline import OfflineRenderer
+from audio.processor import AudioProcessor
+from config.manager import ConfigManager
+
+class TestOfflineRenderer(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.dir, "config.yaml")
+        with open(self.config_path, 'w') as f:
+            f.write("audio:\n  sample_rate: 44100\n  chunk_size: 512\n"
+                    "visualizer:\n  fft_size: 1024\n  hop_size: 512\n  num_bars: 32\n"
+                    "processing:\n  lpf_cutoff: 4000.0\n  volume: 0.5\n"
+                    "cache:\n  pcm: false\n")
+        t = np.arange(44100 * 3) / 44100
+        # 2 Hz bursts over a 220 Hz tone
+        self.samples = (np.sin(2 * np.pi * 220 * t) * 6000 * (1 + (np.sin(2 * np.pi * 2 * t) > 0.9))).astype(np.int16)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def render(self, block_frames):
+        out_dir = os.path.join(self.dir, f"out{block_frames}")
+        renderer = OfflineRenderer(ConfigManager(self.config_path), block_frames=block_frames)
+        blocks = [self.samples[i:i + block_frames] for i in range(0, len(self.samples), block_frames)]
+        return renderer.render("track.wav", out_dir, blocks=blocks), out_dir
+
+    def test_matches_chunked_processing(self):
+        summary, out_dir = self.render(30000)
+
+        # Same processed audio as the real-time chain fed chunk by chunk
+        processor = AudioProcessor(ConfigManager(self.config_path))
+        live = np.concatenate([processor.apply_transformations(self.samples[i:i + 512]).copy()
+                               for i in range(0, len(self.samples), 512)])
+        with wave.open(os.path.join(out_dir, "audio.wav")) as f:
+            rendered = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        np.testing.assert_allclose(rendered, np.clip(live, -32768, 32767).astype(np.int16), atol=1)
+
+        # One analysis frame per hop, every output aligned on it
+        num_frames = len(self.samples) // 512
+        self.assertEqual(summary['frames'], num_frames)
+        for name, shape in (('bars', (num_frames, 32)), ('peaks', (num_frames, 32)), ('onsets', (num_frames, 3)),
+                            ('beats', (num_frames,)), ('tempo', (num_frames, 3)), ('times', (num_frames,))):
+            self.assertEqual(np.load(os.path.join(out_dir, name + ".npy")).shape, shape)
+        np.testing.assert_allclose(np.load(os.path.join(out_dir, "times.npy"))[-1], num_frames * 512 / 44100)
+        self.assertTrue(0 <= np.load(os.path.join(out_dir, "bars.npy")).max() <= 1)
+        self.assertGreater(np.load(os.path.join(out_dir, "beats.npy")).sum(), 0)
+        with open(os.path.join(out_dir, "render.json")) as f:
+            self.assertEqual(json.load(f)['frames'], num_frames)
+
+    def test_block_size_does_not_change_results(self):
+        _, small = self.render(4096)
+        _, large = self.render(65536)
+        for name in ('bars', 'onsets', 'tempo'):
+            np.testing.assert_allclose(np.load(os.path.join(small, name + ".npy")),
+                                       np.load(os.path.join(large, name + ".npy")), rtol=1e-4, atol=1e-4)
+
+if __name__ == '__main__':
+    unittest.main()
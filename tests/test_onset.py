@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.onset import OnsetDetector
+
+class TestOnsetDetector(unittest.TestCase):
+    def setUp(self):
+        self.frequencies = np.linspace(0, 22050, 513)
+
+    def test_history_length_from_frame_rate(self):
+        self.assertEqual(OnsetDetector(44100 / 512, history_seconds=1.0).history_len, 86)
+        self.assertEqual(OnsetDetector(44100 / 256, history_seconds=0.5).history_len, 86)
+
+    def test_bass_onset_is_reported_per_band(self):
+        detector = OnsetDetector(86.0, bands=[[20, 150], [150, 2000]], history_seconds=0.5)
+        rng = np.random.default_rng(0)
+        for _ in range(60):
+            detector.process(1.0 + 0.1 * rng.random(513), self.frequencies)
+        
+        kick = 1.0 + 0.1 * rng.random(513)
+        kick[self.frequencies < 150] += 5.0
+        strengths = detector.process(kick, self.frequencies)
+        self.assertEqual(strengths.shape, (2,))
+        self.assertGreater(strengths[0], 10)
+        self.assertLess(strengths[1], 3)
+
+    def test_running_sum_matches_history(self):
+        detector = OnsetDetector(10.0, history_seconds=1.0)
+        rng = np.random.default_rng(1)
+        for _ in range(25):
+            detector.process(rng.random((2, 513)), self.frequencies)
+        self.assertEqual(detector.count, 10)
+        np.testing.assert_allclose(detector.running_sum, detector.history.sum(axis=0))
+
+if __name__ == '__main__':
+    unittest.main()
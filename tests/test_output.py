@@ -0,0 +1,84 @@
+import unittest
+import importlib.util
+import sys
+import os
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.fake_streams import NullOutputStream
+
+class Config:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+@unittest.skipUnless(importlib.util.find_spec('pyaudio'), "PyAudio not installed")
+class TestAudioOutput(unittest.TestCase):
+    def make_output(self, **stream_args):
+        from audio.output import AudioOutput
+        config = Config({'audio.chunk_size': 256, 'audio.target_latency': 0.02})
+        sinks = []
+
+        def factory(callback):
+            sinks.append(NullOutputStream(callback, 256, **stream_args))
+            return sinks[0]
+        output = AudioOutput(config, stream_factory=factory)
+        self.addCleanup(output.stop)
+        return output, sinks[0]
+
+    def test_primes_then_plays_in_order(self):
+        output, sink = self.make_output(realtime=True)
+        self.assertEqual(output.target, 882)
+        samples = np.arange(1, 4097, dtype=np.int16)
+        for i in range(0, len(samples), 256):
+            output.play(samples[i:i + 256].astype(np.float32))
+        # Producer faster than real time: play() waits for space instead of dropping
+        self.assertEqual(output.overruns, 0)
+        time.sleep(0.05)
+        sink.stop_stream()
+        played = sink.samples()
+        # Silence until the target is buffered, then every sample in order
+        start = np.flatnonzero(played)[0]
+        self.assertEqual(start % 256, 0)
+        np.testing.assert_array_equal(played[start:start + len(samples)], samples)
+
+    def test_chunks_longer_than_headroom_prime_and_play(self):
+        output, sink = self.make_output(realtime=True)
+        # Pitch/timescale make processed chunks longer than chunk_size (pitch 0.4: 2.5x)
+        samples = np.arange(1, 12801, dtype=np.int16)
+        for i in range(0, len(samples), 640):
+            output.play(samples[i:i + 640].astype(np.float32))
+        self.assertEqual(output.overruns, 0)
+        time.sleep(0.05)
+        sink.stop_stream()
+        played = sink.samples()
+        start = np.flatnonzero(played)[0]
+        np.testing.assert_array_equal(played[start:start + len(samples)], samples)
+
+    def test_underrun_emits_silence_and_is_counted(self):
+        output, sink = self.make_output(realtime=True)
+        output.play(np.ones(1024, dtype=np.float32))
+        time.sleep(0.1)
+        stats = output.stats()
+        self.assertEqual(stats["underruns"], 1)
+        self.assertGreater(stats["underrun_ms"], 0)
+        self.assertEqual(stats["fill"], 0.0)
+        self.assertEqual(np.count_nonzero(sink.samples()), 1024)
+
+    def test_flush_drops_buffered_audio(self):
+        output, sink = self.make_output(realtime=True)
+        output.play(np.ones(512, dtype=np.float32))
+        self.assertGreater(output.stats()["latency_ms"], 0)
+        output.flush()
+        time.sleep(0.05)
+        self.assertEqual(output.ring.available(), 0)
+        self.assertEqual(np.count_nonzero(sink.samples()), 0)
+        self.assertEqual(output.underruns, 0)
+
+if __name__ == '__main__':
+    unittest.main()
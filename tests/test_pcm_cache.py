@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+import sys
+import os
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.pcm_cache import PCMCache
+
+class TestPCMCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.tracks = []
+        for i in range(3):
+            path = os.path.join(self.dir, f"track{i}.mp3")
+            with open(path, 'wb') as f:
+                f.write(bytes([i]))
+            self.tracks.append(path)
+        self.cache = PCMCache(os.path.join(self.dir, "pcm"), max_bytes=2 * 2000 * 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_fill_then_memmap(self):
+        pcm = (np.arange(2000) - 1000).astype(np.int16)
+        self.assertIsNone(self.cache.open(self.tracks[0], 44100, 2))
+        self.cache.fill(self.tracks[0], 44100, 2, [pcm[:700], pcm[700:]])
+        cached = self.cache.open(self.tracks[0], 44100, 2)
+        self.assertIsInstance(cached, np.memmap)
+        np.testing.assert_array_equal(cached, pcm)
+        # Rate and channel count are part of the key
+        self.assertIsNone(self.cache.open(self.tracks[0], 48000, 2))
+        self.assertIsNone(self.cache.open(self.tracks[0], 44100, 1))
+
+    def test_lru_eviction(self):
+        pcm = np.zeros(2000, dtype=np.int16)
+        self.cache.fill(self.tracks[0], 44100, 1, [pcm])
+        self.cache.fill(self.tracks[1], 44100, 1, [pcm])
+        # Touch track 0 so track 1 becomes least recently used
+        entry0 = self.cache._entry(self.tracks[0], 44100, 1)
+        entry1 = self.cache._entry(self.tracks[1], 44100, 1)
+        os.utime(entry1, (1, 1))
+        self.assertIsNotNone(self.cache.open(self.tracks[0], 44100, 1))
+        self.cache.fill(self.tracks[2], 44100, 1, [pcm])
+        self.assertTrue(os.path.exists(entry0))
+        self.assertFalse(os.path.exists(entry1))
+        self.assertIsNotNone(self.cache.open(self.tracks[2], 44100, 1))
+
+    def test_failed_fill_leaves_no_entry(self):
+        def broken():
+            yield np.zeros(100, dtype=np.int16)
+            raise RuntimeError("decoder died")
+        self.assertIsNone(self.cache.fill(self.tracks[0], 44100, 1, broken()))
+        self.assertIsNone(self.cache.open(self.tracks[0], 44100, 1))
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_source_change_invalidates(self):
+        self.cache.fill(self.tracks[0], 44100, 1, [np.ones(10, dtype=np.int16)])
+        with open(self.tracks[0], 'ab') as f:
+            f.write(b"new tags")
+        self.assertIsNone(self.cache.open(self.tracks[0], 44100, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import importlib.util
+import sys
+import os
+import tempfile
+import threading
+import time
+import types
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.playlist import Playlist
+
+class TestPlaylist(unittest.TestCase):
+    def test_advance_and_resume(self):
+        playlist = Playlist(['a', 'b'])
+        self.assertEqual(playlist.resume(), 'a')
+        self.assertEqual(playlist.resume(), 'a')
+        self.assertEqual(playlist.peek_next(), 'b')
+        self.assertEqual(playlist.advance(), 'b')
+        self.assertIsNone(playlist.advance())
+        self.assertEqual(playlist.state(), {"tracks": ['a', 'b'], "current": 1})
+
+    def test_edits_keep_playing_track(self):
+        playlist = Playlist(['a', 'b', 'c'])
+        playlist.advance()
+        playlist.advance() # playing 'b'
+        playlist.enqueue('x', 0)
+        self.assertEqual(playlist.tracks[playlist.current], 'b')
+        playlist.reorder(playlist.current, 0)
+        self.assertEqual(playlist.tracks[playlist.current], 'b')
+        playlist.reorder(3, 0)
+        self.assertEqual(playlist.tracks, ['c', 'b', 'x', 'a'])
+        self.assertEqual(playlist.tracks[playlist.current], 'b')
+        self.assertFalse(playlist.remove(playlist.current))
+        self.assertTrue(playlist.remove(0))
+        self.assertEqual(playlist.tracks[playlist.current], 'b')
+        self.assertEqual(playlist.peek_next(), 'x')
+
+    def test_skip_and_version(self):
+        playlist = Playlist(['a'])
+        version = playlist.version
+        playlist.skip()
+        self.assertGreater(playlist.version, version)
+        self.assertTrue(playlist.take_skip())
+        self.assertFalse(playlist.take_skip())
+
+class Config:
+    def __init__(self, values):
+        self.values = values
+        self.snapshot = types.SimpleNamespace(processing=types.SimpleNamespace(timescale=1.0))
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+@unittest.skipUnless(importlib.util.find_spec('pyaudio'), "PyAudio not installed")
+class TestPlaylistInput(unittest.TestCase):
+    def test_gapless_splice(self):
+        from audio.input import PlaylistInput
+        from audio.decoder import ArraySource
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        a, b = os.path.join(directory.name, 'a.wav'), os.path.join(directory.name, 'b.wav')
+        for path in (a, b):
+            open(path, 'wb').close()
+        tracks = {a: np.arange(1, 1001, dtype=np.int16), b: np.arange(2001, 2301, dtype=np.int16)}
+        config = Config({'audio.chunk_size': 256, 'cache.pcm': False})
+        playlist = Playlist(list(tracks))
+        playback = PlaylistInput(config, playlist)
+        playback.scheduler.sleep = lambda seconds: None
+        playback._open_source = lambda path, fill_cache=True: (ArraySource(tracks[path]), None)
+        opened = []
+        playback.on_open = lambda path, open_blocks: opened.append((path, playback.position))
+        chunks = []
+        playback.register_callback(lambda data: chunks.append((data.copy(), playback.position)))
+
+        playback.running = True
+        playback._run()
+
+        stream = np.concatenate([chunk for chunk, _ in chunks])
+        # Every sample of both tracks in order, no gap at the boundary; only the last chunk is padded
+        np.testing.assert_array_equal(stream[:1300], np.concatenate([tracks[a], tracks[b]]))
+        self.assertTrue(np.all(stream[1300:] == 0))
+        self.assertEqual(opened, [(a, 0), (b, 0)])
+        # Position restarts with the new track inside the splice chunk
+        self.assertEqual(chunks[3][1], 1024 - 1000)
+
+    def test_seek_within_track(self):
+        from audio.input import PlaylistInput
+        from audio.decoder import ArraySource
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'a.wav')
+        open(path, 'wb').close()
+        track = np.arange(1, 44101, dtype=np.int16)
+        playback = PlaylistInput(Config({'audio.chunk_size': 1024, 'cache.pcm': False}), Playlist([path]))
+        playback.scheduler.sleep = lambda seconds: None
+        playback._open_source = lambda path, fill_cache=True: (ArraySource(track), None)
+        seeks = []
+        playback.on_seek = seeks.append
+        chunks = []
+
+        def on_chunk(data):
+            chunks.append(data.copy())
+            if len(chunks) == 1:
+                playback.seek(0.5)
+        playback.register_callback(on_chunk)
+        playback.running = True
+        playback._run()
+
+        self.assertEqual(seeks, [22050])
+        np.testing.assert_array_equal(chunks[1], track[22050:22050 + 1024])
+
+    def test_discarding_a_slow_prefetch_does_not_wait(self):
+        from audio.input import PlaylistInput
+        from audio.decoder import ArraySource
+
+        release = threading.Event()
+        opened = []
+        closed = []
+
+        class Source(ArraySource):
+            def close(self):
+                closed.append(self)
+
+        def slow_open(path, fill_cache=True):
+            opened.append((path, fill_cache))
+            release.wait(5)
+            return Source(np.zeros(10, dtype=np.int16)), None
+
+        playback = PlaylistInput(Config({'audio.chunk_size': 256, 'cache.pcm': False}), Playlist(['a', 'b']))
+        playback._open_source = slow_open
+        playback._prefetch('b')
+        prefetch = playback.prefetch
+
+        # A queue edit drops the pending open without waiting for it
+        started = time.monotonic()
+        playback._discard_next()
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertIsNone(playback.prefetch)
+
+        # The late result is closed by the opening thread, and prefetches skip the cache fill
+        release.set()
+        prefetch.thread.join(5)
+        self.assertEqual(len(closed), 1)
+        self.assertIsNone(prefetch.result)
+        self.assertEqual(opened, [('b', False)])
+
+if __name__ == '__main__':
+    unittest.main()
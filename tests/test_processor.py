@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
 from audio.processor import AudioProcessor
+from audio.filterbank import log_segments
 from config.manager import ConfigManager
 import os
 
@@ -37,12 +38,52 @@ class TestAudioProcessor(unittest.TestCase):
         peak_freq = frequencies[np.argmax(magnitudes)]
         self.assertAlmostEqual(peak_freq, 440, delta=20)
 
+    def test_process_stream_uses_fft_size(self):
+        self.config_manager.set('visualizer.hop_size', 512)
+        self.processor = AudioProcessor(self.config_manager)
+        
+        t = np.arange(1024) / 44100
+        data = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+        spectra, frequencies = self.processor.process_stream(data[:256])
+        self.assertEqual(len(spectra), 0)
+        
+        spectra, frequencies = self.processor.process_stream(data[256:])
+        magnitudes = spectra[-1]
+        # Resolution follows visualizer.fft_size (1024), not the chunk length
+        self.assertAlmostEqual(frequencies[1] - frequencies[0], 44100 / 1024)
+        self.assertAlmostEqual(frequencies[np.argmax(magnitudes)], 440, delta=44100 / 1024)
+
     def test_get_bars(self):
         magnitudes = np.random.rand(512)
         frequencies = np.linspace(0, 22050, 512)
         bars = self.processor.get_bars(magnitudes, frequencies, num_bars=10)
         self.assertEqual(len(bars), 10)
 
+    def test_get_bars_matches_log_bin_mean(self):
+        magnitudes = np.random.rand(300)
+        bars = self.processor.get_bars(magnitudes, None, num_bars=128)
+        
+        # Reference: per-bar mean over log-spaced bin ranges
+        indices = np.round(np.logspace(0, np.log10(len(magnitudes) - 1), 129)).astype(int)
+        expected = [magnitudes[s] if s == e else np.mean(magnitudes[s:e]) for s, e in zip(indices[:-1], indices[1:])]
+        np.testing.assert_allclose(bars, expected, rtol=1e-6)
+        
+        # Table is reused for the same layout and rebuilt when it changes
+        hits = log_segments.cache_info().hits
+        edges, _ = log_segments(300, 128)
+        self.processor.get_bars(magnitudes, None, num_bars=128)
+        self.assertGreater(log_segments.cache_info().hits, hits + 1)
+        self.assertIsNot(log_segments(300, 64)[0], edges)
+
+    def test_get_bars_perceptual_scale(self):
+        data = np.random.rand(2, 513)
+        frequencies = np.linspace(0, 22050, 513)
+        bars = self.processor.get_bars(data, frequencies, num_bars=32, scale='mel')
+        self.assertEqual(bars.shape, (2, 32))
+        # Bars are weighted averages, so a flat spectrum stays flat
+        flat = self.processor.get_bars(np.ones(513), frequencies, num_bars=32, scale='bark')
+        np.testing.assert_allclose(flat, 1.0, rtol=1e-5)
+
     def test_multi_channel_fft(self):
         self.config_manager.set('audio.channels', 2)
         self.processor = AudioProcessor(self.config_manager)
@@ -58,6 +99,22 @@ class TestAudioProcessor(unittest.TestCase):
         self.assertEqual(len(bars), 2)
         self.assertEqual(len(bars[0]), 5)
 
+    def test_multi_channel_fft_matches_per_channel(self):
+        self.config_manager.set('audio.channels', 6)
+        self.processor = AudioProcessor(self.config_manager)
+        
+        frames = (np.random.randn(1024, 6) * 5000).astype(np.int16)
+        magnitudes, frequencies = self.processor.process_fft(frames.ravel())
+        self.assertEqual(magnitudes.shape, (6, len(frequencies)))
+        
+        mono = AudioProcessor(ConfigManager(self.config_path))
+        for ch in range(6):
+            expected, _ = mono.process_fft(frames[:, ch].copy())
+            np.testing.assert_allclose(magnitudes[ch], expected, rtol=1e-5)
+        
+        bars = self.processor.get_bars(magnitudes, frequencies, num_bars=32)
+        self.assertEqual(bars.shape, (6, 32))
+
     def test_multi_channel_transformations(self):
         self.config_manager.set('audio.channels', 2)
         self.processor = AudioProcessor(self.config_manager)
@@ -72,14 +129,16 @@ class TestAudioProcessor(unittest.TestCase):
         processed = self.processor.apply_transformations(data)
         np.testing.assert_array_equal(processed, [500, 1000, 1500, 2000])
         
-        # Test Pitch Shift (should handle channels independently)
+        # Test Pitch Shift (should handle channels independently and keep the duration)
         self.config_manager.set('processing.pitch', 2.0)
         self.config_manager.set('processing.volume', 1.0)
-        processed = self.processor.apply_transformations(data)
-        # num_samples per channel is 2. pitch 2.0 means we get 1 sample per channel.
-        # Should be [L1, R1]
-        self.assertEqual(len(processed), 2)
-        np.testing.assert_array_equal(processed, [1000, 2000])
+        steady = np.tile([1000, 2000], 512).astype(np.int16)
+        outputs = [self.processor.apply_transformations(steady).copy() for _ in range(20)]
+        total = sum(len(o) for o in outputs)
+        # Output lags the input by the stretcher/resampler latency only
+        self.assertLessEqual(total, 20 * len(steady))
+        self.assertGreater(total, 20 * len(steady) - 2 * 2 * 2048)
+        np.testing.assert_allclose(outputs[-1][-8:], np.tile([1000, 2000], 4), atol=5)
 
     def test_filters(self):
         # Generate a signal with 100Hz and 10000Hz components
@@ -117,5 +176,82 @@ class TestAudioProcessor(unittest.TestCase):
         
         self.assertGreater(m_hpf[high_idx], m_hpf[low_idx] * 10) # High freq should be much stronger than low freq
 
+    def test_timeline_lookup(self):
+        import tempfile, shutil
+        cache_dir = tempfile.mkdtemp()
+        try:
+            self.config_manager.set('processing.pitch', 1.0)
+            self.processor.analysis_cache.directory = cache_dir
+            samples = (np.random.randn(44100) * 3000).astype(np.int16)
+            self.processor.prepare_timeline(self.config_path, lambda: [samples])
+            self.assertTrue(self.processor.timeline_active())
+
+            bars, is_beat, onsets = self.processor.timeline_frame(4096)
+            self.assertEqual(bars.shape, (64,))
+            self.assertEqual(len(onsets), 3)
+            self.assertEqual(self.processor.timeline_index, 4096 // self.processor.hop_size - 1)
+
+            # Spectrum-changing processing falls back to live analysis
+            self.config_manager.set('processing.hpf_cutoff', 500.0)
+            self.assertFalse(self.processor.timeline_active())
+            self.config_manager.set('processing.hpf_cutoff', 0.0)
+            self.config_manager.set('visualizer.num_bars', 32)
+            self.assertFalse(self.processor.timeline_active())
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_stale_timeline_is_discarded(self):
+        import tempfile, shutil, threading
+        cache_dir = tempfile.mkdtemp()
+        try:
+            self.processor.analysis_cache.directory = cache_dir
+            first, second = os.path.join(cache_dir, "first.wav"), os.path.join(cache_dir, "second.wav")
+            for path in (first, second):
+                open(path, 'w').close()
+            samples = (np.random.randn(44100) * 3000).astype(np.int16)
+            release = threading.Event()
+
+            def slow_blocks():
+                release.wait(5)
+                return [samples]
+
+            # The first track's build finishes after the second track was opened and prepared
+            generation = self.processor.clear_timeline()
+            results = []
+            worker = threading.Thread(target=lambda: results.append(
+                self.processor.prepare_timeline(first, slow_blocks, generation)))
+            worker.start()
+            current = self.processor.prepare_timeline(second, lambda: [samples], self.processor.clear_timeline())
+            release.set()
+            worker.join()
+
+            self.assertEqual(results, [None])
+            self.assertIs(self.processor.timeline, current)
+            self.assertTrue(self.processor.timeline_active())
+
+            # A timeline installed before a clear is never used after it
+            self.processor.timeline = current
+            self.processor.clear_timeline()
+            self.processor.timeline = current
+            self.assertFalse(self.processor.timeline_active())
+            self.assertIsNone(self.processor.timeline_frame(4096))
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_reset_after_seek(self):
+        self.config_manager.set('processing.lpf_cutoff', 1000.0)
+        samples = (np.random.randn(8192) * 3000).astype(np.int16)
+        self.processor.apply_transformations(samples)
+        spectra, frequencies = self.processor.process_stream(samples)
+        self.processor.detect_beat(spectra, frequencies)
+        self.processor.reset_transformations()
+        self.processor.reset_analysis()
+        self.assertIsNone(self.processor.filters.zi)
+        self.assertEqual(self.processor.onset_detector.count, 0)
+        self.assertEqual(self.processor.tempo.frames_seen, 0)
+        # The first frame after the reset only sees post-seek audio
+        spectra, _ = self.processor.process_stream(np.zeros(self.processor.hop_size, dtype=np.int16))
+        self.assertEqual(np.max(spectra), 0)
+
 if __name__ == '__main__':
     unittest.main()
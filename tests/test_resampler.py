@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.resampler import StreamingResampler
+
+class TestStreamingResampler(unittest.TestCase):
+    def test_exact_output_count_over_long_run(self):
+        resampler = StreamingResampler()
+        ratio = 44100 / 48000
+        total_in = total_out = 0
+        for n in [512, 300, 1024, 77] * 50:
+            total_in += n
+            total_out += len(resampler.process(np.zeros(n, dtype=np.float32), ratio))
+        self.assertEqual(total_out, -(-total_in * 160 // 147))
+
+    def test_chunking_does_not_change_output(self):
+        t = np.arange(8192) / 44100
+        data = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
+        whole = StreamingResampler().process(data, 1.3)
+        
+        resampler = StreamingResampler()
+        pieces = [resampler.process(data[i:i + 333], 1.3).copy() for i in range(0, len(data), 333)]
+        np.testing.assert_allclose(np.concatenate(pieces), whole, atol=1e-5)
+
+    def test_pitch_of_resampled_tone(self):
+        t = np.arange(16384) / 44100
+        data = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
+        out = StreamingResampler().process(data, 1.5)
+        spectrum = np.abs(np.fft.rfft(out * np.hanning(len(out))))
+        peak = np.argmax(spectrum) * 44100 / len(out)
+        self.assertAlmostEqual(peak, 1500, delta=10)
+
+    def test_channels_are_independent(self):
+        resampler = StreamingResampler(channels=2)
+        data = np.tile([[1.0, -2.0]], (256, 1)).astype(np.float32)
+        out = resampler.process(data, 0.75)
+        self.assertEqual(out.shape, (342, 2))
+        np.testing.assert_allclose(out[-16:], np.tile([[1.0, -2.0]], (16, 1)), atol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
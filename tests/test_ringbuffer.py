@@ -0,0 +1,159 @@
+import unittest
+import importlib.util
+import sys
+import os
+import threading
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.ringbuffer import SPSCRing, FrameRing
+from audio.fake_streams import FakeInputStream
+
+class TestSPSCRing(unittest.TestCase):
+    def test_wraparound_and_truncation(self):
+        ring = SPSCRing(8)
+        out = np.zeros(8, dtype=np.int16)
+        self.assertEqual(ring.write(np.arange(6, dtype=np.int16)), 6)
+        self.assertEqual(ring.read(4, out), 4)
+        np.testing.assert_array_equal(out[:4], [0, 1, 2, 3])
+        # Only the free space is written; the rest is the caller's to count as dropped
+        self.assertEqual(ring.write(np.arange(6, 14, dtype=np.int16)), 6)
+        self.assertEqual(ring.space(), 0)
+        self.assertEqual(ring.write(np.arange(3, dtype=np.int16)), 0)
+        self.assertEqual(ring.read(10, out), 8)
+        np.testing.assert_array_equal(out, [4, 5, 6, 7, 8, 9, 10, 11])
+        self.assertEqual(ring.read(4, out), 0)
+
+    def test_fake_stream_feeds_consumer_in_order(self):
+        ring = SPSCRing(4096)
+        samples = (np.arange(11025) % 30000).astype(np.int16)
+
+        def callback(in_data, frame_count, time_info, status):
+            ring.write(np.frombuffer(in_data, dtype=np.int16))
+            return (None, 0)
+
+        stream = FakeInputStream(callback, 256, samples=samples)
+        received = []
+        out = np.zeros(300, dtype=np.int16)
+        stream.start_stream()
+        while stream.is_active() or ring.available():
+            n = ring.read(len(out), out)
+            received.append(out[:n].copy())
+            if n == 0:
+                time.sleep(0.001)
+        stream.close()
+        received = np.concatenate(received)
+        # Whole callback blocks arrive in order with nothing dropped
+        np.testing.assert_array_equal(received, samples[:len(samples) // 256 * 256])
+
+class TestFrameRing(unittest.TestCase):
+    def test_readers_follow_independently(self):
+        ring = FrameRing(4, 8)
+        fast = ring.reader('fast')
+        slow = ring.reader('slow')
+        ring.write(np.arange(3, dtype=np.float32), position=3)
+        ring.write(np.arange(5, dtype=np.float32))
+        data, position = fast.read()
+        np.testing.assert_array_equal(data, [0, 1, 2])
+        self.assertEqual(position, 3)
+        data, position = fast.read()
+        self.assertEqual(len(data), 5)
+        self.assertIsNone(position)
+        self.assertIsNone(fast.read(timeout=0.01))
+        # The other reader still sees both frames
+        self.assertEqual(slow.read()[1], 3)
+
+    def test_lagging_reader_skips_and_counts(self):
+        ring = FrameRing(4, 2)
+        reader = ring.reader('slow')
+        capped = ring.reader('viz', max_lag=1)
+        for i in range(10):
+            ring.write(np.full(2, i, dtype=np.float32), position=i)
+        # Three slots are readable; the fourth may be mid-rewrite
+        self.assertEqual(reader.read()[1], 7)
+        self.assertEqual(reader.stats(), {"frames": 1, "dropped": 7, "peak_lag": 10})
+        self.assertEqual(capped.read()[1], 9)
+        self.assertEqual(capped.stats()["dropped"], 9)
+
+    def test_flush_and_long_chunks(self):
+        ring = FrameRing(4, 4)
+        reader = ring.reader('playback')
+        ring.write(np.zeros(2, dtype=np.float32), position=0)
+        reader.flush()
+        # Longer than a slot: split across consecutive slots with the same position
+        ring.write(np.arange(6, dtype=np.float32), position=1)
+        first, position = reader.read()
+        first = first.copy() # the reader's buffer is reused by the next read
+        second, second_position = reader.read()
+        self.assertEqual((position, second_position), (1, 1))
+        np.testing.assert_array_equal(np.concatenate([first, second]), np.arange(6))
+
+    def test_shared_buffer_view(self):
+        buffer = bytearray(FrameRing.nbytes(4, 8))
+        producer = FrameRing(4, 8, buffer=buffer)
+        reader = FrameRing(4, 8, buffer=buffer).reader('other')
+        producer.write(np.arange(3, dtype=np.float32), position=5)
+        data, position = reader.read(timeout=0.01)
+        np.testing.assert_array_equal(data, [0, 1, 2])
+        self.assertEqual(position, 5)
+
+    def test_concurrent_producer_never_tears(self):
+        ring = FrameRing(8, 64)
+        reader = ring.reader('consumer')
+        done = []
+
+        def produce():
+            for i in range(2000):
+                ring.write(np.full(64, i, dtype=np.float32), position=i)
+            done.append(True)
+        producer = threading.Thread(target=produce)
+        producer.start()
+        previous = -1
+        while not done or ring.written != reader.cursor:
+            frame = reader.read(timeout=0.01)
+            if frame is None:
+                continue
+            data, position = frame
+            # Every frame is whole and frames only move forward
+            self.assertTrue(np.all(data == position))
+            self.assertGreater(position, previous)
+            previous = position
+        producer.join()
+        self.assertEqual(reader.stats()["frames"] + reader.stats()["dropped"], 2000)
+
+class Config:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+@unittest.skipUnless(importlib.util.find_spec('pyaudio'), "PyAudio not installed")
+class TestMicrophoneInput(unittest.TestCase):
+    def test_slow_consumer_counts_dropped_samples(self):
+        from audio.input import MicrophoneInput
+
+        samples = (np.arange(44100) % 30000).astype(np.int16)
+        config = Config({'audio.chunk_size': 256, 'audio.capture_buffer': 0.05})
+        mic = MicrophoneInput(config, stream_factory=lambda callback: FakeInputStream(callback, 256, samples=samples, realtime=False))
+        chunks = []
+
+        def slow(data):
+            chunks.append(data.copy())
+            time.sleep(0.01)
+        mic.register_callback(slow)
+        mic.start()
+        while mic.running and (mic.stream is None or mic.stream.is_active()):
+            time.sleep(0.01)
+        mic.stop()
+
+        self.assertGreater(mic.stats()["dropped_samples"], 0)
+        self.assertGreater(mic.stats()["overflows"], 0)
+        # What was delivered is still a contiguous prefix of the capture
+        np.testing.assert_array_equal(chunks[0], samples[:256])
+
+if __name__ == '__main__':
+    unittest.main()
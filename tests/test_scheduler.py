@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.scheduler import DeadlineScheduler
+
+class FakeClock:
+    def __init__(self, overshoot=0.0):
+        self.now = 100.0
+        self.overshoot = overshoot
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds + self.overshoot
+
+class TestDeadlineScheduler(unittest.TestCase):
+    def make(self, clock, **kwargs):
+        return DeadlineScheduler(1000, clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_overshoot_and_callback_time_do_not_drift(self):
+        clock = FakeClock(overshoot=0.002)
+        scheduler = self.make(clock)
+        for _ in range(1000):
+            clock.now += 0.003 # callback work
+            scheduler.wait(100)
+        # 1000 chunks of 0.1 s end 100 s after the start, give or take one overshoot
+        self.assertAlmostEqual(clock.now - 100.0, 100.0, delta=0.005)
+        stats = scheduler.stats()
+        self.assertAlmostEqual(stats["wake_error_ms"], 2.0, places=3)
+        self.assertEqual(stats["late_chunks"], 0)
+
+    def test_timescale_change_reanchors(self):
+        clock = FakeClock()
+        scheduler = self.make(clock)
+        scheduler.wait(1000, 1.0) # 1 s
+        scheduler.wait(1000, 2.0) # 0.5 s at double speed
+        scheduler.wait(1000, 0.5) # 2 s at half speed
+        self.assertAlmostEqual(clock.now - 100.0, 3.5)
+
+    def test_catches_up_small_lateness(self):
+        clock = FakeClock()
+        scheduler = self.make(clock, max_lateness=0.25)
+        scheduler.wait(100)
+        clock.now += 0.15 # stall
+        scheduler.wait(100) # 0.05 s late: no sleep
+        scheduler.wait(100)
+        self.assertEqual(scheduler.late_chunks, 1)
+        self.assertAlmostEqual(clock.now - 100.0, 0.3)
+
+    def test_resync_after_long_stall(self):
+        clock = FakeClock()
+        scheduler = self.make(clock, max_lateness=0.25)
+        scheduler.wait(100)
+        clock.now += 2.0
+        self.assertEqual(scheduler.wait(100), 0)
+        self.assertEqual(scheduler.resyncs, 1)
+        start = clock.now
+        scheduler.wait(100)
+        self.assertAlmostEqual(clock.now - start, 0.1)
+
+    def test_drop_policy_returns_frames_behind(self):
+        clock = FakeClock()
+        scheduler = self.make(clock, max_lateness=0.25, late_policy='drop')
+        scheduler.wait(100)
+        clock.now += 1.0
+        skip = scheduler.wait(100)
+        self.assertEqual(skip, 900)
+        self.assertEqual(scheduler.stats()["dropped_frames"], 900)
+        # Back on the original timeline
+        scheduler.wait(100)
+        self.assertAlmostEqual(clock.now - 100.0, 1.2)
+
+if __name__ == '__main__':
+    unittest.main()
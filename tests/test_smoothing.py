@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.smoothing import BarSmoother
+
+class TestBarSmoother(unittest.TestCase):
+    def test_fast_attack_slow_release(self):
+        smoother = BarSmoother(100.0, attack=0.0, release=0.5, peak_hold=0.0, gain_release=0.0)
+        bars, _ = smoother.process(np.array([1.0, 0.0]))
+        bars, _ = smoother.process(np.array([0.0, 1.0]))
+        # Attack 0 jumps straight up; the falling bar decays by exp(-1 / 50)
+        self.assertAlmostEqual(smoother.smoothed[1], 1.0)
+        self.assertAlmostEqual(smoother.smoothed[0], np.exp(-1 / 50))
+
+    def test_per_bar_release_pair(self):
+        smoother = BarSmoother(100.0, attack=0.0, release=[1.0, 0.1])
+        smoother.process(np.ones(4))
+        smoother.process(np.zeros(4))
+        # Bass (slow release) stays up longer than treble
+        self.assertTrue(np.all(np.diff(smoother.smoothed) < 0))
+
+    def test_peak_holds_then_falls(self):
+        smoother = BarSmoother(100.0, attack=0.0, release=0.0, peak_hold=0.05, peak_release=0.1, gain_release=100.0)
+        smoother.process(np.array([1.0]))
+        held = [smoother.process(np.array([0.0]))[1][0] for _ in range(4)]
+        self.assertTrue(np.allclose(held, 1.0))
+        for _ in range(20):
+            _, peaks = smoother.process(np.array([0.0]))
+        self.assertLess(peaks[0], 0.5)
+
+    def test_auto_gain_scales_to_unit_range(self):
+        smoother = BarSmoother(100.0, attack=0.0)
+        bars, peaks = smoother.process(np.array([[1000.0, 250.0], [500.0, 0.0]]))
+        self.assertEqual(bars.shape, (2, 2))
+        self.assertAlmostEqual(bars.max(), 1.0)
+        self.assertAlmostEqual(bars[0, 1], 0.25)
+        self.assertTrue(np.all(peaks >= bars))
+
+    def test_silence_stays_zero(self):
+        smoother = BarSmoother(100.0)
+        bars, peaks = smoother.process(np.zeros(8))
+        self.assertTrue(np.all(bars == 0))
+        self.assertTrue(np.all(peaks == 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scipy.fft import rfft
+from audio.stft import STFTAnalyzer, SampleRing, get_window
+
+class TestSampleRing(unittest.TestCase):
+    def test_latest_is_contiguous_across_wrap(self):
+        ring = SampleRing(8, channels=2)
+        data = np.arange(26, dtype=np.float32).reshape(-1, 2)
+        ring.write(data[:5])
+        ring.write(data[5:])
+        view = ring.latest(6)
+        np.testing.assert_array_equal(view, data[-6:])
+        self.assertTrue(view.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(ring.latest(3, lag=2), data[-5:-2])
+
+class TestSTFTAnalyzer(unittest.TestCase):
+    def test_frames_follow_hop_not_chunk_size(self):
+        stft = STFTAnalyzer(4096, 512, 44100)
+        counts = [len(stft.push(np.zeros(256, dtype=np.int16))) for _ in range(8)]
+        self.assertEqual(counts, [0, 1, 0, 1, 0, 1, 0, 1])
+
+        # One large chunk can complete several frames at once
+        self.assertEqual(len(stft.push(np.zeros(2048, dtype=np.int16))), 4)
+
+    def test_frame_matches_direct_fft(self):
+        stft = STFTAnalyzer(1024, 256, 44100, window='blackmanharris')
+        data = (np.random.randn(3000) * 1000).astype(np.int16)
+        for start in range(0, len(data), 300):
+            spectra = stft.push(data[start:start + 300])
+
+        # 3000 samples at hop 256 -> last frame ends at sample 11 * 256
+        end = 11 * 256
+        expected = np.abs(rfft(data[end - 1024:end] * get_window('blackmanharris', 1024)))
+        np.testing.assert_allclose(spectra[-1], expected, rtol=1e-3, atol=1e-2)
+
+    def test_zero_padding_and_channels(self):
+        stft = STFTAnalyzer(512, 512, 48000, channels=2, window='flattop', zero_pad=4)
+        spectra = stft.push(np.zeros(1024, dtype=np.int16))
+        self.assertEqual(spectra.shape, (1, 2, 2048 // 2 + 1))
+        self.assertAlmostEqual(stft.frequencies[1], 48000 / 2048)
+
+    def test_unknown_window(self):
+        with self.assertRaises(ValueError):
+            STFTAnalyzer(512, 128, 44100, window='triangle')
+
+if __name__ == '__main__':
+    unittest.main()
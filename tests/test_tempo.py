@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.tempo import TempoTracker
+
+class TestTempoTracker(unittest.TestCase):
+    def feed_pulses(self, tracker, bpm, seconds, offset=0):
+        period = tracker.frame_rate * 60 / bpm
+        frames = int(seconds * tracker.frame_rate)
+        for i in range(frames):
+            phase = (i - offset) % period
+            tracker.update(1.0 if phase < 1 else 0.0)
+        return period, frames
+
+    def test_estimates_bpm(self):
+        for bpm in (95, 128, 174):
+            tracker = TempoTracker(44100 / 512)
+            self.feed_pulses(tracker, bpm, 10)
+            state = tracker.state()
+            self.assertAlmostEqual(state["bpm"], bpm, delta=bpm * 0.02)
+            self.assertGreater(state["confidence"], 0.5)
+            self.assertIsInstance(state["bpm"], float) # JSON serializable
+
+    def test_predicts_next_beat(self):
+        tracker = TempoTracker(100.0, bpm_range=(60, 200))
+        period, frames = self.feed_pulses(tracker, 120, 10, offset=10)
+        # Pulses every 50 frames starting at frame 10; the feed ends on frame 999
+        expected = ((10 - frames) % period) / tracker.frame_rate
+        self.assertAlmostEqual(tracker.state()["next_beat"], expected, delta=0.03)
+
+    def test_estimates_are_amortized(self):
+        tracker = TempoTracker(100.0, window_seconds=8.0, update_interval=0.5)
+        self.feed_pulses(tracker, 120, 10)
+        # 1000 frames, first estimate once 2 * max_lag frames exist, then every 50 frames
+        self.assertLessEqual(tracker.estimates, 1000 // 50)
+        self.assertGreater(tracker.estimates, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from audio.timestretch import PhaseVocoder
+from audio.processor import AudioProcessor
+from config.manager import ConfigManager
+
+def peak_frequency(data, sample_rate=44100):
+    spectrum = np.abs(np.fft.rfft(data * np.hanning(len(data))))
+    return np.argmax(spectrum) * sample_rate / len(data)
+
+def tone(freq, seconds=2.0, sample_rate=44100):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (np.sin(2 * np.pi * freq * t) * 10000).astype(np.float32)
+
+class TestPhaseVocoder(unittest.TestCase):
+    def test_stretch_keeps_pitch(self):
+        data = tone(440)
+        for stretch in (0.7, 1.5):
+            vocoder = PhaseVocoder()
+            out = np.concatenate([vocoder.process(data[i:i + 512], stretch).copy() for i in range(0, len(data), 512)])
+            self.assertAlmostEqual(len(out) / len(data), stretch, delta=0.05)
+            segment = out[22050:22050 + 8192]
+            self.assertAlmostEqual(peak_frequency(segment), 440, delta=6)
+            self.assertAlmostEqual(np.std(segment) * np.sqrt(2), 10000, delta=600)
+
+    def test_stereo_channels(self):
+        data = tone(440)
+        stereo = np.stack([data, -0.5 * data], axis=1)
+        vocoder = PhaseVocoder(channels=2)
+        out = np.concatenate([vocoder.process(stereo[i:i + 512], 1.25).copy() for i in range(0, len(stereo), 512)])
+        self.assertEqual(out.shape[1], 2)
+        np.testing.assert_allclose(np.std(out[20000:30000], axis=0) * np.sqrt(2), [10000, 5000], rtol=0.05)
+
+class TestPitchTimescaleDecoupling(unittest.TestCase):
+    def setUp(self):
+        self.config_path = "test_config.yaml"
+        with open(self.config_path, 'w') as f:
+            f.write("audio:\n  sample_rate: 44100\nprocessing:\n  lpf_cutoff: 22050.0\n")
+        self.config_manager = ConfigManager(self.config_path)
+
+    def tearDown(self):
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    def run_processor(self, data):
+        processor = AudioProcessor(self.config_manager)
+        chunks = [processor.apply_transformations(data[i:i + 512].astype(np.int16)).copy() for i in range(0, len(data), 512)]
+        return np.concatenate(chunks).astype(np.float32)
+
+    def test_pitch_keeps_duration(self):
+        self.config_manager.set('processing.pitch', 2.0)
+        out = self.run_processor(tone(440))
+        self.assertAlmostEqual(len(out) / 88200, 1.0, delta=0.05)
+        self.assertAlmostEqual(peak_frequency(out[22050:22050 + 8192]), 880, delta=10)
+
+    def test_timescale_keeps_pitch(self):
+        self.config_manager.set('processing.timescale', 2.0)
+        out = self.run_processor(tone(440))
+        self.assertAlmostEqual(len(out) / 88200, 0.5, delta=0.05)
+        self.assertAlmostEqual(peak_frequency(out[11025:11025 + 8192]), 440, delta=10)
+
+if __name__ == '__main__':
+    unittest.main()